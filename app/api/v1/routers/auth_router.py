@@ -1,63 +1,72 @@
-from aws_lambda_powertools import Logger
-from fastapi import APIRouter, Depends, Response, status
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Request, Response, status
 
 from app.jwt_bearer import JWTBearer
+from app.models.jwt import JWTToken
+from app.models.request.introspection import IntrospectionRequest
 from app.models.request.login import LoginRequest
 from app.models.request.refresh import RefreshRequest
 from app.models.request.register import RegistrationRequest
+from app.models.response.introspection import IntrospectionResponse
 from app.models.response.token import TokenResponse
+from app.serialization import introspection_response, token_response
 from app.services.auth_service import AuthService
 from app.services.user_service import UserService
 
-logger = Logger()
-
 auth_service = AuthService()
 jwt_bearer = JWTBearer()
 router = APIRouter()
 user_service = UserService()
 
 
-@router.post("/login", status_code=status.HTTP_200_OK)
-def login(body: LoginRequest) -> TokenResponse:
-    jwt_token, refresh_token, expires_in = auth_service.login(
-        str(body.email), body.password
-    )
-
-    return TokenResponse(
-        access_token=jwt_token, refresh_token=refresh_token, expires_in=expires_in
+@router.post("/login", response_model=TokenResponse, status_code=status.HTTP_200_OK)
+async def login(body: LoginRequest, request: Request) -> Response:
+    jwt_token, refresh_token, expires_in = await auth_service.login(
+        str(body.email), body.password, request.client.host if request.client else None
     )
 
-
-@router.get(
-    "/logout",
-    dependencies=[Depends(jwt_bearer)],
-    status_code=status.HTTP_204_NO_CONTENT,
-)
-def logout():
-    auth_service.logout(jwt_bearer.decoded_token)
+    return token_response(jwt_token, refresh_token, expires_in)
 
 
 @router.post(
-    "/refresh",
+    "/introspect",
     dependencies=[Depends(jwt_bearer)],
+    response_model=IntrospectionResponse,
+    response_model_exclude_none=True,
     status_code=status.HTTP_200_OK,
 )
-def refresh(body: RefreshRequest) -> TokenResponse:
-    jwt_token, refresh_token, expires_in = auth_service.refresh(
-        jwt_bearer.decoded_token, body.refresh_token
-    )
+async def introspect(body: IntrospectionRequest) -> Response:
+    return introspection_response(await jwt_bearer.validate_tokens(body.tokens))
+
+
+@router.get("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(jwt_token: Annotated[JWTToken, Depends(jwt_bearer)]):
+    await auth_service.logout(jwt_token)
+
 
-    return TokenResponse(
-        access_token=jwt_token, refresh_token=refresh_token, expires_in=expires_in
+@router.get("/logout/all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(jwt_token: Annotated[JWTToken, Depends(jwt_bearer)]):
+    await auth_service.revoke_all(str(jwt_token.sub))
+
+
+@router.post("/refresh", response_model=TokenResponse, status_code=status.HTTP_200_OK)
+async def refresh(
+    body: RefreshRequest, jwt_token: Annotated[JWTToken, Depends(jwt_bearer)]
+) -> Response:
+    access_token, refresh_token, expires_in = await auth_service.refresh(
+        jwt_token, body.refresh_token
     )
 
+    return token_response(access_token, refresh_token, expires_in)
+
 
 @router.post(
     "/register",
     dependencies=[Depends(jwt_bearer)],
 )
-def register(body: RegistrationRequest):
-    user_id = user_service.register(
+async def register(body: RegistrationRequest):
+    user_id = await user_service.register(
         body.email, body.password, body.username, body.display_name
     )
 
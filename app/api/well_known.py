@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Request, Response, status
+
+from app import settings
+from app.serialization import MEDIA_TYPE_JSON
+from app.signing_keys import get_jwks
+
+router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+
+@router.get("/jwks.json")
+def jwks(request: Request) -> Response:
+    body, etag = get_jwks()
+    headers = {
+        "Cache-Control": f"public, max-age={settings.jwks_max_age}",
+        "ETag": etag,
+    }
+    if_none_match = {
+        tag.strip().removeprefix("W/")
+        for tag in request.headers.get("If-None-Match", "").split(",")
+    }
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(headers=headers, status_code=status.HTTP_304_NOT_MODIFIED)
+    return Response(body, headers=headers, media_type=MEDIA_TYPE_JSON)
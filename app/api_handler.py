@@ -1,79 +1,119 @@
+import asyncio
+import os
 import uuid
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
 
-import uvicorn
-from aws_lambda_powertools import Logger
 from botocore.exceptions import BotoCoreError, ClientError
-from fastapi import FastAPI, HTTPException, Request, status
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import UJSONResponse
 from mangum import Mangum
 from starlette.middleware.exceptions import ExceptionMiddleware
 
 from app import settings
 from app.api.v1.api import router as api_v1_router
-from app.middlewares import CorrelationIdMiddleware
-from app.models.response.error import ErrorResponse, ValidationErrorResponse
+from app.api.well_known import router as well_known_router
+from app.dynamodb import get_dynamodb_client
+from app.error_classification import SERVER_ERROR, classify, record_error
+from app.metrics import metrics
+from app.middlewares import (
+    CompressionMiddleware,
+    CorrelationIdMiddleware,
+    TimingMiddleware,
+)
+from app.password_hasher import password_hashing_executor
+from app.serialization import (
+    ERROR_MESSAGE_INTERNAL_SERVER_ERROR,
+    error_response,
+    validation_error_response,
+)
+from app.signing_keys import HS256
+from app.structured_logging import SamplingFilter, logger
+
+
+async def warm_up():
+    results = await asyncio.gather(
+        asyncio.to_thread(
+            settings.jwt_secret_provider.refresh
+            if settings.jwt_algorithm == HS256
+            else settings.jwt_signing_keys_provider.refresh
+        ),
+        get_dynamodb_client().warm_up(settings.dynamodb_warm_connections),
+        password_hashing_executor.warm_up(),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Warm-up step failed", exc_info=result)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    await warm_up()
+    yield
+    await get_dynamodb_client().close()
 
-logger = Logger()
 
-app = FastAPI(debug=settings.debug, title="AuthApp", version="1.0.0")
+logger.addFilter(SamplingFilter(settings.log_sample_rates))
+
+app = FastAPI(debug=settings.debug, lifespan=lifespan, title="AuthApp", version="1.0.0")
 app.add_middleware(CorrelationIdMiddleware)
-app.add_middleware(GZipMiddleware)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(ExceptionMiddleware, handlers=app.exception_handlers)
+app.add_middleware(TimingMiddleware)
 app.include_router(api_v1_router)
+app.include_router(well_known_router)
+
+handler = Mangum(app, lifespan="off")
+handler = metrics.log_metrics(handler)
+# the API Gateway event is only logged if POWERTOOLS_LOGGER_LOG_EVENT opts in, it
+# carries passwords and tokens that the formatter then has to redact
+handler = logger.inject_lambda_context(handler, clear_state=True)
 
-handler = Mangum(app)
-handler = logger.inject_lambda_context(handler, clear_state=True, log_event=True)
+if "AWS_LAMBDA_FUNCTION_NAME" in os.environ:
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    asyncio.get_event_loop().run_until_complete(warm_up())
 
 
 @app.exception_handler(BotoCoreError)
 @app.exception_handler(ClientError)
-def botocore_error_handler(request: Request, error: BotoCoreError) -> UJSONResponse:
+def botocore_error_handler(request: Request, error: BotoCoreError) -> Response:
     error_id = uuid.uuid4()
-    error_message = str(error) if settings.debug else "Internal Server Error"
-    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-    logger.exception(f"Received botocore error {error_id=}")
-
-    return UJSONResponse(
-        content=ErrorResponse(status=status_code, error=error_message).model_dump(
-            by_alias=True
-        ),
-        status_code=status_code,
+    error_message = (
+        str(error) if settings.debug else ERROR_MESSAGE_INTERNAL_SERVER_ERROR
     )
+    record_error(SERVER_ERROR, "Received botocore error error_id=%s", error_id)
+
+    return error_response(status.HTTP_500_INTERNAL_SERVER_ERROR, error_message)
 
 
 @app.exception_handler(HTTPException)
-def http_exception_handler(request: Request, error: HTTPException) -> UJSONResponse:
+def http_exception_handler(request: Request, error: HTTPException) -> Response:
     error_id = uuid.uuid4()
-    logger.exception(f"Received http exception {error_id=}")
-
-    return UJSONResponse(
-        content=ErrorResponse(status=error.status_code, error=error.detail).model_dump(
-            by_alias=True
-        ),
-        status_code=error.status_code,
+    record_error(
+        classify(error.status_code),
+        "Received http exception status_code=%d error_id=%s",
+        error.status_code,
+        error_id,
     )
 
+    return error_response(error.status_code, error.detail, error.headers)
+
 
 @app.exception_handler(RequestValidationError)
 def request_validation_error_handler(
     request: Request, error: RequestValidationError
-) -> UJSONResponse:
+) -> Response:
     error_id = uuid.uuid4()
-    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
-    logger.exception(f"Received request validation error {error_id=}")
-
-    return UJSONResponse(
-        content=ValidationErrorResponse(
-            status=status_code,
-            error="Validation Error",
-            errors=jsonable_encoder(error.errors()),
-        ).model_dump(by_alias=True),
-        status_code=status_code,
+    record_error(
+        classify(status.HTTP_422_UNPROCESSABLE_ENTITY),
+        "Received request validation error error_id=%s",
+        error_id,
     )
 
+    return validation_error_response(jsonable_encoder(error.errors()))
+
 
 @app.get("/health")
 async def health_check():
@@ -81,4 +121,6 @@ async def health_check():
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("app.api_handler:app", host="localhost", port=8080, reload=True)
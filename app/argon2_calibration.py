@@ -0,0 +1,86 @@
+import argparse
+import secrets
+import statistics
+import time
+from collections.abc import Iterable
+
+from argon2 import PasswordHasher
+
+from app import settings
+
+MEMORY_COSTS = (19456, 32768, 47104, 65536, 131072)
+TIME_COSTS = (1, 2, 3, 4)
+
+
+def measure(password_hasher: PasswordHasher, samples: int) -> list[float]:
+    password = secrets.token_urlsafe(16)
+    latencies = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        password_hasher.hash(password)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    return latencies
+
+
+def percentile(latencies: list[float], value: int) -> float:
+    if len(latencies) == 1:
+        return latencies[0]
+    return statistics.quantiles(latencies, n=100, method="inclusive")[value - 1]
+
+
+def recommend(
+    results: Iterable[tuple[int, int, float]], target_p99: float
+) -> tuple[int, int, float] | None:
+    candidates = [result for result in results if result[2] <= target_p99]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda result: (result[0] * result[1], result[0]))
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Measure Argon2 hash latency and recommend parameters"
+    )
+    parser.add_argument("--target-p99", type=float, default=250, help="milliseconds")
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--parallelism", type=int, default=settings.argon2_parallelism)
+    args = parser.parse_args(argv)
+
+    print(f"{'memory_cost':>12} {'time_cost':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    results = []
+    for memory_cost in MEMORY_COSTS:
+        for time_cost in TIME_COSTS:
+            latencies = measure(
+                PasswordHasher(
+                    time_cost=time_cost,
+                    memory_cost=memory_cost,
+                    parallelism=args.parallelism,
+                ),
+                args.samples,
+            )
+            p99 = percentile(latencies, 99)
+            results.append((memory_cost, time_cost, p99))
+            print(
+                f"{memory_cost:>12} {time_cost:>10} "
+                f"{percentile(latencies, 50):>10.1f} {p99:>10.1f}"
+            )
+
+    print(
+        f"\nCurrent: ARGON2_MEMORY_COST={settings.argon2_memory_cost} "
+        f"ARGON2_TIME_COST={settings.argon2_time_cost} "
+        f"ARGON2_PARALLELISM={settings.argon2_parallelism}"
+    )
+    recommendation = recommend(results, args.target_p99)
+    if recommendation is None:
+        print(f"No parameters meet the {args.target_p99} ms p99 target")
+    else:
+        memory_cost, time_cost, p99 = recommendation
+        print(
+            f"Recommended: ARGON2_MEMORY_COST={memory_cost} "
+            f"ARGON2_TIME_COST={time_cost} "
+            f"ARGON2_PARALLELISM={args.parallelism} (p99 {p99:.1f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import secrets
+import statistics
+from collections.abc import Callable
+
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message
+
+from app.benchmarks.middlewares import SCOPE, measure
+from app.middlewares import CompressionMiddleware
+from app.response_compression import compress
+
+# sizes of the documents the service returns, from a 204 logout to a large listing
+PAYLOADS: dict[str, Callable[[], Response]] = {
+    "logout (204)": lambda: Response(status_code=204),
+    "token response": lambda: JSONResponse(
+        {
+            "access_token": secrets.token_urlsafe(300),
+            "refresh_token": secrets.token_hex(16),
+            "expires_in": 3600,
+            "token_type": "Bearer",
+        }
+    ),
+    "4 KiB document": lambda: JSONResponse(
+        {"items": [{"id": index, "name": f"item-{index}"} for index in range(150)]}
+    ),
+    "64 KiB document": lambda: JSONResponse(
+        {"items": [{"id": index, "name": f"item-{index}"} for index in range(2400)]}
+    ),
+}
+STACKS: dict[str, Callable[[FastAPI], None]] = {
+    "none": lambda app: None,
+    "gzip on every route": lambda app: app.add_middleware(GZipMiddleware),
+    "policy, route not opted in": lambda app: app.add_middleware(CompressionMiddleware),
+}
+
+
+def build_app(add_middleware: Callable[[FastAPI], None], opt_in: bool) -> FastAPI:
+    app = FastAPI()
+    for index, build_response in enumerate(PAYLOADS.values()):
+
+        def endpoint(build_response=build_response) -> Response:
+            return build_response()
+
+        app.add_api_route(f"/{index}", compress(endpoint) if opt_in else endpoint)
+    add_middleware(app)
+    return app
+
+
+async def encoded_size(app: ASGIApp, path: str) -> tuple[str, int]:
+    messages: list[Message] = []
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message):
+        messages.append(message)
+
+    await app({**SCOPE, "path": path, "raw_path": path.encode()}, receive, send)
+    headers = dict(messages[0]["headers"])
+    return (
+        headers.get(b"content-encoding", b"identity").decode(),
+        sum(len(message.get("body", b"")) for message in messages[1:]),
+    )
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Measure response compression cost per payload size"
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    apps = {name: build_app(add, opt_in=False) for name, add in STACKS.items()}
+    apps["policy, route opted in"] = build_app(
+        lambda app: app.add_middleware(CompressionMiddleware), opt_in=True
+    )
+    print(f"{'stack':<28} {'payload':<16} {'p50 us':>8} {'encoding':>9} {'bytes':>7}")
+    for name, app in apps.items():
+        for index, payload in enumerate(PAYLOADS):
+            path = f"/{index}"
+            scope = {**SCOPE, "path": path, "raw_path": path.encode()}
+            asyncio.run(measure(app, min(args.requests, 100), scope))
+            p50 = statistics.median(asyncio.run(measure(app, args.requests, scope)))
+            encoding, size = asyncio.run(encoded_size(app, path))
+            print(f"{name:<28} {payload:<16} {p50:>8.1f} {encoding:>9} {size:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,568 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from urllib.parse import urlsplit
+
+import boto3
+import httpx
+import pendulum
+from argon2 import PasswordHasher
+from aws_lambda_powertools import Logger
+
+from app import settings
+from app.argon2_calibration import percentile
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "load.json"
+ENDPOINTS = ("login", "refresh", "logout", "register", "introspect")
+PASSWORD = "load-test-password"
+TABLES = (
+    {
+        "TableName": "users",
+        "AttributeDefinitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "email", "AttributeType": "S"},
+            {"AttributeName": "username", "AttributeType": "S"},
+        ],
+        "KeySchema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "GlobalSecondaryIndexes": [
+            {
+                "IndexName": "EmailIndex",
+                "KeySchema": [{"AttributeName": "email", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "UsernameIndex",
+                "KeySchema": [{"AttributeName": "username", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    {
+        "TableName": "tokens",
+        "AttributeDefinitions": [
+            {"AttributeName": "jti", "AttributeType": "S"},
+            {"AttributeName": "refresh_token", "AttributeType": "S"},
+            {"AttributeName": "sub", "AttributeType": "S"},
+        ],
+        "KeySchema": [{"AttributeName": "jti", "KeyType": "HASH"}],
+        "GlobalSecondaryIndexes": [
+            {
+                "IndexName": "RefreshTokenIndex",
+                "KeySchema": [{"AttributeName": "refresh_token", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "SubIndex",
+                "KeySchema": [{"AttributeName": "sub", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "KEYS_ONLY"},
+            },
+        ],
+    },
+    {
+        "TableName": "token-revocations",
+        "AttributeDefinitions": [
+            {"AttributeName": "day", "AttributeType": "S"},
+            {"AttributeName": "revocation_id", "AttributeType": "S"},
+        ],
+        "KeySchema": [
+            {"AttributeName": "day", "KeyType": "HASH"},
+            {"AttributeName": "revocation_id", "KeyType": "RANGE"},
+        ],
+    },
+    {
+        "TableName": "login-attempts",
+        "AttributeDefinitions": [{"AttributeName": "id", "AttributeType": "S"}],
+        "KeySchema": [{"AttributeName": "id", "KeyType": "HASH"}],
+    },
+)
+TARGETS = ("uvicorn", "handler")
+
+Request = tuple[str, str, dict[str, str], bytes]
+
+
+class LatencyProxy:
+    # adds a fixed delay to every chunk sent to the upstream, which for one request
+    # per connection at a time is the round-trip latency of a remote endpoint
+    def __init__(self, upstream_url: str, latency: float):
+        self._latency = latency
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._upstream = urlsplit(upstream_url)
+        self.url = ""
+
+    def __enter__(self) -> "LatencyProxy":
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _pipe(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay: float
+    ):
+        try:
+            while data := await reader.read(65536):
+                if delay:
+                    await asyncio.sleep(delay)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(
+        self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter
+    ):
+        upstream_reader, upstream_writer = await asyncio.open_connection(
+            self._upstream.hostname, self._upstream.port
+        )
+        await asyncio.gather(
+            self._pipe(client_reader, upstream_writer, self._latency),
+            self._pipe(upstream_reader, client_writer, 0),
+        )
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0)
+        )
+        host, port = server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        self._ready.set()
+        self._loop.run_forever()
+        server.close()
+
+
+def start_moto_server() -> tuple[Any, str]:
+    from moto.moto_server.werkzeug_app import (
+        DomainDispatcherApplication,
+        create_backend_app,
+    )
+    from werkzeug.serving import make_server
+
+    # moto backends are not thread-safe, so requests are served one at a time
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server(
+        "127.0.0.1", 0, DomainDispatcherApplication(create_backend_app)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def create_tables(endpoint_url: str):
+    dynamodb = boto3.client(
+        "dynamodb",
+        endpoint_url=endpoint_url,
+        region_name=os.environ.get("AWS_DEFAULT_REGION", "eu-central-1"),
+    )
+    for table in TABLES:
+        try:
+            dynamodb.create_table(
+                **{
+                    **table,
+                    "TableName": f"{settings.stage}-{table['TableName']}",
+                    "BillingMode": "PAY_PER_REQUEST",
+                }
+            )
+        except dynamodb.exceptions.ResourceInUseException:
+            pass
+
+
+def put_jwt_secret(ssm_endpoint_url: str):
+    os.environ["AWS_ENDPOINT_URL_SSM"] = ssm_endpoint_url
+    os.environ.setdefault("JWT_SECRET_SSM_PARAM_NAME", "/load-test/jwt-secret")
+    boto3.client(
+        "ssm", region_name=os.environ.get("AWS_DEFAULT_REGION", "eu-central-1")
+    ).put_parameter(
+        Name=os.environ["JWT_SECRET_SSM_PARAM_NAME"],
+        Value=secrets.token_hex(32),
+        Type="SecureString",
+        Overwrite=True,
+    )
+
+
+async def seed_users(count: int) -> list[tuple[str, str]]:
+    from app.dynamodb import get_dynamodb_client
+    from app.user_import import UserImport
+
+    password_hash = PasswordHasher(
+        time_cost=settings.argon2_time_cost,
+        memory_cost=settings.argon2_memory_cost,
+        parallelism=settings.argon2_parallelism,
+    ).hash(PASSWORD)
+    with ThreadPoolExecutor(1) as executor:
+        user_import = UserImport(
+            get_dynamodb_client().table(f"{settings.stage}-users"),
+            PasswordHasher(),
+            executor,
+        )
+        await user_import.run(
+            (
+                index,
+                {
+                    "email": f"load-{index}@netcode.hu",
+                    "username": f"load-{index}",
+                    "passwordHash": password_hash,
+                },
+            )
+            for index in range(count)
+        )
+    user_ids = {}
+    for table_item in await _scan_users():
+        if "email" in table_item:
+            user_ids[table_item["email"]] = table_item["id"]
+    return [(email, user_ids[email]) for email in sorted(user_ids)]
+
+
+async def _scan_users() -> list[dict[str, Any]]:
+    from app.dynamodb import get_dynamodb_client
+
+    table = get_dynamodb_client().table(f"{settings.stage}-users")
+    items: list[dict[str, Any]] = []
+    params: dict[str, Any] = {}
+    while True:
+        response = await table.scan(**params)
+        items.extend(response["Items"])
+        if "LastEvaluatedKey" not in response:
+            return items
+        params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def mint_tokens(user_id: str, count: int) -> list[tuple[str, str]]:
+    from app.models.jwt import JWTToken
+    from app.services.token_service import TokenService
+    from app.signing_keys import encode_token
+
+    token_service = TokenService()
+    tokens = []
+    for _ in range(count):
+        iat = pendulum.now()
+        jwt_token = JWTToken(
+            exp=iat.add(seconds=settings.jwt_token_lifetime).int_timestamp,
+            iat=iat.int_timestamp,
+            jti=str(uuid.uuid4()),
+            sub=user_id,
+            user={"id": user_id},
+        )
+        refresh_token = secrets.token_hex(16)
+        await token_service.create(jwt_token, refresh_token)
+        tokens.append(
+            (encode_token(jwt_token.model_dump(exclude_none=True)), refresh_token)
+        )
+    return tokens
+
+
+def _json(body: dict[str, Any]) -> bytes:
+    return json.dumps(body).encode()
+
+
+async def build_requests(
+    endpoint: str, users: list[tuple[str, str]], count: int
+) -> list[Request]:
+    email, user_id = users[0]
+    tokens = await mint_tokens(
+        user_id, count if endpoint in ("refresh", "logout") else 1
+    )
+    headers = {"Content-Type": "application/json"}
+
+    def bearer(access_token: str) -> dict[str, str]:
+        return {**headers, "Authorization": f"Bearer {access_token}"}
+
+    if endpoint == "login":
+        return [
+            (
+                "POST",
+                "/api/v1/login",
+                headers,
+                _json({"email": users[index % len(users)][0], "password": PASSWORD}),
+            )
+            for index in range(count)
+        ]
+    if endpoint == "refresh":
+        return [
+            (
+                "POST",
+                "/api/v1/refresh",
+                bearer(access_token),
+                _json({"refreshToken": refresh_token}),
+            )
+            for access_token, refresh_token in tokens
+        ]
+    if endpoint == "logout":
+        return [
+            ("GET", "/api/v1/logout", bearer(access_token), b"")
+            for access_token, _ in tokens
+        ]
+    access_token, _ = tokens[0]
+    if endpoint == "register":
+        return [
+            (
+                "POST",
+                "/api/v1/register",
+                bearer(access_token),
+                _json(
+                    {
+                        "email": f"{suffix}@netcode.hu",
+                        "username": suffix,
+                        "password": PASSWORD,
+                        "confirmPassword": PASSWORD,
+                    }
+                ),
+            )
+            for suffix in (uuid.uuid4().hex for _ in range(count))
+        ]
+    return [
+        (
+            "POST",
+            "/api/v1/introspect",
+            bearer(access_token),
+            _json({"tokens": [access_token]}),
+        )
+    ] * count
+
+
+async def drive_uvicorn(
+    base_url: str, requests: list[Request], concurrency: int
+) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+
+        async def send(method: str, path: str, headers: dict[str, str], body: bytes):
+            nonlocal errors
+            async with semaphore:
+                started_at = time.perf_counter()
+                response = await client.request(
+                    method, path, headers=headers, content=body
+                )
+                latencies.append((time.perf_counter() - started_at) * 1000)
+                errors += not response.is_success
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(send(*request) for request in requests))
+        elapsed = time.perf_counter() - started_at
+    return latencies, errors, elapsed
+
+
+def api_gateway_event(
+    method: str, path: str, headers: dict[str, str], body: bytes
+) -> dict[str, Any]:
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": method,
+        "headers": headers,
+        "multiValueHeaders": {name: [value] for name, value in headers.items()},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "accountId": "123456789012",
+            "apiId": "load-test",
+            "httpMethod": method,
+            "identity": {"sourceIp": "127.0.0.1"},
+            "path": path,
+            "requestId": str(uuid.uuid4()),
+            "resourcePath": "/{proxy+}",
+            "stage": settings.stage,
+        },
+        "body": body.decode() or None,
+        "isBase64Encoded": False,
+    }
+
+
+def lambda_context() -> SimpleNamespace:
+    return SimpleNamespace(
+        aws_request_id=str(uuid.uuid4()),
+        function_name=f"{settings.app_name}-load-test",
+        invoked_function_arn="arn:aws:lambda:eu-central-1:123456789012:function:load",
+        memory_limit_in_mb=1024,
+    )
+
+
+def drive_handler(
+    handler: Callable[[dict[str, Any], Any], dict[str, Any]],
+    requests: list[Request],
+) -> tuple[list[float], int, float]:
+    from app.dynamodb import get_dynamodb_client
+
+    # a Lambda execution environment serves one invocation at a time on the loop
+    # that api_handler sets up during the init phase
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    latencies = []
+    errors = 0
+    started_at = time.perf_counter()
+    try:
+        for request in requests:
+            event = api_gateway_event(*request)
+            invoked_at = time.perf_counter()
+            response = handler(event, lambda_context())
+            latencies.append((time.perf_counter() - invoked_at) * 1000)
+            errors += not 200 <= response["statusCode"] < 300
+        return latencies, errors, time.perf_counter() - started_at
+    finally:
+        loop.run_until_complete(get_dynamodb_client().close())
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict[str, float]:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "rps": len(latencies) / elapsed,
+    }
+
+
+def report(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]] | None = None,
+):
+    print(
+        f"{'target':<8} {'endpoint':<11} {'requests':>8} {'errors':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rps':>8}"
+        + (f" {'p99 diff':>9} {'rps diff':>9}" if baseline else "")
+    )
+    for target, endpoints in results.items():
+        for endpoint, result in endpoints.items():
+            line = (
+                f"{target:<8} {endpoint:<11} {result['requests']:>8} "
+                f"{result['errors']:>6} {result['p50']:>8.1f} {result['p95']:>8.1f} "
+                f"{result['p99']:>8.1f} {result['rps']:>8.1f}"
+            )
+            previous = (baseline or {}).get(target, {}).get(endpoint)
+            if previous:
+                line += (
+                    f" {(result['p99'] / previous['p99'] - 1) * 100:>+8.1f}%"
+                    f" {(result['rps'] / previous['rps'] - 1) * 100:>+8.1f}%"
+                )
+            print(line)
+
+
+def run_uvicorn(app: Any, requests: dict[str, list[Request]], concurrency: int):
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        return {
+            endpoint: summarize(
+                *asyncio.run(
+                    drive_uvicorn(
+                        f"http://127.0.0.1:{port}", endpoint_requests, concurrency
+                    )
+                )
+            )
+            for endpoint, endpoint_requests in requests.items()
+        }
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Load-test the auth endpoints against a local DynamoDB stand-in"
+    )
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=TARGETS)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4, help="uvicorn only")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="milliseconds added per DynamoDB call"
+    )
+    parser.add_argument(
+        "--dynamodb-endpoint-url", help="e.g. DynamoDB Local, defaults to moto"
+    )
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="overwrite the baseline file"
+    )
+    args = parser.parse_args(argv)
+
+    # app.settings already created the service logger, later instances share it
+    os.environ["LOG_LEVEL"] = args.log_level
+    Logger().setLevel(args.log_level)
+    os.environ.setdefault("POWERTOOLS_METRICS_DISABLED", "true")
+    moto_server, moto_url = start_moto_server()
+    dynamodb_endpoint_url = settings.dynamodb_endpoint_url
+    login_bucket_capacities = (
+        settings.login_account_bucket_capacity,
+        settings.login_ip_bucket_capacity,
+    )
+    # every login comes from one address and reuses a few accounts, the local
+    # buckets would turn the run into a 429 benchmark, the lockout check stays on
+    settings.login_account_bucket_capacity = None
+    settings.login_ip_bucket_capacity = None
+    try:
+        put_jwt_secret(moto_url)
+        upstream_url = args.dynamodb_endpoint_url or moto_url
+        create_tables(upstream_url)
+        with LatencyProxy(upstream_url, args.latency / 1000) as proxy:
+            settings.dynamodb_endpoint_url = proxy.url
+            from app.api_handler import app, handler
+
+            users = asyncio.run(seed_users(args.users))
+            results = {}
+            for target in args.targets:
+                # refresh and logout consume their tokens, every target gets its own
+                requests = {
+                    endpoint: asyncio.run(
+                        build_requests(endpoint, users, args.requests)
+                    )
+                    for endpoint in args.endpoints
+                }
+                if target == "uvicorn":
+                    results[target] = run_uvicorn(app, requests, args.concurrency)
+                else:
+                    results[target] = {
+                        endpoint: summarize(*drive_handler(handler, endpoint_requests))
+                        for endpoint, endpoint_requests in requests.items()
+                    }
+    finally:
+        settings.dynamodb_endpoint_url = dynamodb_endpoint_url
+        (
+            settings.login_account_bucket_capacity,
+            settings.login_ip_bucket_capacity,
+        ) = login_bucket_capacities
+        moto_server.shutdown()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    report(results, baseline)
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Callable
+
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.middleware.exceptions import ExceptionMiddleware
+from starlette.types import ASGIApp, Message, Scope
+
+from app.middlewares import (
+    X_CORRELATION_ID,
+    CompressionMiddleware,
+    CorrelationIdMiddleware,
+    TimingMiddleware,
+)
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/health",
+    "raw_path": b"/health",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"accept-encoding", b"gzip"), (b"host", b"localhost")],
+    "client": ("127.0.0.1", 12345),
+    "server": ("localhost", 8080),
+}
+
+
+class BaseHTTPCorrelationIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        response = await call_next(request)
+        response.headers[X_CORRELATION_ID] = "correlation-id"
+        return response
+
+
+def add_base_http_correlation_id_middleware(app: FastAPI):
+    app.add_middleware(BaseHTTPCorrelationIdMiddleware)
+
+
+def add_compression_middleware(app: FastAPI):
+    app.add_middleware(CompressionMiddleware)
+
+
+def add_correlation_id_middleware(app: FastAPI):
+    app.add_middleware(CorrelationIdMiddleware)
+
+
+def add_exception_middleware(app: FastAPI):
+    app.add_middleware(ExceptionMiddleware, handlers=app.exception_handlers)
+
+
+def add_timing_middleware(app: FastAPI):
+    app.add_middleware(TimingMiddleware, header=True)
+
+
+# every stack is its parent plus one layer, added in the order api_handler adds them
+STACKS: list[tuple[str, str | None, list[Callable[[FastAPI], None]]]] = [
+    ("bare", None, []),
+    (
+        "correlation (BaseHTTPMiddleware)",
+        "bare",
+        [add_base_http_correlation_id_middleware],
+    ),
+    ("correlation", "bare", [add_correlation_id_middleware]),
+    (
+        "correlation + compression",
+        "correlation",
+        [add_correlation_id_middleware, add_compression_middleware],
+    ),
+    (
+        "correlation + compression + exceptions",
+        "correlation + compression",
+        [
+            add_correlation_id_middleware,
+            add_compression_middleware,
+            add_exception_middleware,
+        ],
+    ),
+    (
+        "correlation + compression + exceptions + timing",
+        "correlation + compression + exceptions",
+        [
+            add_correlation_id_middleware,
+            add_compression_middleware,
+            add_exception_middleware,
+            add_timing_middleware,
+        ],
+    ),
+]
+
+
+def build_app(layers: list[Callable[[FastAPI], None]]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    for add_layer in layers:
+        add_layer(app)
+    return app
+
+
+async def measure(
+    app: ASGIApp, requests: int, scope: Scope | None = None
+) -> list[float]:
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message):
+        pass
+
+    latencies = []
+    for _ in range(requests):
+        started_at = time.perf_counter()
+        await app(dict(scope or SCOPE), receive, send)
+        latencies.append((time.perf_counter() - started_at) * 1_000_000)
+    return latencies
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Measure the per-request overhead of each middleware layer"
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    apps = {name: build_app(layers) for name, _, layers in STACKS}
+    latencies: dict[str, list[float]] = {name: [] for name in apps}
+    for _ in range(args.rounds):
+        # interleave the stacks so that noise hits all of them alike
+        for name, app in apps.items():
+            latencies[name] += asyncio.run(
+                measure(app, max(args.requests // args.rounds, 1))
+            )
+
+    p50s = {name: statistics.median(values) for name, values in latencies.items()}
+    print(f"{'stack':<47} {'p50 us':>8} {'mean us':>8} {'layer us':>9}")
+    for name, parent, _ in STACKS:
+        layer = p50s[name] - p50s[parent] if parent else 0.0
+        print(
+            f"{name:<47} {p50s[name]:>8.1f} "
+            f"{statistics.fmean(latencies[name]):>8.1f} {layer:>+9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
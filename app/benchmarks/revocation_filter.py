@@ -0,0 +1,79 @@
+import argparse
+import bisect
+import time
+import tracemalloc
+import uuid
+
+from app.revocation_filter import BloomFilter
+
+ERROR_RATES = (0.01, 0.001, 0.0001)
+
+
+def measure_bloom_filter(
+    revoked: list[str], probes: list[str], error_rate: float
+) -> dict[str, float]:
+    bloom_filter = BloomFilter(len(revoked), error_rate)
+    started = time.perf_counter_ns()
+    for jti in revoked:
+        bloom_filter.add(jti)
+    added = time.perf_counter_ns()
+    false_positives = sum(jti in bloom_filter for jti in probes)
+    probed = time.perf_counter_ns()
+    return {
+        "bytes": bloom_filter.nbytes,
+        "false_positive_rate": false_positives / len(probes),
+        "add_ns": (added - started) / len(revoked),
+        "lookup_ns": (probed - added) / len(probes),
+    }
+
+
+def measure_sorted_jtis(revoked: list[str], probes: list[str]) -> dict[str, float]:
+    tracemalloc.start()
+    started = time.perf_counter_ns()
+    jtis = sorted(uuid.UUID(jti).bytes for jti in revoked)
+    added = time.perf_counter_ns()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for jti in probes:
+        key = uuid.UUID(jti).bytes
+        index = bisect.bisect_left(jtis, key)
+        assert index == len(jtis) or jtis[index] != key
+    probed = time.perf_counter_ns()
+    return {
+        "bytes": size,
+        "false_positive_rate": 0.0,
+        "add_ns": (added - started) / len(revoked),
+        "lookup_ns": (probed - added) / len(probes),
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Report the false-positive rate and memory of revocation filters"
+    )
+    parser.add_argument("--revoked", type=int, default=1000000)
+    parser.add_argument("--probes", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    revoked = [str(uuid.uuid4()) for _ in range(args.revoked)]
+    probes = [str(uuid.uuid4()) for _ in range(args.probes)]
+    results = {
+        f"bloom filter, p={error_rate}": measure_bloom_filter(
+            revoked, probes, error_rate
+        )
+        for error_rate in ERROR_RATES
+    }
+    results["sorted list of jti bytes"] = measure_sorted_jtis(revoked, probes)
+
+    print(f"{args.revoked} revoked tokens, {args.probes} unrevoked probes")
+    print(f"{'structure':<24} {'MiB':>8} {'FPR':>9} {'add ns':>8} {'lookup ns':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<24} {result['bytes'] / 2**20:>8.2f} "
+            f"{result['false_positive_rate']:>9.5f} {result['add_ns']:>8.0f} "
+            f"{result['lookup_ns']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
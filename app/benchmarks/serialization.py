@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import json
+import secrets
+import statistics
+import timeit
+from collections.abc import Callable
+
+from fastapi import FastAPI, Response, status
+from fastapi.encoders import jsonable_encoder
+
+from app.benchmarks.middlewares import SCOPE, measure
+from app.jwt_bearer import ERROR_MESSAGE_NOT_AUTHENTICATED
+from app.models.response.error import ErrorResponse
+from app.models.response.token import TokenResponse
+from app.serialization import encode_error, token_response, token_response_adapter
+
+ACCESS_TOKEN = secrets.token_urlsafe(300)
+REFRESH_TOKEN = secrets.token_hex(16)
+
+
+def _build_token() -> TokenResponse:
+    return TokenResponse(
+        access_token=ACCESS_TOKEN, refresh_token=REFRESH_TOKEN, expires_in=3600
+    )
+
+
+# the serializers the handlers and routes used before, next to their replacements
+SERIALIZERS: dict[str, Callable[[], bytes]] = {
+    "token, jsonable_encoder + json": lambda: json.dumps(
+        jsonable_encoder(_build_token())
+    ).encode(),
+    "token, type adapter": lambda: token_response_adapter.dump_json(_build_token()),
+    "error, model_dump + json": lambda: json.dumps(
+        ErrorResponse(
+            status=status.HTTP_403_FORBIDDEN, error=ERROR_MESSAGE_NOT_AUTHENTICATED
+        ).model_dump(by_alias=True)
+    ).encode(),
+    "error, type adapter": lambda: encode_error(
+        status.HTTP_403_FORBIDDEN, "Not authenticated yet"
+    ),
+    "error, pre-encoded": lambda: encode_error(
+        status.HTTP_403_FORBIDDEN, ERROR_MESSAGE_NOT_AUTHENTICATED
+    ),
+}
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/response-model")
+    async def response_model() -> TokenResponse:
+        return _build_token()
+
+    @app.get("/type-adapter", response_model=TokenResponse)
+    async def type_adapter() -> Response:
+        return token_response(ACCESS_TOKEN, REFRESH_TOKEN, 3600)
+
+    return app
+
+
+ROUTES = {
+    "route, response_model": "/response-model",
+    "route, type adapter": "/type-adapter",
+}
+
+
+def time_serializer(serializer: Callable[[], bytes], number: int) -> float:
+    return min(timeit.repeat(serializer, number=number, repeat=5)) / number * 1e9
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Compare the token and error response serialization paths"
+    )
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    for name, serializer in SERIALIZERS.items():
+        print(f"{name:<32} {time_serializer(serializer, args.number):>9.0f} ns")
+
+    app = build_app()
+    for name, path in ROUTES.items():
+        scope = {**SCOPE, "path": path, "raw_path": path.encode()}
+        asyncio.run(measure(app, min(args.requests, 100), scope))
+        p50 = statistics.median(asyncio.run(measure(app, args.requests, scope)))
+        print(f"{name:<32} {p50:>9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import argparse
+import json
+import logging
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.logging.formatter import LambdaPowertoolsFormatter
+
+from app.benchmarks.load import api_gateway_event
+from app.models.jwt import JWTToken
+from app.structured_logging import (
+    RedactingFormatter,
+    SamplingFilter,
+    loads_json_document,
+)
+
+
+class NullStream:
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def build_token() -> JWTToken:
+    user_id = str(uuid.uuid4())
+    return JWTToken(
+        exp=1700003600,
+        iat=1700000000,
+        jti=str(uuid.uuid4()),
+        sub=user_id,
+        user={
+            "id": user_id,
+            "email": "root@netcode.hu",
+            "username": "root",
+            "display_name": "Root",
+        },
+    )
+
+
+def build_event() -> dict:
+    return api_gateway_event(
+        "POST",
+        "/api/v1/refresh",
+        {"Content-Type": "application/json", "Authorization": "Bearer eyJ.eyJ.sig"},
+        json.dumps({"refreshToken": "a" * 32}).encode(),
+    )
+
+
+def eager_request(logger: Logger, event: dict, jwt_token: JWTToken):
+    # the logging of a /refresh request before lazy formatting and redaction
+    logger.info(event)
+    logger.debug(f"Token is not blacklisted {jwt_token=}")
+    logger.info(
+        f"Generate new tokens for user={jwt_token.sub}", extra={"user": jwt_token.user}
+    )
+
+
+def lazy_request(logger: Logger, event: dict, jwt_token: JWTToken):
+    logger.debug("Token is not blacklisted jti=%s", jwt_token.jti)
+    logger.info(
+        "Generate new tokens for user=%s", jwt_token.sub, extra={"sub": jwt_token.sub}
+    )
+
+
+def build_logger(
+    formatter: LambdaPowertoolsFormatter,
+    level: str = "INFO",
+    level_rates: dict[str, float] | None = None,
+) -> Logger:
+    logger = Logger(
+        service=f"benchmark-{uuid.uuid4()}",
+        level=level,
+        logger_handler=logging.StreamHandler(NullStream()),
+        logger_formatter=formatter,
+    )
+    if level_rates is not None:
+        logger.addFilter(SamplingFilter(level_rates))
+    return logger
+
+
+def redacting_formatter() -> RedactingFormatter:
+    return RedactingFormatter(json_deserializer=loads_json_document, utc=True)
+
+
+SCENARIOS: list[tuple[str, Callable[[], Logger], Callable[..., None]]] = [
+    (
+        "eager + event",
+        lambda: build_logger(LambdaPowertoolsFormatter(utc=True)),
+        eager_request,
+    ),
+    (
+        "eager + event, redacted",
+        lambda: build_logger(redacting_formatter()),
+        eager_request,
+    ),
+    ("lazy, redacted", lambda: build_logger(redacting_formatter()), lazy_request),
+    (
+        "lazy, redacted, INFO sampled 10%",
+        lambda: build_logger(redacting_formatter(), level_rates={"INFO": 0.1}),
+        lazy_request,
+    ),
+    (
+        "lazy, WARNING level",
+        lambda: build_logger(redacting_formatter(), level="WARNING"),
+        lazy_request,
+    ),
+]
+
+
+def measure(
+    logger: Logger,
+    request: Callable[..., None],
+    event: dict,
+    jwt_token: JWTToken,
+    requests: int,
+) -> list[float]:
+    latencies = []
+    for _ in range(requests):
+        started_at = time.perf_counter()
+        request(logger, event, jwt_token)
+        latencies.append((time.perf_counter() - started_at) * 1_000_000)
+    return latencies
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Measure the per-request cost of logging a /refresh request"
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    event = build_event()
+    jwt_token = build_token()
+    loggers = {name: build_logger() for name, build_logger, _ in SCENARIOS}
+    latencies: dict[str, list[float]] = {name: [] for name, _, _ in SCENARIOS}
+    for _ in range(args.rounds):
+        # interleave the scenarios so that noise hits all of them alike
+        for name, _, request in SCENARIOS:
+            latencies[name] += measure(
+                loggers[name],
+                request,
+                event,
+                jwt_token,
+                max(args.requests // args.rounds, 1),
+            )
+
+    print(f"{'scenario':<34} {'p50 us':>8} {'mean us':>8}")
+    for name, values in latencies.items():
+        print(
+            f"{name:<34} {statistics.median(values):>8.1f} "
+            f"{statistics.fmean(values):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+import asyncio
+import functools
+import json
+import random
+import uuid
+import weakref
+from typing import Any
+
+import botocore.session
+import httpx
+from aws_lambda_powertools.metrics import MetricUnit
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import (
+    Credentials,
+    ReadOnlyCredentials,
+    RefreshableCredentials,
+)
+from botocore.exceptions import ClientError, HTTPClientError
+
+from app import settings
+from app.metrics import metrics
+from app.structured_logging import logger
+
+CONDITION_PARAMETERS = (
+    "ConditionExpression",
+    "FilterExpression",
+    "KeyConditionExpression",
+)
+BATCH_GET_ITEM_MAX_KEYS = 100
+BATCH_WRITE_ITEM_MAX_REQUESTS = 25
+CONTENT_TYPE = "application/x-amz-json-1.0"
+ITEM_PARAMETERS = ("ExclusiveStartKey", "Item", "Key")
+RETRYABLE_ERROR_CODES = {
+    "InternalServerError",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "ServiceUnavailable",
+    "ThrottlingException",
+}
+TARGET_PREFIX = "DynamoDB_20120810"
+
+_deserializer = TypeDeserializer()
+_serializer = TypeSerializer()
+
+
+def deserialize(item: dict[str, Any]) -> dict[str, Any]:
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def serialize(item: dict[str, Any]) -> dict[str, Any]:
+    return {key: _serializer.serialize(value) for key, value in item.items()}
+
+
+def serialize_request(params: dict[str, Any]) -> dict[str, Any]:
+    params = dict(params)
+    builder = ConditionExpressionBuilder()
+    names = dict(params.pop("ExpressionAttributeNames", {}))
+    values = dict(params.pop("ExpressionAttributeValues", {}))
+
+    for parameter in CONDITION_PARAMETERS:
+        condition = params.get(parameter)
+        if isinstance(condition, ConditionBase):
+            expression = builder.build_expression(
+                condition, is_key_condition=parameter == "KeyConditionExpression"
+            )
+            params[parameter] = expression.condition_expression
+            names.update(expression.attribute_name_placeholders)
+            values.update(expression.attribute_value_placeholders)
+    for parameter in ITEM_PARAMETERS:
+        if parameter in params:
+            params[parameter] = serialize(params[parameter])
+    if names:
+        params["ExpressionAttributeNames"] = names
+    if values:
+        params["ExpressionAttributeValues"] = serialize(values)
+
+    return params
+
+
+def deserialize_response(response: dict[str, Any]) -> dict[str, Any]:
+    for parameter in ("Attributes", "Item", "LastEvaluatedKey"):
+        if parameter in response:
+            response[parameter] = deserialize(response[parameter])
+    if "Items" in response:
+        response["Items"] = [deserialize(item) for item in response["Items"]]
+    if "Responses" in response:
+        response["Responses"] = {
+            table_name: [deserialize(item) for item in items]
+            for table_name, items in response["Responses"].items()
+        }
+    for request in response.get("UnprocessedKeys", {}).values():
+        request["Keys"] = [deserialize(key) for key in request["Keys"]]
+    for requests in response.get("UnprocessedItems", {}).values():
+        for request in requests:
+            for params in request.values():
+                for parameter in ("Item", "Key"):
+                    if parameter in params:
+                        params[parameter] = deserialize(params[parameter])
+
+    return response
+
+
+class DynamoDBClient:
+    def __init__(
+        self,
+        endpoint_url: str | None = None,
+        region_name: str | None = None,
+        max_attempts: int = 3,
+        timeout: float = 5,
+        connect_timeout: float | None = None,
+        max_connections: int = 10,
+        keepalive_expiry: float = 60,
+        retry_base_delay: float = 0.05,
+    ):
+        self._endpoint_url = endpoint_url
+        self._region_name = region_name
+        self._resolved: tuple[Credentials, str, str] | None = None
+        self._http_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = weakref.WeakKeyDictionary()
+        self._in_flight = 0
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._max_attempts = max_attempts
+        self._max_connections = max_connections
+        self._retry_base_delay = retry_base_delay
+        self._timeout = httpx.Timeout(timeout, connect=connect_timeout or timeout)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def max_attempts(self) -> int:
+        return self._max_attempts
+
+    @property
+    def max_connections(self) -> int:
+        return self._max_connections
+
+    async def backoff(self, attempt: int):
+        await asyncio.sleep(random.uniform(0, self._retry_base_delay * 2**attempt))
+
+    async def close(self):
+        http_client = self._http_clients.pop(asyncio.get_running_loop(), None)
+        if http_client is not None:
+            await http_client.aclose()
+
+    async def request(self, operation: str, params: dict[str, Any]) -> dict[str, Any]:
+        body = json.dumps(params)
+        attempt = 1
+        while True:
+            try:
+                response = await self._send(operation, body)
+            except httpx.TransportError as err:
+                if attempt >= self._max_attempts:
+                    raise HTTPClientError(error=err) from err
+            else:
+                data = self._parse_response(response)
+                if response.is_success:
+                    data["ResponseMetadata"] = {"HTTPStatusCode": response.status_code}
+                    return data
+                error_code = data.pop("__type", "").rsplit("#", 1)[-1]
+                if attempt >= self._max_attempts or not (
+                    response.is_server_error or error_code in RETRYABLE_ERROR_CODES
+                ):
+                    raise ClientError(
+                        {
+                            "Error": {
+                                "Code": error_code,
+                                "Message": data.pop("message", data.pop("Message", "")),
+                            },
+                            "ResponseMetadata": {
+                                "HTTPStatusCode": response.status_code
+                            },
+                            **data,
+                        },
+                        operation,
+                    )
+            await self.backoff(attempt)
+            attempt += 1
+
+    def table(self, name: str) -> "Table":
+        return Table(self, name)
+
+    async def transact_write_items(
+        self, transact_items: list[dict[str, dict[str, Any]]]
+    ) -> dict[str, Any]:
+        try:
+            return await self.request(
+                "TransactWriteItems",
+                {
+                    "ClientRequestToken": str(uuid.uuid4()),
+                    "TransactItems": [
+                        {
+                            operation: serialize_request(params)
+                            for operation, params in transact_item.items()
+                        }
+                        for transact_item in transact_items
+                    ],
+                },
+            )
+        except ClientError as err:
+            for reason in err.response.get("CancellationReasons", []):
+                if "Item" in reason:
+                    reason["Item"] = deserialize(reason["Item"])
+            raise
+
+    async def warm_up(self, connections: int = 1) -> int:
+        _, _, endpoint_url = await self._get_credentials()
+        http_client = self._get_http_client()
+        results = await asyncio.gather(
+            *(http_client.get(endpoint_url) for _ in range(connections)),
+            return_exceptions=True,
+        )
+        warmed = sum(not isinstance(result, Exception) for result in results)
+        if warmed < connections:
+            logger.warning("Warmed %d of %d DynamoDB connections", warmed, connections)
+        metrics.add_metric(
+            name="DynamoDBWarmConnections", unit=MetricUnit.Count, value=warmed
+        )
+        return warmed
+
+    def _resolve(self) -> tuple[Credentials, str, str]:
+        if self._resolved is None:
+            session = botocore.session.get_session()
+            region_name = self._region_name or session.get_config_variable("region")
+            self._resolved = (
+                session.get_credentials(),
+                region_name,
+                self._endpoint_url or f"https://dynamodb.{region_name}.amazonaws.com",
+            )
+        return self._resolved
+
+    async def _get_credentials(self) -> tuple[ReadOnlyCredentials, str, str]:
+        # resolving and refreshing credentials may block on IMDS or STS
+        if self._resolved is None:
+            await asyncio.to_thread(self._resolve)
+        credentials, region_name, endpoint_url = self._resolve()
+        if (
+            isinstance(credentials, RefreshableCredentials)
+            and credentials.refresh_needed()
+        ):
+            frozen_credentials = await asyncio.to_thread(
+                credentials.get_frozen_credentials
+            )
+        else:
+            frozen_credentials = credentials.get_frozen_credentials()
+        return frozen_credentials, region_name, endpoint_url
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        http_client = self._http_clients.get(loop)
+        if http_client is None:
+            http_client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+            self._http_clients[loop] = http_client
+        return http_client
+
+    def _parse_response(self, response: httpx.Response) -> dict[str, Any]:
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+
+    async def _send(self, operation: str, body: str) -> httpx.Response:
+        credentials, region_name, endpoint_url = await self._get_credentials()
+        request = AWSRequest(
+            method="POST",
+            url=endpoint_url,
+            data=body,
+            headers={
+                "Content-Type": CONTENT_TYPE,
+                "X-Amz-Target": f"{TARGET_PREFIX}.{operation}",
+            },
+        )
+        SigV4Auth(credentials, "dynamodb", region_name).add_auth(request)
+
+        self._in_flight += 1
+        if self._in_flight > self._max_connections:
+            metrics.add_metric(
+                name="DynamoDBPoolSaturated", unit=MetricUnit.Count, value=1
+            )
+        try:
+            return await self._get_http_client().post(
+                endpoint_url, content=body, headers=dict(request.headers.items())
+            )
+        finally:
+            self._in_flight -= 1
+
+
+class Table:
+    def __init__(self, client: DynamoDBClient, name: str):
+        self._client = client
+        self.name = name
+
+    async def batch_get_item(
+        self, keys: list[dict[str, Any]], **kwargs
+    ) -> dict[str, Any]:
+        items = []
+        unprocessed_keys = []
+        for start in range(0, len(keys), BATCH_GET_ITEM_MAX_KEYS):
+            batch = [
+                serialize(key) for key in keys[start : start + BATCH_GET_ITEM_MAX_KEYS]
+            ]
+            attempt = 1
+            while True:
+                response = await self._client.request(
+                    "BatchGetItem",
+                    {"RequestItems": {self.name: {"Keys": batch, **kwargs}}},
+                )
+                items.extend(response["Responses"].get(self.name, []))
+                batch = (
+                    response.get("UnprocessedKeys", {})
+                    .get(self.name, {})
+                    .get("Keys", [])
+                )
+                if not batch:
+                    break
+                if attempt >= self._client.max_attempts:
+                    unprocessed_keys.extend(batch)
+                    break
+                await self._client.backoff(attempt)
+                attempt += 1
+        response = {"Responses": {self.name: items}}
+        if unprocessed_keys:
+            response["UnprocessedKeys"] = {self.name: {"Keys": unprocessed_keys}}
+        return deserialize_response(response)
+
+    async def batch_write_item(
+        self, requests: list[dict[str, dict[str, Any]]]
+    ) -> dict[str, Any]:
+        semaphore = asyncio.Semaphore(self._client.max_connections)
+
+        async def write(batch: list[dict[str, dict[str, Any]]]) -> list[dict]:
+            async with semaphore:
+                attempt = 1
+                while True:
+                    response = await self._client.request(
+                        "BatchWriteItem", {"RequestItems": {self.name: batch}}
+                    )
+                    batch = response.get("UnprocessedItems", {}).get(self.name, [])
+                    if not batch or attempt >= self._client.max_attempts:
+                        return batch
+                    await self._client.backoff(attempt)
+                    attempt += 1
+
+        unprocessed_items = await asyncio.gather(
+            *(
+                write(
+                    [
+                        {
+                            operation: serialize_request(params)
+                            for operation, params in request.items()
+                        }
+                        for request in requests[
+                            start : start + BATCH_WRITE_ITEM_MAX_REQUESTS
+                        ]
+                    ]
+                )
+                for start in range(0, len(requests), BATCH_WRITE_ITEM_MAX_REQUESTS)
+            )
+        )
+        response = {}
+        if any(unprocessed_items):
+            response["UnprocessedItems"] = {
+                self.name: [item for batch in unprocessed_items for item in batch]
+            }
+        return deserialize_response(response)
+
+    async def delete_item(self, **kwargs) -> dict[str, Any]:
+        return await self._request("DeleteItem", kwargs)
+
+    async def get_item(self, **kwargs) -> dict[str, Any]:
+        return await self._request("GetItem", kwargs)
+
+    async def put_item(self, **kwargs) -> dict[str, Any]:
+        return await self._request("PutItem", kwargs)
+
+    async def query(self, **kwargs) -> dict[str, Any]:
+        return await self._request("Query", kwargs)
+
+    async def scan(self, **kwargs) -> dict[str, Any]:
+        return await self._request("Scan", kwargs)
+
+    async def update_item(self, **kwargs) -> dict[str, Any]:
+        return await self._request("UpdateItem", kwargs)
+
+    async def _request(self, operation: str, params: dict[str, Any]) -> dict[str, Any]:
+        return deserialize_response(
+            await self._client.request(
+                operation, serialize_request({"TableName": self.name, **params})
+            )
+        )
+
+
+@functools.cache
+def get_dynamodb_client() -> DynamoDBClient:
+    return DynamoDBClient(
+        settings.dynamodb_endpoint_url,
+        max_attempts=settings.dynamodb_max_attempts,
+        timeout=settings.dynamodb_timeout,
+        connect_timeout=settings.dynamodb_connect_timeout,
+        max_connections=settings.dynamodb_max_connections,
+        keepalive_expiry=settings.dynamodb_keepalive_expiry,
+        retry_base_delay=settings.dynamodb_retry_base_delay,
+    )
@@ -0,0 +1,41 @@
+from aws_lambda_powertools.metrics import MetricUnit
+from fastapi import status
+
+from app import settings
+from app.metrics import metrics
+from app.structured_logging import logger, sample_request
+
+EXPECTED_ERROR_CLASSES = {
+    status.HTTP_401_UNAUTHORIZED: "Unauthorized",
+    status.HTTP_403_FORBIDDEN: "Forbidden",
+    status.HTTP_404_NOT_FOUND: "NotFound",
+    status.HTTP_409_CONFLICT: "Conflict",
+    status.HTTP_422_UNPROCESSABLE_ENTITY: "ValidationFailed",
+    status.HTTP_429_TOO_MANY_REQUESTS: "TooManyRequests",
+}
+EXPIRED_TOKEN = "ExpiredToken"
+INVALID_TOKEN = "InvalidToken"
+CLIENT_ERROR = "ClientError"
+SERVER_ERROR = "ServerError"
+
+
+def classify(status_code: int) -> str:
+    if status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+        return SERVER_ERROR
+    return EXPECTED_ERROR_CLASSES.get(status_code, CLIENT_ERROR)
+
+
+def is_expected(error_class: str) -> bool:
+    return error_class not in (CLIENT_ERROR, SERVER_ERROR)
+
+
+def record_error(error_class: str, msg: str, *args: object):
+    metrics.add_metric(name=f"{error_class}Errors", unit=MetricUnit.Count, value=1)
+    # only server errors pay for the traceback, expected outcomes are counted and
+    # logged through the sampled path
+    if error_class == SERVER_ERROR:
+        logger.exception(msg, *args, stacklevel=3, extra={"error_class": error_class})
+    elif not is_expected(error_class):
+        logger.warning(msg, *args, stacklevel=3, extra={"error_class": error_class})
+    elif sample_request(settings.log_expected_error_sample_rate):
+        logger.info(msg, *args, stacklevel=3, extra={"error_class": error_class})
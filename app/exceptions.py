@@ -30,3 +30,21 @@ class TokenNotFoundException(NotFoundException):
 
 class UserAlreadyExistsException(AlreadyExistsException):
     pass
+
+
+class ServiceUnavailableException(HTTPException):
+    def __init__(self, detail: Any, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class TooManyRequestsException(HTTPException):
+    def __init__(self, detail: Any, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
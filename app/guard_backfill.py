@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+from app import settings
+from app.dynamodb import Table, get_dynamodb_client
+from app.repositories.user_repository import EMAIL_GUARD_PREFIX, USERNAME_GUARD_PREFIX
+
+
+async def put_guard(table: Table, guard_key: str, user_id: str) -> bool:
+    try:
+        await table.put_item(
+            Item={"id": guard_key, "user_id": user_id},
+            ConditionExpression=Attr("id").not_exists() | Attr("user_id").eq(user_id),
+        )
+    except ClientError as err:
+        if err.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        print(f"{guard_key} already belongs to another user, {user_id=}")
+        return False
+    return True
+
+
+async def backfill(table: Table) -> dict[str, int]:
+    counts = {"users": 0, "soft_deleted": 0, "guards": 0, "conflicts": 0}
+    params = {
+        "ExpressionAttributeNames": {
+            "#deleted_at": "deleted_at",
+            "#email": "email",
+            "#id": "id",
+            "#username": "username",
+        },
+        "FilterExpression": Attr("email").exists(),
+        "ProjectionExpression": "#id, #email, #username, #deleted_at",
+    }
+    while True:
+        response = await table.scan(**params)
+        for user in response["Items"]:
+            counts["users"] += 1
+            if user.get("deleted_at") is not None:
+                counts["soft_deleted"] += 1
+                continue
+            for guard_key in (
+                f"{EMAIL_GUARD_PREFIX}{user['email']}",
+                f"{USERNAME_GUARD_PREFIX}{user['username']}",
+            ):
+                if await put_guard(table, guard_key, user["id"]):
+                    counts["guards"] += 1
+                else:
+                    counts["conflicts"] += 1
+        if "LastEvaluatedKey" not in response:
+            return counts
+        params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Create the email and username guard items of existing users"
+    )
+    parser.add_argument("--table", default=f"{settings.stage}-users")
+    args = parser.parse_args(argv)
+
+    counts = asyncio.run(backfill(get_dynamodb_client().table(args.table)))
+
+    print(
+        f"Scanned {counts['users']} users ({counts['soft_deleted']} soft deleted), "
+        f"wrote {counts['guards']} guards, {counts['conflicts']} conflicts"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,23 @@
-import jwt
-from aws_lambda_powertools import Logger
+import asyncio
+
 from fastapi import HTTPException, Request, status
 from fastapi.security.http import (
     HTTPAuthorizationCredentials,
     HTTPBearer as FastAPIHTTPBearer,
 )
 from fastapi.security.utils import get_authorization_scheme_param
-from jwt import DecodeError, ExpiredSignatureError
+from jwt import ExpiredSignatureError, InvalidTokenError
 
 from app import settings
+from app.error_classification import EXPIRED_TOKEN, INVALID_TOKEN, record_error
 from app.models.jwt import JWTToken
+from app.revocation_filter import revocation_filter
 from app.services.token_service import TokenService
+from app.signing_keys import decode_token
+from app.structured_logging import logger
+from app.token_cache import token_cache
 
-logger = Logger(utc=True)
-
+ERROR_MESSAGE_INVALID_CREDENTIALS = "Invalid authentication credentials"
 ERROR_MESSAGE_NOT_AUTHENTICATED = "Not authenticated"
 
 
@@ -51,12 +55,12 @@ class HTTPBearer(FastAPIHTTPBearer):
             else:
                 return None
         if scheme.lower() != "bearer":
-            logger.warning(f"Invalid {scheme=}")
+            logger.warning("Invalid scheme=%r", scheme)
 
             if self._auto_error:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Invalid authentication credentials",
+                    detail=ERROR_MESSAGE_INVALID_CREDENTIALS,
                 )
             else:
                 return None
@@ -83,12 +87,13 @@ class JWTBearer:
         self._auto_error = auto_error
         self._token_service = TokenService()
 
-    def __call__(self, request: Request) -> JWTToken | None:
+    async def __call__(self, request: Request) -> JWTToken | None:
         credentials = HTTPBearer(self._auto_error).__call__(request)
         if credentials:
-            if not self._validate_token(credentials.credentials):
+            decoded_token = await self._validate_token(credentials.credentials)
+            if decoded_token is None:
                 if self._auto_error:
-                    logger.warning(f"Invalid authentication token {credentials=}")
+                    logger.warning("Invalid authentication token")
 
                     raise HTTPException(
                         status_code=status.HTTP_403_FORBIDDEN,
@@ -97,25 +102,106 @@ class JWTBearer:
                 else:
                     return None
 
-            return self.decoded_token
+            return decoded_token
         else:
             return None
 
-    def _validate_token(self, token: str) -> bool:
+    def _decode_token(self, token: str) -> JWTToken | None:
         try:
-            decoded_token = JWTToken(
-                **jwt.decode(token, settings.jwt_secret, algorithms=["HS256"])
+            return JWTToken(**decode_token(token))
+        except ExpiredSignatureError as err:
+            record_error(EXPIRED_TOKEN, "Expired signature err=%r", err)
+        except InvalidTokenError as err:
+            record_error(INVALID_TOKEN, "Invalid token err=%r", err)
+
+        return None
+
+    async def _get_cached_validity(self, decoded_token: JWTToken) -> bool | None:
+        sub = str(decoded_token.sub)
+        if settings.stateless_token_validation and await revocation_filter.sync(
+            self._token_service.get_revocations
+        ):
+            if decoded_token.iat < revocation_filter.revoked_before(sub):
+                return False
+            if decoded_token.jti not in revocation_filter:
+                logger.debug("Token is not revoked jti=%s", decoded_token.jti)
+
+                return True
+        is_cache_fresh = await token_cache.sync_revocation_epoch(
+            self._token_service.get_revocation_epoch
+        )
+        if not is_cache_fresh:
+            return None
+        is_valid = token_cache.get(decoded_token.jti)
+        if not is_valid:
+            return is_valid
+        revoked_before = token_cache.get_revoked_before(sub)
+        return None if revoked_before is None else decoded_token.iat >= revoked_before
+
+    def _accept(self, decoded_token: JWTToken, is_valid: bool) -> JWTToken | None:
+        if is_valid:
+            logger.debug("Token is not blacklisted jti=%s", decoded_token.jti)
+
+            return decoded_token
+        logger.debug("Token blacklisted jti=%s", decoded_token.jti)
+
+        return None
+
+    async def _validate_token(self, token: str) -> JWTToken | None:
+        decoded_token = self._decode_token(token)
+        if decoded_token is None:
+            return None
+        is_valid = await self._get_cached_validity(decoded_token)
+        if is_valid is None:
+            sub = str(decoded_token.sub)
+            stored_token, revoked_before = await asyncio.gather(
+                self._token_service.get_by_id(decoded_token.jti),
+                self._token_service.get_revoked_before([sub]),
+            )
+            token_cache.put(
+                decoded_token.jti, stored_token is not None, decoded_token.exp
+            )
+            token_cache.put_revoked_before(sub, revoked_before.get(sub, 0))
+            is_valid = stored_token is not None and decoded_token.iat >= (
+                revoked_before.get(sub, 0)
             )
-            if self._token_service.get_by_id(decoded_token.jti):
-                logger.debug(f"Token is not blacklisted {decoded_token=}")
 
-                self.decoded_token = decoded_token
+        return self._accept(decoded_token, is_valid)
 
-                return True
-            logger.debug(f"Token blacklisted {decoded_token=}")
-        except DecodeError as err:
-            logger.exception(f"Error occurred during token decoding {err=}")
-        except ExpiredSignatureError as err:
-            logger.exception(f"Expired signature {err=}")
+    async def validate_tokens(self, tokens: list[str]) -> list[JWTToken | None]:
+        decoded_tokens = [self._decode_token(token) for token in tokens]
+        validity: dict[str, bool | None] = {}
+        for decoded_token in decoded_tokens:
+            if decoded_token is not None and decoded_token.jti not in validity:
+                validity[decoded_token.jti] = await self._get_cached_validity(
+                    decoded_token
+                )
+        unknown_tokens = {
+            decoded_token.jti: decoded_token
+            for decoded_token in decoded_tokens
+            if decoded_token is not None and validity[decoded_token.jti] is None
+        }
+        if unknown_tokens:
+            subs = list(
+                dict.fromkeys(
+                    str(decoded_token.sub) for decoded_token in unknown_tokens.values()
+                )
+            )
+            existing_jtis, revoked_before = await asyncio.gather(
+                self._token_service.get_existing_ids(list(unknown_tokens)),
+                self._token_service.get_revoked_before(subs),
+            )
+            for sub in subs:
+                token_cache.put_revoked_before(sub, revoked_before.get(sub, 0))
+            for jti, decoded_token in unknown_tokens.items():
+                token_cache.put(jti, jti in existing_jtis, decoded_token.exp)
+                validity[jti] = jti in existing_jtis and decoded_token.iat >= (
+                    revoked_before.get(str(decoded_token.sub), 0)
+                )
 
-        return False
+        return [
+            None
+            if decoded_token is None
+            else self._accept(decoded_token, bool(validity[decoded_token.jti]))
+            for decoded_token in decoded_tokens
+        ]
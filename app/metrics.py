@@ -0,0 +1,5 @@
+from aws_lambda_powertools import Metrics
+
+from app import settings
+
+metrics = Metrics(namespace=settings.app_name)
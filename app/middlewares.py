@@ -1,32 +1,153 @@
+import time
 import uuid
 from contextvars import ContextVar
 
-from aws_lambda_powertools import Logger
-from fastapi.requests import Request
-from fastapi.responses import Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.types import ASGIApp
+from aws_lambda_powertools.metrics import MetricUnit
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import settings
+from app.metrics import metrics
+from app.response_compression import (
+    get_encoders,
+    is_allowed_content_type,
+    is_compressible,
+    negotiate,
+)
+from app.structured_logging import logger, request_sampled, sample_request
+from app.timing import server_timing, spans
 
 X_CORRELATION_ID = "X-Correlation-ID"
 
 correlation_id: ContextVar[str] = ContextVar(X_CORRELATION_ID)
-logger = Logger(utc=True)
 
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
+class CorrelationIdMiddleware:
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
-
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        correlation_id.set(
-            request.headers.get(X_CORRELATION_ID)
-            or request.scope.get("aws.context", {}).aws_request_id
-            if request.scope.get("aws.context")
-            else str(uuid.uuid4())
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        aws_context = scope.get("aws.context")
+        value = (
+            Headers(scope=scope).get(X_CORRELATION_ID)
+            or (aws_context.aws_request_id if aws_context else None)
+            or str(uuid.uuid4())
+        )
+
+        async def send_with_correlation_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[X_CORRELATION_ID] = value
+            await send(message)
+
+        token = correlation_id.set(value)
+        # every log line of a request is kept or dropped together
+        sampled_token = request_sampled.set(
+            sample_request(settings.log_route_sample_rates.get(scope["path"]))
         )
-        logger.set_correlation_id(correlation_id.get())
-        response = await call_next(request)
-        response.headers[X_CORRELATION_ID] = correlation_id.get()
-        return response
+        logger.thread_safe_append_keys(correlation_id=value)
+        try:
+            await self.app(scope, receive, send_with_correlation_id)
+        finally:
+            logger.thread_safe_remove_keys(["correlation_id"])
+            request_sampled.reset(sampled_token)
+            correlation_id.reset(token)
+
+
+class TimingMiddleware:
+    def __init__(self, app: ASGIApp, header: bool | None = None):
+        self.app = app
+        self._header = settings.debug if header is None else header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recorded: dict[str, float] = {}
+        started_at = time.perf_counter()
+
+        async def send_with_server_timing(message: Message):
+            if message["type"] == "http.response.start" and self._header:
+                MutableHeaders(scope=message)["Server-Timing"] = server_timing(
+                    {**recorded, "total": (time.perf_counter() - started_at) * 1000}
+                )
+            await send(message)
+
+        token = spans.set(recorded)
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            spans.reset(token)
+            for name, duration in recorded.items():
+                metrics.add_metric(
+                    name=name, unit=MetricUnit.Milliseconds, value=duration
+                )
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int | None = None):
+        self.app = app
+        self._minimum_size = (
+            settings.compression_minimum_size if minimum_size is None else minimum_size
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        accept_encoding = (
+            Headers(scope=scope).get("Accept-Encoding")
+            if scope["type"] == "http"
+            else None
+        )
+        if not accept_encoding:
+            await self.app(scope, receive, send)
+            return
+
+        body_parts: list[bytes] = []
+        start_message: Message | None = None
+
+        async def send_compressed(message: Message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    is_compressible(scope.get("endpoint"))
+                    and "Content-Encoding" not in headers
+                    and is_allowed_content_type(headers.get("Content-Type", ""))
+                ):
+                    start_message = message
+                else:
+                    await send(message)
+                return
+            if start_message is None:
+                await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(start_message)
+                start_message = None
+                await send(message)
+                return
+
+            # routes that opt in return small JSON documents, so the body is
+            # buffered and compressed in one go
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(body_parts)
+            encoding = (
+                negotiate(accept_encoding, list(get_encoders()))
+                if len(body) >= self._minimum_size
+                else None
+            )
+            if encoding is not None:
+                body = get_encoders()[encoding](body)
+                headers = MutableHeaders(scope=start_message)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,7 @@
+from pydantic import Field
+
+from app.models.models import CamelModel
+
+
+class IntrospectionRequest(CamelModel):
+    tokens: list[str] = Field(min_length=1, max_length=100)
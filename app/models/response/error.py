@@ -1,13 +1,15 @@
 import time
 from collections.abc import Sequence
 
+from pydantic import Field
+
 from app.models.models import CamelModel
 
 
 class ErrorResponse(CamelModel):
     status: int
     error: str
-    timestamp: int = int(time.time())
+    timestamp: int = Field(default_factory=lambda: int(time.time()))
 
 
 class ValidationErrorResponse(ErrorResponse):
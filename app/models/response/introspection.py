@@ -0,0 +1,17 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    exp: int | None = None
+    iat: int | None = None
+    iss: str | None = None
+    jti: str | None = None
+    sub: Any = None
+    username: str | None = None
+
+
+class IntrospectionResponse(BaseModel):
+    results: list[TokenIntrospection]
@@ -1,4 +1,6 @@
-from pydantic import EmailStr
+import argon2
+from argon2.exceptions import InvalidHashError
+from pydantic import EmailStr, field_validator, model_validator
 
 from app.models.models import CamelModel
 
@@ -12,3 +14,27 @@ class User(CamelModel):
     created_at: str
     deleted_at: str | None = None
     updated_at: str | None = None
+
+
+class UserImportRecord(CamelModel):
+    email: EmailStr
+    username: str
+    password: str | None = None
+    password_hash: str | None = None
+    display_name: str | None = None
+
+    @field_validator("password_hash", mode="after")
+    @staticmethod
+    def is_argon2_hash(value: str | None) -> str | None:
+        if value is not None:
+            try:
+                argon2.extract_parameters(value)
+            except InvalidHashError:
+                raise ValueError("Not an Argon2 hash") from None
+        return value
+
+    @model_validator(mode="after")
+    def has_one_password(self) -> "UserImportRecord":
+        if (self.password is None) == (self.password_hash is None):
+            raise ValueError("Exactly one of password and passwordHash is required")
+        return self
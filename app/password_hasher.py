@@ -0,0 +1,118 @@
+import asyncio
+import multiprocessing
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from argon2 import PasswordHasher
+from aws_lambda_powertools.metrics import MetricUnit
+
+from app import settings
+from app.exceptions import ServiceUnavailableException
+from app.metrics import metrics
+from app.timing import timed
+
+ERROR_MESSAGE_SERVICE_UNAVAILABLE = "Service Unavailable"
+
+
+def _hash(password_hasher: PasswordHasher, password: str) -> str:
+    return password_hasher.hash(password)
+
+
+def _verify(password_hasher: PasswordHasher, password_hash: str, password: str) -> bool:
+    return password_hasher.verify(password_hash, password)
+
+
+class PasswordHashingExecutor:
+    def __init__(
+        self,
+        password_hasher: PasswordHasher | None = None,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        use_processes: bool = False,
+    ):
+        self._executor: Executor = (
+            ProcessPoolExecutor(
+                max_workers, mp_context=multiprocessing.get_context("forkserver")
+            )
+            if use_processes
+            else ThreadPoolExecutor(max_workers, thread_name_prefix="password-hasher")
+        )
+        self._lock = threading.Lock()
+        self._max_pending = max_pending
+        self._max_workers = max_workers
+        self._password_hasher = password_hasher or PasswordHasher()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def password_hasher(self) -> PasswordHasher:
+        return self._password_hasher
+
+    @timed("password_hasher.hash")
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self._password_hasher.check_needs_rehash(password_hash)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def warm_up(self):
+        password = secrets.token_urlsafe(16)
+        await asyncio.gather(
+            *(
+                self.hash(password)
+                for _ in range(min(self._max_workers, self._max_pending))
+            )
+        )
+
+    @timed("password_hasher.verify")
+    async def verify(self, password_hash: str, password: str) -> bool:
+        return await self._submit(_verify, password_hash, password)
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self._max_pending:
+                metrics.add_metric(
+                    name="PasswordHasherRejected", unit=MetricUnit.Count, value=1
+                )
+                raise ServiceUnavailableException(ERROR_MESSAGE_SERVICE_UNAVAILABLE)
+            self._pending += 1
+            pending = self._pending
+        metrics.add_metric(
+            name="PasswordHasherQueueDepth", unit=MetricUnit.Count, value=pending
+        )
+
+        started_at = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(
+                self._executor.submit(fn, self._password_hasher, *args)
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+            metrics.add_metric(
+                name="PasswordHasherLatency",
+                unit=MetricUnit.Milliseconds,
+                value=(time.perf_counter() - started_at) * 1000,
+            )
+
+
+password_hashing_executor = PasswordHashingExecutor(
+    PasswordHasher(
+        time_cost=settings.argon2_time_cost,
+        memory_cost=settings.argon2_memory_cost,
+        parallelism=settings.argon2_parallelism,
+    ),
+    max_workers=settings.password_hasher_max_workers,
+    max_pending=settings.password_hasher_max_pending,
+    use_processes=settings.password_hasher_use_processes,
+)
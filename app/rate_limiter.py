@@ -0,0 +1,37 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from app import settings
+
+
+class TokenBucketLimiter:
+    def __init__(self, max_size: int = 10000):
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_size = max_size
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: str, capacity: int, refill_rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            is_allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if is_allowed else tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self._max_size:
+                self._buckets.popitem(last=False)
+        if is_allowed:
+            return 0.0
+        return (1 - tokens) / refill_rate if refill_rate > 0 else math.inf
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+login_limiter = TokenBucketLimiter(settings.login_bucket_max_size)
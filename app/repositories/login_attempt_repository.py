@@ -0,0 +1,43 @@
+from typing import Any
+
+from app import settings
+from app.dynamodb import get_dynamodb_client
+from app.timing import timed
+
+
+class LoginAttemptRepository:
+    def __init__(self):
+        self._table = get_dynamodb_client().table(f"{settings.stage}-login-attempts")
+
+    @timed("login_attempts.delete_by_ids")
+    async def delete_by_ids(self, attempt_ids: list[str]) -> dict[str, Any]:
+        return await self._table.batch_write_item(
+            [
+                {"DeleteRequest": {"Key": {"id": attempt_id}}}
+                for attempt_id in attempt_ids
+            ]
+        )
+
+    @timed("login_attempts.get_counts")
+    async def get_counts(self, attempt_ids: list[str]) -> dict[str, int]:
+        response = await self._table.batch_get_item(
+            keys=[{"id": attempt_id} for attempt_id in attempt_ids],
+            ProjectionExpression="id, attempts",
+        )
+        return {
+            item["id"]: int(item["attempts"])
+            for item in response["Responses"][self._table.name]
+        }
+
+    @timed("login_attempts.increment")
+    async def increment(self, attempt_id: str, ttl: int) -> int:
+        response = await self._table.update_item(
+            Key={"id": attempt_id},
+            UpdateExpression=(
+                "ADD attempts :increment SET #ttl = if_not_exists(#ttl, :ttl)"
+            ),
+            ExpressionAttributeNames={"#ttl": "ttl"},
+            ExpressionAttributeValues={":increment": 1, ":ttl": ttl},
+            ReturnValues="UPDATED_NEW",
+        )
+        return int(response["Attributes"]["attempts"])
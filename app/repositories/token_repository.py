@@ -1,26 +1,68 @@
+import time
 from typing import Any
 
-import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
 
 from app import settings
+from app.dynamodb import get_dynamodb_client
 from app.models.jwt import JWTToken
+from app.timing import timed
+
+DAY_MILLISECONDS = 86400000
+REVOCATION_EPOCH_JTI = "#revocation-epoch"
+REVOKED_BEFORE_PREFIX = "#revoked-before#"
+
+
+def _revocation_day(timestamp: int) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp // 1000))
 
 
 class TokenRepository:
     def __init__(self):
-        self._table = (
-            boto3.Session().resource("dynamodb").Table(f"{settings.stage}-tokens")
+        self._client = get_dynamodb_client()
+        self._revocations_table = self._client.table(
+            f"{settings.stage}-token-revocations"
         )
+        self._table = self._client.table(f"{settings.stage}-tokens")
 
-    def create_token(self, data: dict[str, Any]) -> dict[str, Any]:
-        return self._table.put_item(Item=data)
+    def _revocation_item(self, jti: str, exp: int) -> dict[str, Any]:
+        revoked_at = time.time_ns() // 1000000
+        return {
+            "day": _revocation_day(revoked_at),
+            "revocation_id": f"{revoked_at:013d}#{jti}",
+            "jti": jti,
+            "ttl": exp,
+        }
 
-    def delete_by_id(self, jti: str) -> dict[str, Any]:
-        return self._table.delete_item(Key={"jti": jti})
+    @timed("tokens.create_token")
+    async def create_token(self, data: dict[str, Any]) -> dict[str, Any]:
+        return await self._table.put_item(Item=data)
 
-    def get_by_id(self, jti: str) -> tuple[JWTToken, str] | None:
-        response = self._table.get_item(
+    @timed("tokens.create_revocation")
+    async def create_revocation(self, jti: str, exp: int) -> dict[str, Any]:
+        return await self._revocations_table.put_item(
+            Item=self._revocation_item(jti, exp)
+        )
+
+    @timed("tokens.delete_by_id")
+    async def delete_by_id(self, jti: str) -> dict[str, Any]:
+        return await self._table.delete_item(Key={"jti": jti})
+
+    @timed("tokens.delete_by_ids")
+    async def delete_by_ids(self, jtis: list[str]) -> set[str]:
+        response = await self._table.batch_write_item(
+            [{"DeleteRequest": {"Key": {"jti": jti}}} for jti in jtis]
+        )
+        return {
+            request["DeleteRequest"]["Key"]["jti"]
+            for request in response.get("UnprocessedItems", {}).get(
+                self._table.name, []
+            )
+        }
+
+    @timed("tokens.get_by_id")
+    async def get_by_id(self, jti: str) -> tuple[JWTToken, str] | None:
+        response = await self._table.get_item(
             Key={"jti": jti},
         )
         if "Item" in response:
@@ -30,9 +72,178 @@ class TokenRepository:
             )
         return None
 
-    def get_by_refresh_token(self, refresh_token: str) -> dict[str, Any] | None:
-        response = self._table.query(
+    @timed("tokens.get_existing_ids")
+    async def get_existing_ids(self, jtis: list[str]) -> tuple[set[str], set[str]]:
+        response = await self._table.batch_get_item(
+            keys=[{"jti": jti} for jti in dict.fromkeys(jtis)],
+            ProjectionExpression="jti",
+        )
+        unprocessed_keys = response.get("UnprocessedKeys", {}).get(
+            self._table.name, {"Keys": []}
+        )["Keys"]
+        return (
+            {item["jti"] for item in response["Responses"][self._table.name]},
+            {key["jti"] for key in unprocessed_keys},
+        )
+
+    @timed("tokens.get_ids_by_sub")
+    async def get_ids_by_sub(self, sub: str) -> list[str]:
+        jtis = []
+        params = {
+            "IndexName": "SubIndex",
+            "KeyConditionExpression": Key("sub").eq(sub),
+            "ProjectionExpression": "jti",
+        }
+        while True:
+            response = await self._table.query(**params)
+            jtis.extend(item["jti"] for item in response["Items"])
+            if "LastEvaluatedKey" not in response:
+                return jtis
+            params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    @timed("tokens.get_revoked_before")
+    async def get_revoked_before(
+        self, subs: list[str]
+    ) -> tuple[dict[str, int], set[str]]:
+        response = await self._table.batch_get_item(
+            keys=[{"jti": f"{REVOKED_BEFORE_PREFIX}{sub}"} for sub in subs],
+            ProjectionExpression="jti, issued_before",
+        )
+        unprocessed_keys = response.get("UnprocessedKeys", {}).get(
+            self._table.name, {"Keys": []}
+        )["Keys"]
+        return (
+            {
+                item["jti"].removeprefix(REVOKED_BEFORE_PREFIX): int(
+                    item["issued_before"]
+                )
+                for item in response["Responses"][self._table.name]
+            },
+            {
+                key["jti"].removeprefix(REVOKED_BEFORE_PREFIX)
+                for key in unprocessed_keys
+            },
+        )
+
+    @timed("tokens.put_revoked_before")
+    async def put_revoked_before(
+        self, sub: str, issued_before: int, ttl: int, create_revocation: bool = False
+    ) -> dict[str, Any]:
+        item = {
+            "jti": f"{REVOKED_BEFORE_PREFIX}{sub}",
+            "issued_before": issued_before,
+            "ttl": ttl,
+        }
+        if not create_revocation:
+            return await self._table.put_item(Item=item)
+        revocation_item = self._revocation_item(item["jti"], ttl)
+        return await self._client.transact_write_items(
+            [
+                {"Put": {"TableName": self._table.name, "Item": item}},
+                {
+                    "Put": {
+                        "TableName": self._revocations_table.name,
+                        "Item": {
+                            **revocation_item,
+                            "sub": sub,
+                            "issued_before": issued_before,
+                        },
+                    }
+                },
+            ]
+        )
+
+    @timed("tokens.get_revocations")
+    async def get_revocations(self, since: int) -> list[str | tuple[str, int]]:
+        revocations: list[str | tuple[str, int]] = []
+        now = time.time_ns() // 1000000
+        # revocations are partitioned by day, every day since the checkpoint is read
+        for day in range(since - since % DAY_MILLISECONDS, now + 1, DAY_MILLISECONDS):
+            params = {
+                "KeyConditionExpression": Key("day").eq(_revocation_day(day))
+                & Key("revocation_id").gte(f"{since:013d}"),
+                "ProjectionExpression": "jti, #sub, issued_before",
+                "ExpressionAttributeNames": {"#sub": "sub"},
+            }
+            while True:
+                response = await self._revocations_table.query(**params)
+                revocations.extend(
+                    (item["sub"], int(item["issued_before"]))
+                    if "sub" in item
+                    else item["jti"]
+                    for item in response["Items"]
+                )
+                if "LastEvaluatedKey" not in response:
+                    break
+                params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        return revocations
+
+    @timed("tokens.get_revocation_epoch")
+    async def get_revocation_epoch(self) -> int:
+        response = await self._table.get_item(
+            Key={"jti": REVOCATION_EPOCH_JTI}, ConsistentRead=True
+        )
+        if "Item" in response:
+            return int(response["Item"]["epoch"])
+        return 0
+
+    @timed("tokens.increment_revocation_epoch")
+    async def increment_revocation_epoch(self) -> int:
+        response = await self._table.update_item(
+            Key={"jti": REVOCATION_EPOCH_JTI},
+            UpdateExpression="ADD epoch :increment",
+            ExpressionAttributeValues={":increment": 1},
+            ReturnValues="UPDATED_NEW",
+        )
+        return int(response["Attributes"]["epoch"])
+
+    @timed("tokens.get_by_refresh_token")
+    async def get_by_refresh_token(self, refresh_token: str) -> dict[str, Any] | None:
+        response = await self._table.query(
             IndexName="RefreshTokenIndex",
             KeyConditionExpression=Key("refresh_token").eq(refresh_token),
         )
         return response["Items"][0] if response["Items"] else None
+
+    @timed("tokens.rotate_token")
+    async def rotate_token(
+        self,
+        jwt_token: dict[str, Any],
+        refresh_token: str,
+        data: dict[str, Any],
+        create_revocation: bool = False,
+    ) -> dict[str, Any]:
+        return await self._client.transact_write_items(
+            [
+                {
+                    "Delete": {
+                        "TableName": self._table.name,
+                        "Key": {"jti": jwt_token["jti"]},
+                        "ConditionExpression": Attr("refresh_token").eq(refresh_token)
+                        & Attr("jwt_token").eq(jwt_token),
+                        "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+                    }
+                },
+                {
+                    "Put": {
+                        "TableName": self._table.name,
+                        "Item": data,
+                        "ConditionExpression": Attr("jti").not_exists(),
+                    }
+                },
+                *(
+                    [
+                        {
+                            "Put": {
+                                "TableName": self._revocations_table.name,
+                                "Item": self._revocation_item(
+                                    jwt_token["jti"], jwt_token["exp"]
+                                ),
+                            }
+                        }
+                    ]
+                    if create_revocation
+                    else []
+                ),
+            ]
+        )
@@ -1,26 +1,142 @@
 from typing import Any
 
-import boto3
+import pendulum
 from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
 
 from app import settings
+from app.dynamodb import get_dynamodb_client
 from app.models.user import User
+from app.timing import timed
+
+EMAIL_GUARD_PREFIX = "EMAIL#"
+USERNAME_GUARD_PREFIX = "USERNAME#"
 
 
 class UserRepository:
     def __init__(self):
-        self._table = (
-            boto3.Session().resource("dynamodb").Table(f"{settings.stage}-users")
+        self._client = get_dynamodb_client()
+        self._table = self._client.table(f"{settings.stage}-users")
+
+    def _guard_keys(self, data: dict[str, Any]) -> list[str]:
+        return [
+            f"{EMAIL_GUARD_PREFIX}{data['email']}",
+            f"{USERNAME_GUARD_PREFIX}{data['username']}",
+        ]
+
+    async def _get_released_guards(self, err: ClientError) -> dict[str, str]:
+        if err.response["Error"]["Code"] != "TransactionCanceledException":
+            return {}
+        released_guards = {}
+        for reason in err.response["CancellationReasons"][1:]:
+            if reason["Code"] == "None":
+                continue
+            guard = reason.get("Item")
+            if reason["Code"] != "ConditionalCheckFailed" or guard is None:
+                return {}
+            response = await self._table.get_item(
+                Key={"id": guard["user_id"]}, ConsistentRead=True
+            )
+            owner = response.get("Item")
+            if owner is not None and owner.get("deleted_at") is None:
+                return {}
+            released_guards[guard["id"]] = guard["user_id"]
+        return released_guards
+
+    async def _put_user(
+        self, data: dict[str, Any], released_guards: dict[str, str] | None = None
+    ) -> dict[str, Any]:
+        released_guards = released_guards or {}
+        return await self._client.transact_write_items(
+            [
+                {
+                    "Put": {
+                        "TableName": self._table.name,
+                        "Item": data,
+                        "ConditionExpression": Attr("id").not_exists(),
+                    }
+                },
+                *(
+                    {
+                        "Put": {
+                            "TableName": self._table.name,
+                            "Item": {"id": guard_key, "user_id": data["id"]},
+                            "ConditionExpression": (
+                                Attr("user_id").eq(released_guards[guard_key])
+                                if guard_key in released_guards
+                                else Attr("id").not_exists()
+                            ),
+                            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+                        }
+                    }
+                    for guard_key in self._guard_keys(data)
+                ),
+            ]
         )
 
-    def create_user(self, data: dict[str, Any]) -> dict[str, Any]:
-        return self._table.put_item(Item=data)
+    @timed("users.create_user")
+    async def create_user(self, data: dict[str, Any]) -> dict[str, Any]:
+        try:
+            return await self._put_user(data)
+        except ClientError as err:
+            released_guards = await self._get_released_guards(err)
+            if not released_guards:
+                raise
+            return await self._put_user(data, released_guards)
 
-    def delete_user(self, user_uuid: str) -> dict[str, Any]:
-        return self._table.delete_item(Key={"id": user_uuid})
+    @timed("users.delete_user")
+    async def delete_user(self, user_uuid: str) -> dict[str, Any]:
+        response = await self._table.get_item(
+            Key={"id": user_uuid}, ConsistentRead=True
+        )
+        item = response.pop("Item", {})
+        guard_keys = self._guard_keys(item) if item else []
+        while item:
+            try:
+                await self._client.transact_write_items(
+                    [
+                        {
+                            "Delete": {
+                                "TableName": self._table.name,
+                                "Key": {"id": user_uuid},
+                            }
+                        },
+                        *(
+                            {
+                                "Delete": {
+                                    "TableName": self._table.name,
+                                    "Key": {"id": guard_key},
+                                    "ConditionExpression": Attr("user_id").not_exists()
+                                    | Attr("user_id").eq(user_uuid),
+                                }
+                            }
+                            for guard_key in guard_keys
+                        ),
+                    ]
+                )
+                break
+            except ClientError as err:
+                # a guard taken over after a soft delete belongs to another user
+                taken_guard_keys = {
+                    guard_key
+                    for guard_key, reason in zip(
+                        guard_keys, err.response.get("CancellationReasons", [])[1:]
+                    )
+                    if reason["Code"] == "ConditionalCheckFailed"
+                }
+                if not taken_guard_keys:
+                    raise
+                guard_keys = [
+                    guard_key
+                    for guard_key in guard_keys
+                    if guard_key not in taken_guard_keys
+                ]
+
+        return {**response, "Attributes": item}
 
-    def get_by_email(self, email: str) -> User | None:
-        response = self._table.query(
+    @timed("users.get_by_email")
+    async def get_by_email(self, email: str) -> User | None:
+        response = await self._table.query(
             IndexName="EmailIndex",
             KeyConditionExpression=Key("email").eq(email),
             FilterExpression=Attr("deleted_at").not_exists()
@@ -31,8 +147,9 @@ class UserRepository:
 
         return None
 
-    def get_by_id(self, user_uuid: str) -> User | None:  # pragma: no cover
-        response = self._table.query(
+    @timed("users.get_by_id")
+    async def get_by_id(self, user_uuid: str) -> User | None:  # pragma: no cover
+        response = await self._table.query(
             KeyConditionExpression=Key("id").eq(user_uuid),
             FilterExpression=Attr("deleted_at").not_exists()
             | Attr("deleted_at").eq(None),
@@ -42,8 +159,23 @@ class UserRepository:
 
         return None
 
-    def get_by_username(self, username: str) -> User | None:
-        response = self._table.query(
+    @timed("users.update_password")
+    async def update_password(
+        self, user_uuid: str, password: str, previous_password: str
+    ) -> dict[str, Any]:
+        return await self._table.update_item(
+            Key={"id": user_uuid},
+            UpdateExpression="SET password = :password, updated_at = :updated_at",
+            ConditionExpression=Attr("password").eq(previous_password),
+            ExpressionAttributeValues={
+                ":password": password,
+                ":updated_at": pendulum.now().to_iso8601_string(),
+            },
+        )
+
+    @timed("users.get_by_username")
+    async def get_by_username(self, username: str) -> User | None:
+        response = await self._table.query(
             IndexName="UsernameIndex",
             KeyConditionExpression=Key("username").eq(username),
             FilterExpression=Attr("deleted_at").not_exists()
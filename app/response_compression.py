@@ -0,0 +1,95 @@
+import functools
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+from app import settings
+
+COMPRESS_ATTRIBUTE = "__compress_response__"
+
+
+def compress(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    setattr(endpoint, COMPRESS_ATTRIBUTE, True)
+    return endpoint
+
+
+def is_compressible(endpoint: Callable[..., Any] | None) -> bool:
+    return getattr(endpoint, COMPRESS_ATTRIBUTE, False)
+
+
+def _brotli_encoder() -> Callable[[bytes], bytes] | None:
+    try:
+        import brotli  # ty: ignore[unresolved-import]
+    except ImportError:
+        return None
+    return functools.partial(
+        brotli.compress, quality=settings.compression_brotli_quality
+    )
+
+
+def _gzip_encoder() -> Callable[[bytes], bytes]:
+    def encode(body: bytes) -> bytes:
+        compressor = zlib.compressobj(settings.compression_gzip_level, wbits=31)
+        return compressor.compress(body) + compressor.flush()
+
+    return encode
+
+
+def _zstd_encoder() -> Callable[[bytes], bytes] | None:
+    try:
+        from compression import zstd
+    except ImportError:
+        return None
+    return functools.partial(zstd.compress, level=settings.compression_zstd_level)
+
+
+ENCODER_FACTORIES: dict[str, Callable[[], Callable[[bytes], bytes] | None]] = {
+    "br": _brotli_encoder,
+    "gzip": _gzip_encoder,
+    "zstd": _zstd_encoder,
+}
+
+
+@functools.cache
+def get_encoders() -> dict[str, Callable[[bytes], bytes]]:
+    # the optional codecs are imported on the first compressible response to keep
+    # them off the cold-start path
+    encoders = {}
+    for encoding in settings.compression_encodings:
+        encoder = ENCODER_FACTORIES[encoding]()
+        if encoder is not None:
+            encoders[encoding] = encoder
+    return encoders
+
+
+def is_allowed_content_type(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return any(
+        media_type.startswith(allowed)
+        if allowed.endswith("/")
+        else media_type == allowed
+        for allowed in settings.compression_content_types
+    )
+
+
+def negotiate(accept_encoding: str, encodings: list[str]) -> str | None:
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.strip().lower()] = quality
+
+    best_encoding, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
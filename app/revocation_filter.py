@@ -0,0 +1,137 @@
+import hashlib
+import math
+import time
+from collections.abc import Awaitable, Callable
+
+from app import settings
+from app.structured_logging import logger
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.count = 0
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8]), int.from_bytes(digest[8:]) | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+
+class RevocationFilter:
+    def __init__(
+        self,
+        capacity: int = 1000000,
+        error_rate: float = 0.001,
+        sync_interval: float = 5,
+        sync_overlap: float = 5,
+        token_lifetime: int = 3600,
+    ):
+        self._capacity = capacity
+        self._checkpoint: int | None = None
+        self._error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        self._is_synced = False
+        self._next_rebuild_at = 0.0
+        self._next_sync_at = 0.0
+        self._revoked_before: dict[str, int] = {}
+        self._sync_interval = sync_interval
+        self._sync_overlap = sync_overlap
+        self._token_lifetime = token_lifetime
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._filter
+
+    def __len__(self) -> int:
+        return len(self._filter)
+
+    def add(self, jti: str):
+        self._filter.add(jti)
+
+    def add_revoked_before(self, sub: str, issued_before: int):
+        self._revoked_before[sub] = max(issued_before, self._revoked_before.get(sub, 0))
+
+    def revoked_before(self, sub: str) -> int:
+        return self._revoked_before.get(sub, 0)
+
+    async def sync(
+        self,
+        get_revocations: Callable[[int], Awaitable[list[str | tuple[str, int]]]],
+    ) -> bool:
+        now = time.monotonic()
+        if now < self._next_sync_at:
+            return self._is_synced
+        self._next_sync_at = now + self._sync_interval
+        # revoked tokens expire after one token lifetime, so a rebuild only has to
+        # reload that window and drops everything older from the filter
+        rebuild = (
+            self._checkpoint is None
+            or now >= self._next_rebuild_at
+            or len(self._filter) >= self._capacity
+        )
+        checkpoint = int(time.time() * 1000)
+        if rebuild:
+            since = checkpoint - self._token_lifetime * 1000
+        else:
+            # revocations written by other instances may land slightly behind the
+            # checkpoint because of clock skew and eventually consistent reads
+            since = self._checkpoint - int(self._sync_overlap * 1000)
+        try:
+            revocations = await get_revocations(since)
+        except Exception:
+            logger.warning(
+                "Failed to sync the token revocations, bypassing the revocation filter",
+                exc_info=True,
+            )
+            self._is_synced = False
+            self._next_sync_at = 0.0
+            return False
+        revocation_filter = (
+            BloomFilter(self._capacity, self._error_rate) if rebuild else self._filter
+        )
+        revoked_before = {} if rebuild else self._revoked_before
+        for revocation in revocations:
+            # a user-wide revocation carries the sub and its issued-before watermark
+            if isinstance(revocation, tuple):
+                sub, issued_before = revocation
+                revoked_before[sub] = max(issued_before, revoked_before.get(sub, 0))
+            else:
+                revocation_filter.add(revocation)
+        if rebuild:
+            self._filter = revocation_filter
+            self._next_rebuild_at = now + self._token_lifetime
+        self._revoked_before = revoked_before
+        self._checkpoint = checkpoint
+        self._is_synced = True
+        return True
+
+
+revocation_filter = RevocationFilter(
+    settings.token_revocation_filter_capacity,
+    settings.token_revocation_filter_error_rate,
+    settings.token_revocation_sync_interval,
+    settings.token_revocation_sync_overlap,
+    settings.jwt_token_lifetime,
+)
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.structured_logging import logger
+
+
+class SecretProvider:
+    def __init__(
+        self,
+        fetch: Callable[[], str],
+        refresh_interval: float = 300,
+        retry_interval: float = 10,
+    ):
+        self._fetch = fetch
+        self._refresh_interval = refresh_interval
+        self._retry_interval = min(retry_interval, refresh_interval)
+        self._lock = threading.Lock()
+        self._refresh_thread: threading.Thread | None = None
+        self._value: str | None = None
+        self._next_refresh_at = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+        self._last_refresh_latency = 0.0
+        self._total_refresh_latency = 0.0
+
+    def get(self) -> str:
+        value = self._value
+        if value is None:
+            with self._lock:
+                value = self._value
+                if value is None:
+                    self._misses += 1
+                    value = self.refresh()
+        else:
+            self._hits += 1
+            if time.monotonic() >= self._next_refresh_at:
+                self._schedule_refresh()
+
+        return value
+
+    def refresh(self) -> str:
+        started_at = time.monotonic()
+        try:
+            value = self._fetch()
+        except Exception:
+            self._refresh_errors += 1
+            self._next_refresh_at = time.monotonic() + self._retry_interval
+            raise
+        finally:
+            self._last_refresh_latency = time.monotonic() - started_at
+            self._total_refresh_latency += self._last_refresh_latency
+
+        self._refreshes += 1
+        self._value = value
+        self._next_refresh_at = time.monotonic() + self._refresh_interval
+        return value
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "refreshes": self._refreshes,
+            "refresh_errors": self._refresh_errors,
+            "last_refresh_latency": self._last_refresh_latency,
+            "avg_refresh_latency": self._total_refresh_latency
+            / max(self._refreshes + self._refresh_errors, 1),
+        }
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Failed to refresh secret, serving the cached value")
+
+    def _schedule_refresh(self):
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._next_refresh_at = time.monotonic() + self._retry_interval
+            self._refresh_thread = threading.Thread(
+                target=self._background_refresh, daemon=True
+            )
+            self._refresh_thread.start()
@@ -0,0 +1,120 @@
+import time
+from collections.abc import Mapping, Sequence
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+from app.jwt_bearer import (
+    ERROR_MESSAGE_INVALID_CREDENTIALS,
+    ERROR_MESSAGE_NOT_AUTHENTICATED,
+)
+from app.models.jwt import JWTToken
+from app.models.response.error import ErrorResponse, ValidationErrorResponse
+from app.models.response.introspection import (
+    IntrospectionResponse,
+    TokenIntrospection,
+)
+from app.models.response.token import TokenResponse
+from app.password_hasher import ERROR_MESSAGE_SERVICE_UNAVAILABLE
+from app.services.auth_service import ERROR_MESSAGE_UNAUTHORIZED
+
+ERROR_MESSAGE_INTERNAL_SERVER_ERROR = "Internal Server Error"
+MEDIA_TYPE_JSON = "application/json"
+
+error_response_adapter = TypeAdapter(ErrorResponse)
+introspection_response_adapter = TypeAdapter(IntrospectionResponse)
+token_response_adapter = TypeAdapter(TokenResponse)
+validation_error_response_adapter = TypeAdapter(ValidationErrorResponse)
+
+
+def _encode_error_prefix(status_code: int, error: str) -> bytes:
+    # the timestamp is the last field of the envelope, so everything before its
+    # value is constant for a given status and message
+    body = error_response_adapter.dump_json(
+        ErrorResponse(status=status_code, error=error, timestamp=0), by_alias=True
+    )
+    return body.removesuffix(b"0}")
+
+
+STATIC_ERROR_PREFIXES = {
+    (status_code, error): _encode_error_prefix(status_code, error)
+    for status_code, error in (
+        (status.HTTP_401_UNAUTHORIZED, ERROR_MESSAGE_UNAUTHORIZED),
+        (status.HTTP_403_FORBIDDEN, ERROR_MESSAGE_INVALID_CREDENTIALS),
+        (status.HTTP_403_FORBIDDEN, ERROR_MESSAGE_NOT_AUTHENTICATED),
+        (status.HTTP_500_INTERNAL_SERVER_ERROR, ERROR_MESSAGE_INTERNAL_SERVER_ERROR),
+        (status.HTTP_503_SERVICE_UNAVAILABLE, ERROR_MESSAGE_SERVICE_UNAVAILABLE),
+    )
+}
+
+
+def encode_error(status_code: int, error: str) -> bytes:
+    prefix = STATIC_ERROR_PREFIXES.get((status_code, error))
+    if prefix is None:
+        return error_response_adapter.dump_json(
+            ErrorResponse(status=status_code, error=error), by_alias=True
+        )
+    return b"%b%d}" % (prefix, time.time())
+
+
+def error_response(
+    status_code: int, error: str, headers: Mapping[str, str] | None = None
+) -> Response:
+    return Response(
+        encode_error(status_code, error),
+        headers=headers,
+        media_type=MEDIA_TYPE_JSON,
+        status_code=status_code,
+    )
+
+
+def validation_error_response(errors: Sequence[dict]) -> Response:
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    return Response(
+        validation_error_response_adapter.dump_json(
+            ValidationErrorResponse(
+                status=status_code, error="Validation Error", errors=errors
+            ),
+            by_alias=True,
+        ),
+        media_type=MEDIA_TYPE_JSON,
+        status_code=status_code,
+    )
+
+
+def token_response(access_token: str, refresh_token: str, expires_in: int) -> Response:
+    return Response(
+        token_response_adapter.dump_json(
+            TokenResponse(
+                access_token=access_token,
+                refresh_token=refresh_token,
+                expires_in=expires_in,
+            )
+        ),
+        media_type=MEDIA_TYPE_JSON,
+    )
+
+
+def introspection_response(decoded_tokens: list[JWTToken | None]) -> Response:
+    return Response(
+        introspection_response_adapter.dump_json(
+            IntrospectionResponse(
+                results=[
+                    TokenIntrospection(active=False)
+                    if decoded_token is None
+                    else TokenIntrospection(
+                        active=True,
+                        exp=decoded_token.exp,
+                        iat=decoded_token.iat,
+                        iss=decoded_token.iss,
+                        jti=decoded_token.jti,
+                        sub=decoded_token.sub,
+                        username=decoded_token.user.get("username"),
+                    )
+                    for decoded_token in decoded_tokens
+                ]
+            ),
+            exclude_none=True,
+        ),
+        media_type=MEDIA_TYPE_JSON,
+    )
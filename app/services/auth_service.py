@@ -1,35 +1,36 @@
+import asyncio
 import secrets
 import uuid
 from typing import Any
 
-import jwt
 import pendulum
-from argon2 import PasswordHasher
 from argon2.exceptions import InvalidHash, VerifyMismatchError
-from aws_lambda_powertools import Logger
 from fastapi import HTTPException
 from starlette import status
 
 from app import settings
-from app.exceptions import (
-    TokenMismatchException,
-    TokenNotFoundException,
-    UserNotFoundException,
-)
+from app.exceptions import TokenNotFoundException, UserNotFoundException
 from app.models.jwt import JWTToken
 from app.models.user import User
+from app.password_hasher import password_hashing_executor
 from app.repositories.user_repository import UserRepository
+from app.revocation_filter import revocation_filter
+from app.services.login_attempt_service import LoginAttemptService
 from app.services.token_service import TokenService
+from app.signing_keys import encode_token
+from app.structured_logging import logger
+from app.token_cache import token_cache
 
 ERROR_MESSAGE_UNAUTHORIZED = "Unauthorized"
-ERROR_MESSAGE_TOKEN_NOT_FOUND = "The requested token was not found"
 ERROR_MESSAGE_USER_NOT_FOUND = "The requested user was not found"
 
 
 class AuthService:
     def __init__(self):
-        self._logger = Logger()
-        self._password_hasher = PasswordHasher()
+        self._background_tasks: set[asyncio.Task] = set()
+        self._logger = logger
+        self._login_attempt_service = LoginAttemptService()
+        self._password_hasher = password_hashing_executor
         self._token_service = TokenService()
         self._user_repository = UserRepository()
 
@@ -62,73 +63,122 @@ class AuthService:
     def _generate_refresh_token(self, length: int = 16):
         return secrets.token_hex(length)
 
-    def _generate_tokens_for_user(
-        self,
-        jwt_token: JWTToken,
-    ) -> tuple[JWTToken, str]:
-        self._logger.info(
-            f"Generate new tokens for user={jwt_token.user['id']}",
-            extra={"user": jwt_token.user},
-        )
-
-        jwt_token = self._generate_token(
-            jwt_token.sub, settings.jwt_token_lifetime, jwt_token.user
-        )
-        refresh_token = self._generate_refresh_token()
-        self._token_service.create(jwt_token, refresh_token)
-
-        return jwt_token, refresh_token
+    async def _rehash_password(self, user: User, password: str):
+        try:
+            await self._user_repository.update_password(
+                user.id, await self._password_hasher.hash(password), user.password
+            )
+        except Exception:
+            self._logger.warning(
+                "Failed to rehash password for user=%s", user.id, exc_info=True
+            )
 
-    def _revoke_token(self, jwt_token: JWTToken):
+    async def _revoke_token(self, jwt_token: JWTToken):
         self._logger.info(
-            f"Revoking token with jti={jwt_token.jti}", extra={"jwt_token": jwt_token}
+            "Revoking token with jti=%s", jwt_token.jti, extra={"sub": jwt_token.sub}
+        )
+        await self._token_service.delete_by_id(jwt_token.jti)
+        token_cache.invalidate(jwt_token.jti)
+        if settings.stateless_token_validation:
+            await self._token_service.revoke(jwt_token)
+            revocation_filter.add(jwt_token.jti)
+        if settings.token_revocation_epoch_check_interval is not None:
+            await self._token_service.increment_revocation_epoch()
+
+    async def login(
+        self, email: str, password: str, ip: str | None = None
+    ) -> tuple[str, str, int]:
+        # the local buckets reject most abuse before any I/O, the lockout check
+        # runs alongside the user lookup and always before the password is verified
+        self._login_attempt_service.acquire(email, ip)
+        user, failures = await asyncio.gather(
+            self._user_repository.get_by_email(email),
+            self._login_attempt_service.check(email, ip),
         )
-        self._token_service.delete_by_id(jwt_token.jti)
-
-    def login(self, email: str, password: str) -> tuple[str, str, int]:
-        user = self._user_repository.get_by_email(email)
 
         if user is None:
+            await self._login_attempt_service.record_failure(email, ip)
             raise UserNotFoundException(ERROR_MESSAGE_USER_NOT_FOUND)
         try:
-            self._password_hasher.verify(user.password, password)
+            await self._password_hasher.verify(user.password, password)
+            if failures:
+                await self._login_attempt_service.reset(email)
+            if self._password_hasher.needs_rehash(user.password):
+                if settings.aws_lambda_function_name is None:
+                    task = asyncio.create_task(self._rehash_password(user, password))
+                    self._background_tasks.add(task)
+                    task.add_done_callback(self._background_tasks.discard)
+                else:
+                    # Lambda freezes the environment once the response is returned,
+                    # so a background rehash would never finish
+                    await self._rehash_password(user, password)
 
             jwt_token = self._generate_token(user.id, user=user)
             refresh_token = self._generate_refresh_token()
 
-            self._token_service.create(jwt_token, refresh_token)
+            await self._token_service.create(jwt_token, refresh_token)
 
             return (
-                jwt.encode(
-                    jwt_token.model_dump(exclude_none=True), settings.jwt_secret
-                ),
+                encode_token(jwt_token.model_dump(exclude_none=True)),
                 refresh_token,
                 settings.jwt_token_lifetime,
             )
         except (InvalidHash, VerifyMismatchError):
+            await self._login_attempt_service.record_failure(email, ip)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=ERROR_MESSAGE_UNAUTHORIZED,
             )
 
-    def logout(self, jwt_token: JWTToken):
-        self._token_service.delete_by_id(jwt_token.jti)
-
-    def refresh(self, jwt_token: JWTToken, refresh_token: str) -> tuple[str, str, int]:
-        item = self._token_service.get_by_refresh_token(refresh_token)
+    async def logout(self, jwt_token: JWTToken):
+        await self._revoke_token(jwt_token)
+
+    async def revoke_all(self, sub: str) -> int:
+        issued_before = pendulum.now().int_timestamp
+        self._logger.info("Revoking all tokens of user=%s", sub, extra={"sub": sub})
+        # the watermark rejects the tokens at once, the deletes only reclaim them
+        await self._token_service.revoke_before(sub, issued_before)
+        token_cache.put_revoked_before(sub, issued_before)
+        if settings.stateless_token_validation:
+            revocation_filter.add_revoked_before(sub, issued_before)
+        jtis = await self._token_service.get_ids_by_sub(sub)
+        unprocessed_jtis = await self._token_service.delete_by_ids(jtis)
+        if unprocessed_jtis:
+            self._logger.warning(
+                "Failed to delete %d tokens of user=%s", len(unprocessed_jtis), sub
+            )
+        for jti in jtis:
+            token_cache.invalidate(jti)
+        if settings.token_revocation_epoch_check_interval is not None:
+            await self._token_service.increment_revocation_epoch()
+        return len(jtis)
+
+    async def refresh(
+        self, jwt_token: JWTToken, refresh_token: str
+    ) -> tuple[str, str, int]:
+        self._logger.info(
+            "Generate new tokens for user=%s",
+            jwt_token.sub,
+            extra={"sub": jwt_token.sub},
+        )
+        new_jwt_token = self._generate_token(
+            jwt_token.sub, settings.jwt_token_lifetime, jwt_token.user
+        )
+        new_refresh_token = self._generate_refresh_token()
 
-        if item is None:
+        try:
+            await self._token_service.rotate(
+                jwt_token, refresh_token, new_jwt_token, new_refresh_token
+            )
+        except TokenNotFoundException:
             self._logger.warning("The requested token was not found!")
-            raise TokenNotFoundException(ERROR_MESSAGE_TOKEN_NOT_FOUND)
-
-        if jwt_token.model_dump() != item["jwt_token"]:
-            raise TokenMismatchException("Internal Server Error")
-        self._revoke_token(jwt_token)
-
-        jwt_token, refresh_token = self._generate_tokens_for_user(jwt_token)
+            raise
+        token_cache.invalidate(jwt_token.jti)
+        if settings.stateless_token_validation:
+            revocation_filter.add(jwt_token.jti)
 
         return (
-            jwt.encode(jwt_token.model_dump(exclude_none=True), settings.jwt_secret),
-            refresh_token,
+            encode_token(new_jwt_token.model_dump(exclude_none=True)),
+            new_refresh_token,
             settings.jwt_token_lifetime,
         )
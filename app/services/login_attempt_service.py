@@ -0,0 +1,127 @@
+import asyncio
+import math
+import time
+
+from aws_lambda_powertools.metrics import MetricUnit
+
+from app import settings
+from app.exceptions import TooManyRequestsException
+from app.metrics import metrics
+from app.rate_limiter import login_limiter
+from app.repositories.login_attempt_repository import LoginAttemptRepository
+from app.structured_logging import logger
+
+ACCOUNT_PREFIX = "ACCOUNT#"
+ERROR_MESSAGE_TOO_MANY_REQUESTS = "Too Many Requests"
+IP_PREFIX = "IP#"
+
+
+class LoginAttemptService:
+    def __init__(self):
+        self._login_attempt_repository = LoginAttemptRepository()
+
+    def _account_key(self, email: str) -> str:
+        return f"{ACCOUNT_PREFIX}{email.lower()}"
+
+    def _ip_key(self, ip: str) -> str:
+        return f"{IP_PREFIX}{ip}"
+
+    def _window(self) -> tuple[int, float]:
+        now = time.time()
+        return (
+            int(now // settings.login_failure_window),
+            settings.login_failure_window - now % settings.login_failure_window,
+        )
+
+    def _reject(self, reason: str, retry_after: float):
+        metrics.add_metric(name=f"Login{reason}", unit=MetricUnit.Count, value=1)
+        raise TooManyRequestsException(
+            ERROR_MESSAGE_TOO_MANY_REQUESTS, max(1, math.ceil(retry_after))
+        )
+
+    def acquire(self, email: str, ip: str | None):
+        if settings.login_ip_bucket_capacity is not None and ip is not None:
+            retry_after = login_limiter.acquire(
+                self._ip_key(ip),
+                settings.login_ip_bucket_capacity,
+                settings.login_ip_bucket_refill_rate,
+            )
+            if retry_after:
+                self._reject("IpThrottled", retry_after)
+        if settings.login_account_bucket_capacity is not None:
+            retry_after = login_limiter.acquire(
+                self._account_key(email),
+                settings.login_account_bucket_capacity,
+                settings.login_account_bucket_refill_rate,
+            )
+            if retry_after:
+                self._reject("AccountThrottled", retry_after)
+
+    async def check(self, email: str, ip: str | None) -> float:
+        limits = {}
+        if settings.login_account_max_failures is not None:
+            limits[self._account_key(email)] = (
+                settings.login_account_max_failures,
+                "AccountLockedOut",
+            )
+        if settings.login_ip_max_failures is not None and ip is not None:
+            limits[self._ip_key(ip)] = (settings.login_ip_max_failures, "IpBlocked")
+        if not limits:
+            return 0
+        window, remaining = self._window()
+        try:
+            counts = await self._login_attempt_repository.get_counts(
+                [f"{key}#{window - 1}" for key in limits]
+                + [f"{key}#{window}" for key in limits]
+            )
+        except Exception:
+            logger.warning(
+                "Failed to get the login failures, skipping the lockout check",
+                exc_info=True,
+            )
+            metrics.add_metric(
+                name="LoginLimiterUnavailable", unit=MetricUnit.Count, value=1
+            )
+            return 0
+        failures = {}
+        for key, (max_failures, reason) in limits.items():
+            # the previous window is weighted by how much of it still overlaps the
+            # sliding window, which approximates a sliding log with two counters
+            failures[key] = (
+                counts.get(f"{key}#{window}", 0)
+                + counts.get(f"{key}#{window - 1}", 0)
+                * remaining
+                / settings.login_failure_window
+            )
+            if failures[key] >= max_failures:
+                self._reject(reason, remaining)
+        metrics.add_metric(name="LoginAllowed", unit=MetricUnit.Count, value=1)
+        return failures.get(self._account_key(email), 0)
+
+    async def record_failure(self, email: str, ip: str | None):
+        window, _ = self._window()
+        # a window's counter is read until the next window has passed as well
+        ttl = (window + 2) * settings.login_failure_window
+        keys = [self._account_key(email)]
+        if ip is not None:
+            keys.append(self._ip_key(ip))
+        metrics.add_metric(name="LoginFailed", unit=MetricUnit.Count, value=1)
+        try:
+            await asyncio.gather(
+                *(
+                    self._login_attempt_repository.increment(f"{key}#{window}", ttl)
+                    for key in keys
+                )
+            )
+        except Exception:
+            logger.warning("Failed to record the login failure", exc_info=True)
+
+    async def reset(self, email: str):
+        window, _ = self._window()
+        account_key = self._account_key(email)
+        try:
+            await self._login_attempt_repository.delete_by_ids(
+                [f"{account_key}#{window - 1}", f"{account_key}#{window}"]
+            )
+        except Exception:
+            logger.warning("Failed to reset the login failures", exc_info=True)
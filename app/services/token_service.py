@@ -1,12 +1,20 @@
 from typing import Any
 
 import pendulum
+from botocore.exceptions import ClientError
 from starlette import status
 
-from app.exceptions import TokenNotFoundException
+from app import settings
+from app.exceptions import (
+    ServiceUnavailableException,
+    TokenMismatchException,
+    TokenNotFoundException,
+)
 from app.models.jwt import JWTToken
 from app.repositories.token_repository import TokenRepository
 
+ERROR_MESSAGE_SERVICE_UNAVAILABLE = "Service Unavailable"
+ERROR_MESSAGE_TOKEN_MISMATCH = "Internal Server Error"
 ERROR_MESSAGE_TOKEN_NOT_FOUND = "The requested token was not found"
 
 
@@ -14,24 +22,94 @@ class TokenService:
     def __init__(self):
         self._token_repository = TokenRepository()
 
-    def create(self, jwt_token: JWTToken, refresh_token: str):
-        self._token_repository.create_token(
-            {
-                "jti": jwt_token.jti,
-                "jwt_token": jwt_token.model_dump(),
-                "refresh_token": refresh_token,
-                "created_at": pendulum.now().to_iso8601_string(),
-                "ttl": jwt_token.exp,
-            }
+    def _to_item(self, jwt_token: JWTToken, refresh_token: str) -> dict[str, Any]:
+        return {
+            "jti": jwt_token.jti,
+            "jwt_token": jwt_token.model_dump(),
+            "refresh_token": refresh_token,
+            "sub": str(jwt_token.sub),
+            "created_at": pendulum.now().to_iso8601_string(),
+            "ttl": jwt_token.exp,
+        }
+
+    async def create(self, jwt_token: JWTToken, refresh_token: str):
+        await self._token_repository.create_token(
+            self._to_item(jwt_token, refresh_token)
         )
 
-    def delete_by_id(self, jti: str):
-        response = self._token_repository.delete_by_id(jti)
+    async def delete_by_id(self, jti: str):
+        response = await self._token_repository.delete_by_id(jti)
         if response["ResponseMetadata"]["HTTPStatusCode"] != status.HTTP_200_OK:
             raise TokenNotFoundException(ERROR_MESSAGE_TOKEN_NOT_FOUND)
 
-    def get_by_id(self, jti: str) -> tuple[JWTToken, str] | None:
-        return self._token_repository.get_by_id(jti)
+    async def delete_by_ids(self, jtis: list[str]) -> set[str]:
+        return await self._token_repository.delete_by_ids(jtis)
+
+    async def get_by_id(self, jti: str) -> tuple[JWTToken, str] | None:
+        return await self._token_repository.get_by_id(jti)
+
+    async def get_existing_ids(self, jtis: list[str]) -> set[str]:
+        existing_ids, unprocessed_ids = await self._token_repository.get_existing_ids(
+            jtis
+        )
+        if unprocessed_ids:
+            raise ServiceUnavailableException(ERROR_MESSAGE_SERVICE_UNAVAILABLE)
+        return existing_ids
+
+    async def get_by_refresh_token(self, refresh_token: str) -> dict[str, Any] | None:
+        return await self._token_repository.get_by_refresh_token(refresh_token)
+
+    async def get_ids_by_sub(self, sub: str) -> list[str]:
+        return await self._token_repository.get_ids_by_sub(sub)
+
+    async def get_revoked_before(self, subs: list[str]) -> dict[str, int]:
+        (
+            revoked_before,
+            unprocessed_subs,
+        ) = await self._token_repository.get_revoked_before(subs)
+        if unprocessed_subs:
+            raise ServiceUnavailableException(ERROR_MESSAGE_SERVICE_UNAVAILABLE)
+        return revoked_before
 
-    def get_by_refresh_token(self, refresh_token: str) -> dict[str, Any] | None:
-        return self._token_repository.get_by_refresh_token(refresh_token)
+    async def revoke_before(self, sub: str, issued_before: int):
+        # tokens issued before the watermark are expired once a lifetime has passed
+        await self._token_repository.put_revoked_before(
+            sub,
+            issued_before,
+            issued_before + settings.jwt_token_lifetime,
+            settings.stateless_token_validation,
+        )
+
+    async def get_revocations(self, since: int) -> list[str | tuple[str, int]]:
+        return await self._token_repository.get_revocations(since)
+
+    async def get_revocation_epoch(self) -> int:
+        return await self._token_repository.get_revocation_epoch()
+
+    async def increment_revocation_epoch(self) -> int:
+        return await self._token_repository.increment_revocation_epoch()
+
+    async def revoke(self, jwt_token: JWTToken):
+        await self._token_repository.create_revocation(jwt_token.jti, jwt_token.exp)
+
+    async def rotate(
+        self,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        new_jwt_token: JWTToken,
+        new_refresh_token: str,
+    ):
+        try:
+            await self._token_repository.rotate_token(
+                jwt_token.model_dump(),
+                refresh_token,
+                self._to_item(new_jwt_token, new_refresh_token),
+                settings.stateless_token_validation,
+            )
+        except ClientError as err:
+            if err.response["Error"]["Code"] != "TransactionCanceledException":
+                raise
+            item = err.response["CancellationReasons"][0].get("Item")
+            if item is not None and item["refresh_token"] == refresh_token:
+                raise TokenMismatchException(ERROR_MESSAGE_TOKEN_MISMATCH)
+            raise TokenNotFoundException(ERROR_MESSAGE_TOKEN_NOT_FOUND)
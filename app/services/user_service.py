@@ -1,51 +1,61 @@
 import uuid
 
 import pendulum
-from argon2 import PasswordHasher
-from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
 
 from app.exceptions import UserAlreadyExistsException
 from app.models.user import User
+from app.password_hasher import password_hashing_executor
 from app.repositories.user_repository import UserRepository
+from app.structured_logging import logger
 
 
 class UserService:
     def __init__(self):
-        self._logger = Logger()
-        self._password_hasher = PasswordHasher()
+        self._logger = logger
+        self._password_hasher = password_hashing_executor
         self._user_repository = UserRepository()
 
-    def register(
+    async def register(
         self, email: str, password: str, username: str, display_name: str | None
     ) -> str:
         self._logger.info(
-            f"Registering user with email: {email}",
-            extra={"email": email, "username": username, "display_name": display_name},
+            "Registering user with email: %s",
+            email,
+            extra={"email": email, "username": username},
         )
 
-        if self._user_repository.get_by_email(email):
-            self._logger.warning(
-                f"User with email {email} already exists", extra={"email": email}
-            )
-            raise UserAlreadyExistsException(f"User with email {email} already exists")
-        if self._user_repository.get_by_username(username):
-            self._logger.warning(
-                f"User with username {username} already exists",
-                extra={"username": username},
-            )
-            raise UserAlreadyExistsException(
-                f"User with username {username} already exists"
-            )
-
         user = User(
             id=str(uuid.uuid4()),
             display_name=display_name,
             email=email,
-            password=self._password_hasher.hash(password),
+            password=await self._password_hasher.hash(password),
             username=username,
             created_at=pendulum.now().to_iso8601_string(),
         )
 
-        self._user_repository.create_user(user.model_dump(exclude_none=True))
+        try:
+            await self._user_repository.create_user(user.model_dump(exclude_none=True))
+        except ClientError as err:
+            if err.response["Error"]["Code"] != "TransactionCanceledException":
+                raise
+            _, email_reason, username_reason = err.response["CancellationReasons"]
+            if email_reason["Code"] == "ConditionalCheckFailed":
+                self._logger.warning(
+                    "User with email %s already exists", email, extra={"email": email}
+                )
+                raise UserAlreadyExistsException(
+                    f"User with email {email} already exists"
+                )
+            if username_reason["Code"] == "ConditionalCheckFailed":
+                self._logger.warning(
+                    "User with username %s already exists",
+                    username,
+                    extra={"username": username},
+                )
+                raise UserAlreadyExistsException(
+                    f"User with username {username} already exists"
+                )
+            raise
 
         return user.id
@@ -1,23 +1,105 @@
 import os
+from typing import Any
 
-from aws_lambda_powertools.utilities import parameters
-from pydantic import computed_field
+from pydantic import PrivateAttr, computed_field
 from pydantic_settings import BaseSettings
 
+from app.secret_provider import SecretProvider
+from app.timing import timed
+
 
 class Settings(BaseSettings):
     app_name: str
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+    argon2_time_cost: int = 3
+    compression_brotli_quality: int = 4
+    compression_content_types: list[str] = ["application/json", "text/"]
+    compression_encodings: list[str] = ["zstd", "br", "gzip"]
+    compression_gzip_level: int = 6
+    compression_minimum_size: int = 1024
+    compression_zstd_level: int = 3
     default_timezone: str
     aws_access_key_id: str
     aws_secret_access_key: str
+    aws_lambda_function_name: str | None = None
+    password_hasher_max_pending: int = 8
+    password_hasher_max_workers: int = 2
+    password_hasher_use_processes: bool = False
+    jwks_max_age: int = 300
+    jwt_algorithm: str = "HS256"
+    jwt_secret_refresh_interval: int = 300
     jwt_token_lifetime: int = 3600
+    login_account_bucket_capacity: int | None = 5
+    login_account_bucket_refill_rate: float = 0.1
+    login_account_max_failures: int | None = 10
+    login_bucket_max_size: int = 10000
+    login_failure_window: int = 900
+    login_ip_bucket_capacity: int | None = 20
+    login_ip_bucket_refill_rate: float = 1
+    login_ip_max_failures: int | None = 100
+    log_expected_error_sample_rate: float = 1.0
+    log_route_sample_rates: dict[str, float] = {}
+    log_sample_rates: dict[str, float] = {}
     debug: bool = False
+    dynamodb_connect_timeout: float = 1
+    dynamodb_endpoint_url: str | None = None
+    dynamodb_keepalive_expiry: float = 60
+    dynamodb_max_attempts: int = 3
+    dynamodb_max_connections: int = 10
+    dynamodb_retry_base_delay: float = 0.05
+    dynamodb_timeout: float = 5
+    dynamodb_warm_connections: int = 1
     refresh_token_lifetime: int = 1209600
     stage: str
+    stateless_token_validation: bool = False
+    token_cache_max_size: int = 10000
+    token_cache_negative_ttl: int = 5
+    token_cache_positive_ttl: int = 30
+    token_revocation_epoch_check_interval: int | None = None
+    token_revocation_filter_capacity: int = 1000000
+    token_revocation_filter_error_rate: float = 0.001
+    token_revocation_sync_interval: int = 5
+    token_revocation_sync_overlap: int = 5
+
+    _jwt_secret_provider: SecretProvider = PrivateAttr()
+    _jwt_signing_keys_provider: SecretProvider = PrivateAttr()
+
+    def model_post_init(self, context: Any):
+        self._jwt_secret_provider = SecretProvider(
+            self._fetch_jwt_secret, self.jwt_secret_refresh_interval
+        )
+        self._jwt_signing_keys_provider = SecretProvider(
+            self._fetch_jwt_signing_keys, self.jwt_secret_refresh_interval
+        )
 
     @computed_field
     @property
     def jwt_secret(self) -> str:
+        return self._jwt_secret_provider.get()
+
+    @property
+    def jwt_secret_provider(self) -> SecretProvider:
+        return self._jwt_secret_provider
+
+    @property
+    def jwt_signing_keys_provider(self) -> SecretProvider:
+        return self._jwt_signing_keys_provider
+
+    @timed("ssm.jwt_secret")
+    def _fetch_jwt_secret(self) -> str:
+        from aws_lambda_powertools.utilities import parameters
+
+        return parameters.get_parameter(
+            os.environ.get("JWT_SECRET_SSM_PARAM_NAME"), decrypt=True, force_fetch=True
+        )
+
+    @timed("ssm.jwt_signing_keys")
+    def _fetch_jwt_signing_keys(self) -> str:
+        from aws_lambda_powertools.utilities import parameters
+
         return parameters.get_parameter(
-            os.environ.get("JWT_SECRET_SSM_PARAM_NAME"), decrypt=True
+            os.environ.get("JWT_SIGNING_KEYS_SSM_PARAM_NAME"),
+            decrypt=True,
+            force_fetch=True,
         )
@@ -0,0 +1,115 @@
+import functools
+import hashlib
+import json
+from typing import Any
+
+import jwt
+from jwt import DecodeError
+
+from app import settings
+from app.timing import span
+
+HS256 = "HS256"
+
+
+class SigningKey:
+    def __init__(
+        self,
+        kid: str,
+        algorithm: str,
+        private_key: str | None = None,
+        public_key: str | None = None,
+    ):
+        jwt_algorithm = jwt.get_algorithm_by_name(algorithm)
+        self.kid = kid
+        # retired keys only need their public half to keep verifying old tokens
+        self.private_key = (
+            None if private_key is None else jwt_algorithm.prepare_key(private_key)
+        )
+        self.public_key = (
+            jwt_algorithm.prepare_key(public_key)
+            if self.private_key is None
+            else self.private_key.public_key()
+        )
+        jwk = jwt_algorithm.to_jwk(self.public_key, as_dict=True)
+        jwk.pop("key_ops", None)
+        self.jwk = {**jwk, "alg": algorithm, "kid": kid, "use": "sig"}
+
+
+class KeySet:
+    def __init__(self, active_kid: str, keys: list[SigningKey]):
+        self._keys = {key.kid: key for key in keys}
+        self.active = self._keys[active_kid]
+        if self.active.private_key is None:
+            raise ValueError(f"The active signing key has no private key {active_kid=}")
+        self.private_key = self.active.private_key
+        self.jwks = json.dumps(
+            {"keys": [key.jwk for key in keys]}, separators=(",", ":")
+        ).encode()
+        self.etag = f'"{hashlib.sha256(self.jwks).hexdigest()[:32]}"'
+
+    def get(self, kid: str | None) -> SigningKey | None:
+        return self._keys.get(kid) if kid is not None else None
+
+    @classmethod
+    def from_json(cls, value: str, algorithm: str) -> "KeySet":
+        document = json.loads(value)
+        return cls(
+            document["active_kid"],
+            [
+                SigningKey(
+                    key["kid"], algorithm, key.get("private_key"), key.get("public_key")
+                )
+                for key in document["keys"]
+            ],
+        )
+
+
+EMPTY_KEY_SET_JWKS = b'{"keys":[]}'
+EMPTY_KEY_SET_ETAG = f'"{hashlib.sha256(EMPTY_KEY_SET_JWKS).hexdigest()[:32]}"'
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_key_set(value: str, algorithm: str) -> KeySet:
+    return KeySet.from_json(value, algorithm)
+
+
+def get_key_set() -> KeySet:
+    return _parse_key_set(
+        settings.jwt_signing_keys_provider.get(), settings.jwt_algorithm
+    )
+
+
+def get_jwks() -> tuple[bytes, str]:
+    if settings.jwt_algorithm == HS256:
+        return EMPTY_KEY_SET_JWKS, EMPTY_KEY_SET_ETAG
+    key_set = get_key_set()
+    return key_set.jwks, key_set.etag
+
+
+def encode_token(payload: dict[str, Any]) -> str:
+    if settings.jwt_algorithm == HS256:
+        secret = settings.jwt_secret
+        with span("jwt.encode"):
+            return jwt.encode(payload, secret, algorithm=HS256)
+    key_set = get_key_set()
+    with span("jwt.encode"):
+        return jwt.encode(
+            payload,
+            key_set.private_key,
+            algorithm=settings.jwt_algorithm,
+            headers={"kid": key_set.active.kid},
+        )
+
+
+def decode_token(token: str) -> dict[str, Any]:
+    if settings.jwt_algorithm == HS256:
+        secret = settings.jwt_secret
+        with span("jwt.decode"):
+            return jwt.decode(token, secret, algorithms=[HS256])
+    kid = jwt.get_unverified_header(token).get("kid")
+    key = get_key_set().get(kid)
+    if key is None:
+        raise DecodeError(f"Unknown signing key {kid=}")
+    with span("jwt.decode"):
+        return jwt.decode(token, key.public_key, algorithms=[settings.jwt_algorithm])
@@ -0,0 +1,105 @@
+import json
+import logging
+import random
+import re
+from contextvars import ContextVar
+from typing import Any
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.logging.formatter import LambdaPowertoolsFormatter
+from aws_lambda_powertools.logging.types import LogRecord
+
+REDACTED = "[REDACTED]"
+SECRET_KEYS = frozenset(
+    {
+        "access_token",
+        "accesstoken",
+        "authorization",
+        "confirm_password",
+        "confirmpassword",
+        "cookie",
+        "password",
+        "password_hash",
+        "passwordhash",
+        "private_key",
+        "refresh_token",
+        "refreshtoken",
+        "secret",
+        "token",
+        "tokens",
+    }
+)
+SECRET_PATTERN = re.compile(
+    r"(?P<jwt>eyJ[\w-]+\.eyJ[\w-]+\.[\w-]*)"
+    r'|(?P<key>"(?:'
+    + "|".join(SECRET_KEYS)
+    + r')"\s*:\s*)(?:"(?:[^"\\]|\\.)*"|\[[^\]]*\])',
+    re.IGNORECASE,
+)
+
+request_sampled: ContextVar[bool] = ContextVar("request_sampled", default=True)
+
+
+def _redact_match(match: re.Match[str]) -> str:
+    if match.group("key") is None:
+        return REDACTED
+    return f'{match.group("key")}"{REDACTED}"'
+
+
+def redact(value: Any) -> Any:
+    if isinstance(value, str):
+        # the substring checks keep the regex off the common plain-text message
+        if '"' in value or "eyJ" in value:
+            return SECRET_PATTERN.sub(_redact_match, value)
+        return value
+    if isinstance(value, dict):
+        return {
+            key: REDACTED
+            if isinstance(key, str) and key.lower() in SECRET_KEYS
+            else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+def loads_json_document(value: Any) -> Any:
+    # Powertools tries to decode every message as JSON, which raises for plain text
+    if isinstance(value, str) and value.startswith(("{", "[")):
+        return json.loads(value)
+    return value
+
+
+class RedactingFormatter(LambdaPowertoolsFormatter):
+    def serialize(self, log: LogRecord) -> str:
+        return super().serialize(redact(log))
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, level_rates: dict[str, float]):
+        super().__init__()
+        self._level_rates = {
+            logging.getLevelNamesMapping()[level.upper()]: rate
+            for level, rate in level_rates.items()
+        }
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if not request_sampled.get():
+            return False
+        rate = self._level_rates.get(record.levelno, 1.0)
+        return rate >= 1 or random.random() < rate
+
+
+def sample_request(rate: float | None) -> bool:
+    return rate is None or rate >= 1 or random.random() < rate
+
+
+logger = Logger(
+    utc=True,
+    logger_formatter=RedactingFormatter(
+        json_deserializer=loads_json_document, utc=True
+    ),
+)
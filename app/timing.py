@@ -0,0 +1,53 @@
+import functools
+import inspect
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+spans: ContextVar[dict[str, float] | None] = ContextVar("spans", default=None)
+
+
+@contextmanager
+def span(name: str) -> Generator[None]:
+    recorded = spans.get()
+    if recorded is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        # concurrent spans of the same name add up, so the breakdown shows where
+        # the time went rather than the wall-clock time of the request
+        recorded[name] = (
+            recorded.get(name, 0.0) + (time.perf_counter() - started_at) * 1000
+        )
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def server_timing(recorded: dict[str, float]) -> str:
+    return ", ".join(
+        f"{name};dur={duration:.1f}" for name, duration in recorded.items()
+    )
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app import settings
+from app.structured_logging import logger
+
+
+class TokenCache:
+    def __init__(
+        self,
+        max_size: int = 10000,
+        positive_ttl: float = 30,
+        negative_ttl: float = 5,
+        revocation_epoch_check_interval: float | None = None,
+    ):
+        self._entries: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self._negative_ttl = negative_ttl
+        self._positive_ttl = positive_ttl
+        self._revocation_epoch: int | None = None
+        self._revocation_epoch_check_interval = revocation_epoch_check_interval
+        self._next_revocation_epoch_check_at = 0.0
+        self._revoked_before: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, entries: OrderedDict[str, tuple[Any, float]], key: str) -> Any:
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return value
+
+    def _put(
+        self,
+        entries: OrderedDict[str, tuple[Any, float]],
+        key: str,
+        value: Any,
+        ttl: float,
+    ):
+        with self._lock:
+            entries[key] = (value, time.monotonic() + ttl)
+            entries.move_to_end(key)
+            while len(entries) > self._max_size:
+                entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._revoked_before.clear()
+
+    def get(self, jti: str) -> bool | None:
+        return self._get(self._entries, jti)
+
+    def get_revoked_before(self, sub: str) -> int | None:
+        return self._get(self._revoked_before, sub)
+
+    def invalidate(self, jti: str):
+        with self._lock:
+            self._entries.pop(jti, None)
+
+    def put(self, jti: str, is_valid: bool, exp: int | None = None):
+        ttl = self._positive_ttl if is_valid else self._negative_ttl
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0:
+            return
+        self._put(self._entries, jti, is_valid, ttl)
+
+    def put_revoked_before(self, sub: str, issued_before: int):
+        self._put(self._revoked_before, sub, issued_before, self._positive_ttl)
+
+    async def sync_revocation_epoch(
+        self, get_revocation_epoch: Callable[[], Awaitable[int]]
+    ) -> bool:
+        if self._revocation_epoch_check_interval is None:
+            return True
+        now = time.monotonic()
+        if now < self._next_revocation_epoch_check_at:
+            return True
+        self._next_revocation_epoch_check_at = (
+            now + self._revocation_epoch_check_interval
+        )
+        try:
+            revocation_epoch = await get_revocation_epoch()
+        except Exception:
+            logger.warning(
+                "Failed to get the revocation epoch, bypassing the token cache",
+                exc_info=True,
+            )
+            self._next_revocation_epoch_check_at = 0.0
+            return False
+        if (
+            self._revocation_epoch is not None
+            and revocation_epoch != self._revocation_epoch
+        ):
+            self.clear()
+        self._revocation_epoch = revocation_epoch
+        return True
+
+
+token_cache = TokenCache(
+    settings.token_cache_max_size,
+    settings.token_cache_positive_ttl,
+    settings.token_cache_negative_ttl,
+    settings.token_revocation_epoch_check_interval,
+)
@@ -0,0 +1,262 @@
+import argparse
+import asyncio
+import csv
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, TextIO
+
+import pendulum
+from argon2 import PasswordHasher
+from pydantic import ValidationError
+
+from app import settings
+from app.dynamodb import DynamoDBClient, Table
+from app.models.user import User, UserImportRecord
+from app.repositories.user_repository import EMAIL_GUARD_PREFIX, USERNAME_GUARD_PREFIX
+
+
+def read_csv(file: TextIO) -> Iterator[tuple[int, dict[str, str]]]:
+    reader = csv.DictReader(file)
+    for row in reader:
+        yield (
+            reader.line_num,
+            {key: value for key, value in row.items() if key and value},
+        )
+
+
+def read_ndjson(file: TextIO) -> Iterator[tuple[int, str]]:
+    for line_number, line in enumerate(file, 1):
+        if line.strip():
+            yield line_number, line
+
+
+READERS: dict[str, Callable[[TextIO], Iterator[tuple[int, Any]]]] = {
+    "csv": read_csv,
+    "ndjson": read_ndjson,
+}
+
+
+def parse(record: str | dict[str, str]) -> UserImportRecord:
+    if isinstance(record, str):
+        return UserImportRecord.model_validate_json(record)
+    return UserImportRecord.model_validate(record)
+
+
+def describe(err: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, error['loc'])) or 'record'}: {error['msg']}"
+        for error in err.errors()
+    )
+
+
+def guard_keys(user: User) -> list[str]:
+    return [
+        f"{EMAIL_GUARD_PREFIX}{user.email}",
+        f"{USERNAME_GUARD_PREFIX}{user.username}",
+    ]
+
+
+class UserImport:
+    def __init__(
+        self,
+        table: Table,
+        password_hasher: PasswordHasher,
+        executor: Executor,
+        chunk_size: int = 200,
+    ):
+        self.counts = {
+            "records": 0,
+            "imported": 0,
+            "invalid": 0,
+            "duplicates": 0,
+            "conflicts": 0,
+            "failed": 0,
+        }
+        self.errors: list[tuple[int, str]] = []
+        self._chunk_size = chunk_size
+        self._emails: set[str] = set()
+        self._executor = executor
+        self._password_hasher = password_hasher
+        self._table = table
+        self._usernames: set[str] = set()
+
+    async def run(
+        self, records: Iterable[tuple[int, str | dict[str, str]]]
+    ) -> dict[str, int]:
+        chunk = []
+        for line_number, raw_record in records:
+            self.counts["records"] += 1
+            record = self._accept(line_number, raw_record)
+            if record is not None:
+                chunk.append((line_number, record))
+            if len(chunk) >= self._chunk_size:
+                await self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            await self._import_chunk(chunk)
+        return self.counts
+
+    def _accept(
+        self, line_number: int, raw_record: str | dict[str, str]
+    ) -> UserImportRecord | None:
+        try:
+            record = parse(raw_record)
+        except ValidationError as err:
+            self._fail(line_number, "invalid", describe(err))
+            return None
+        if record.email in self._emails:
+            self._fail(line_number, "duplicates", f"Duplicate email {record.email}")
+            return None
+        if record.username in self._usernames:
+            self._fail(
+                line_number, "duplicates", f"Duplicate username {record.username}"
+            )
+            return None
+        self._emails.add(record.email)
+        self._usernames.add(record.username)
+        return record
+
+    def _fail(self, line_number: int, reason: str, error: str):
+        self.counts[reason] += 1
+        self.errors.append((line_number, error))
+
+    async def _hash(self, record: UserImportRecord) -> str:
+        if record.password_hash is not None:
+            return record.password_hash
+        return await asyncio.wrap_future(
+            self._executor.submit(self._password_hasher.hash, str(record.password))
+        )
+
+    async def _get_taken_guard_keys(self, users: list[User]) -> set[str]:
+        response = await self._table.batch_get_item(
+            [{"id": guard_key} for user in users for guard_key in guard_keys(user)],
+            ProjectionExpression="id",
+        )
+        unprocessed_keys = (
+            response.get("UnprocessedKeys", {}).get(self._table.name, {}).get("Keys")
+        )
+        # a guard that could not be read is treated as taken rather than overwritten
+        return {item["id"] for item in response["Responses"][self._table.name]} | {
+            key["id"] for key in unprocessed_keys or []
+        }
+
+    async def _import_chunk(self, chunk: list[tuple[int, UserImportRecord]]):
+        created_at = pendulum.now().to_iso8601_string()
+        password_hashes = await asyncio.gather(
+            *(self._hash(record) for _, record in chunk)
+        )
+        users = [
+            (
+                line_number,
+                User(
+                    id=str(uuid.uuid4()),
+                    display_name=record.display_name,
+                    email=record.email,
+                    password=password_hash,
+                    username=record.username,
+                    created_at=created_at,
+                ),
+            )
+            for (line_number, record), password_hash in zip(chunk, password_hashes)
+        ]
+        taken_guard_keys = await self._get_taken_guard_keys([user for _, user in users])
+
+        requests = []
+        line_numbers = {}
+        for line_number, user in users:
+            taken = [key for key in guard_keys(user) if key in taken_guard_keys]
+            if taken:
+                self._fail(line_number, "conflicts", f"{taken[0]} already exists")
+                continue
+            line_numbers[user.id] = line_number
+            requests.append(
+                {"PutRequest": {"Item": user.model_dump(exclude_none=True)}}
+            )
+            requests.extend(
+                {"PutRequest": {"Item": {"id": guard_key, "user_id": user.id}}}
+                for guard_key in guard_keys(user)
+            )
+        if not requests:
+            return
+
+        response = await self._table.batch_write_item(requests)
+        failed_user_ids = {
+            request["PutRequest"]["Item"].get("user_id")
+            or request["PutRequest"]["Item"]["id"]
+            for request in response.get("UnprocessedItems", {}).get(
+                self._table.name, []
+            )
+        }
+        for user_id, line_number in line_numbers.items():
+            if user_id in failed_user_ids:
+                self._fail(
+                    line_number,
+                    "failed",
+                    f"Write of user {user_id} was not processed, remove it and retry",
+                )
+            else:
+                self.counts["imported"] += 1
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Import users from an NDJSON or CSV file"
+    )
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--format", choices=READERS, help="defaults to the file extension"
+    )
+    parser.add_argument("--table", default=f"{settings.stage}-users")
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-attempts", type=int, default=10)
+    args = parser.parse_args(argv)
+    file_format = args.format or args.path.suffix.lstrip(".").lower()
+    if file_format not in READERS:
+        parser.error(f"unknown format of {args.path}, use --format")
+
+    dynamodb_client = DynamoDBClient(
+        settings.dynamodb_endpoint_url,
+        max_attempts=args.max_attempts,
+        timeout=settings.dynamodb_timeout,
+        retry_base_delay=settings.dynamodb_retry_base_delay,
+    )
+    password_hasher = PasswordHasher(
+        time_cost=settings.argon2_time_cost,
+        memory_cost=settings.argon2_memory_cost,
+        parallelism=settings.argon2_parallelism,
+    )
+    with (
+        args.path.open(newline="") as file,
+        ProcessPoolExecutor(
+            args.workers, mp_context=multiprocessing.get_context("forkserver")
+        ) as executor,
+    ):
+        user_import = UserImport(
+            dynamodb_client.table(args.table),
+            password_hasher,
+            executor,
+            args.chunk_size,
+        )
+        started_at = time.perf_counter()
+        counts = asyncio.run(user_import.run(READERS[file_format](file)))
+        elapsed = time.perf_counter() - started_at
+
+    for line_number, error in user_import.errors:
+        print(f"line {line_number}: {error}", file=sys.stderr)
+    print(
+        f"Imported {counts['imported']} of {counts['records']} users in "
+        f"{elapsed:.1f}s ({counts['imported'] / elapsed:.1f} users/s), "
+        f"{counts['invalid']} invalid, {counts['duplicates']} duplicates, "
+        f"{counts['conflicts']} conflicts, {counts['failed']} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
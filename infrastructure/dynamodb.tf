@@ -36,14 +36,62 @@ resource "aws_dynamodb_table" "tokens" {
     type = "S"
   }
 
+  attribute {
+    name = "sub"
+    type = "S"
+  }
+
   global_secondary_index {
     hash_key        = "refresh_token"
     name            = "RefreshTokenIndex"
     projection_type = "ALL"
   }
 
+  global_secondary_index {
+    hash_key        = "sub"
+    name            = "SubIndex"
+    projection_type = "KEYS_ONLY"
+  }
+
   ttl {
     attribute_name = "ttl"
     enabled        = true
   }
-}
\ No newline at end of file
+}
+resource "aws_dynamodb_table" "token_revocations" {
+  name         = "${var.stage}-token-revocations"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "day"
+  range_key    = "revocation_id"
+
+  attribute {
+    name = "day"
+    type = "S"
+  }
+
+  attribute {
+    name = "revocation_id"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "ttl"
+    enabled        = true
+  }
+}
+
+resource "aws_dynamodb_table" "login_attempts" {
+  name         = "${var.stage}-login-attempts"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "id"
+
+  attribute {
+    name = "id"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "ttl"
+    enabled        = true
+  }
+}
@@ -37,14 +37,39 @@ resource "aws_iam_policy" "lambda_policy" {
       {
         Effect   = "Allow"
         Action   = [
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:DeleteItem",
           "dynamodb:GetItem",
           "dynamodb:PutItem",
           "dynamodb:Query",
+          "dynamodb:UpdateItem",
         ]
         Resource = [
           aws_dynamodb_table.tokens.arn,
-          "${aws_dynamodb_table.tokens.arn}/index/RefreshTokenIndex"
+          "${aws_dynamodb_table.tokens.arn}/index/RefreshTokenIndex",
+          "${aws_dynamodb_table.tokens.arn}/index/SubIndex"
+        ]
+      },
+      {
+        Effect   = "Allow"
+        Action   = [
+          "dynamodb:PutItem",
+          "dynamodb:Query",
+        ]
+        Resource = [
+          aws_dynamodb_table.token_revocations.arn
+        ]
+      },
+      {
+        Effect   = "Allow"
+        Action   = [
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:UpdateItem",
+        ]
+        Resource = [
+          aws_dynamodb_table.login_attempts.arn
         ]
       },
       {
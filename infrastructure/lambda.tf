@@ -45,12 +45,21 @@ resource "aws_lambda_function" "fastapi" {
       APP_NAME                             = var.app_name
       DEBUG                                = var.debug
       DEFAULT_TIMEZONE                     = var.default_timezone
+      JWT_ALGORITHM                        = var.jwt_algorithm
       JWT_SECRET_SSM_PARAM_NAME            = var.jwt_secret_ssm_param_name
+      JWT_SIGNING_KEYS_SSM_PARAM_NAME      = var.jwt_signing_keys_ssm_param_name
+      LOGIN_ACCOUNT_MAX_FAILURES           = var.login_account_max_failures
+      LOGIN_FAILURE_WINDOW                 = var.login_failure_window
+      LOGIN_IP_MAX_FAILURES                = var.login_ip_max_failures
+      LOG_EXPECTED_ERROR_SAMPLE_RATE       = var.log_expected_error_sample_rate
       LOG_LEVEL                            = var.log_level
-      POWERTOOLS_LOGGER_LOG_EVENT          = "true"
+      LOG_ROUTE_SAMPLE_RATES               = jsonencode(var.log_route_sample_rates)
+      LOG_SAMPLE_RATES                     = jsonencode(var.log_sample_rates)
+      POWERTOOLS_LOGGER_LOG_EVENT          = "false"
       POWERTOOLS_SERVICE_NAME              = var.power_tools_service_name
       POWERTOOLS_DEBUG                     = "false"
       STAGE                                = var.stage
+      STATELESS_TOKEN_VALIDATION           = var.stateless_token_validation
     }
   }
 
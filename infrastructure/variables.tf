@@ -23,16 +23,61 @@ variable "debug" {
   type    = bool
 }
 
+variable "jwt_algorithm" {
+  default = "HS256"
+  type    = string
+}
+
 variable "jwt_secret_ssm_param_name" {
   type = string
 }
 
+variable "jwt_signing_keys_ssm_param_name" {
+  default = ""
+  type    = string
+}
+
+variable "login_account_max_failures" {
+  default = 10
+  type    = number
+}
+
+variable "login_failure_window" {
+  default = 900
+  type    = number
+}
+
+variable "login_ip_max_failures" {
+  default = 100
+  type    = number
+}
+
+variable "log_expected_error_sample_rate" {
+  default = 0.1
+  type    = number
+}
+
 variable "log_level" {
   default = "INFO"
   type    = string
 }
 
+variable "log_route_sample_rates" {
+  default = {}
+  type    = map(number)
+}
+
+variable "log_sample_rates" {
+  default = {}
+  type    = map(number)
+}
+
 variable "power_tools_service_name" {
   default = "auth-service"
   type    = string
 }
+
+variable "stateless_token_validation" {
+  default = false
+  type    = bool
+}
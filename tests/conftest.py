@@ -7,13 +7,50 @@ import boto3
 import pendulum
 import pytest
 from argon2 import PasswordHasher
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
 from moto import mock_aws
+from moto.moto_server.werkzeug_app import (
+    DomainDispatcherApplication,
+    create_backend_app,
+)
+from moto.server import ThreadedMotoServer
+from werkzeug.serving import make_server
 
+from app import settings as app_settings
 from app.models.jwt import JWTToken
 from app.models.user import User
 from app.settings import Settings
 
 
+class SerialMotoServer(ThreadedMotoServer):
+    # moto backends are not thread-safe, transactions snapshot and restore whole
+    # tables, so requests are handled one at a time like DynamoDB would per item
+    def _server_entry(self):
+        self._server = make_server(
+            self._ip_address,
+            self._port,
+            DomainDispatcherApplication(create_backend_app),
+        )
+        self._server_ready_event.set()
+        self._server.serve_forever()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def moto_server():
+    server = SerialMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    app_settings.dynamodb_endpoint_url = f"http://{host}:{port}"
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
 @pytest.fixture(autouse=True)
 def setup(monkeypatch):
     with mock_aws():
@@ -89,6 +126,8 @@ def initialize_users_table(dynamodb_resource, user: User, users_table_name: str)
         ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
     )
     users_table.put_item(Item=user.model_dump())
+    users_table.put_item(Item={"id": f"EMAIL#{user.email}", "user_id": user.id})
+    users_table.put_item(Item={"id": f"USERNAME#{user.username}", "user_id": user.id})
 
 
 @pytest.fixture
@@ -99,6 +138,7 @@ def initialize_tokens_table(
         AttributeDefinitions=[
             {"AttributeName": "jti", "AttributeType": "S"},
             {"AttributeName": "refresh_token", "AttributeType": "S"},
+            {"AttributeName": "sub", "AttributeType": "S"},
         ],
         TableName=tokens_table_name,
         KeySchema=[{"AttributeName": "jti", "KeyType": "HASH"}],
@@ -108,6 +148,11 @@ def initialize_tokens_table(
                 "KeySchema": [{"AttributeName": "refresh_token", "KeyType": "HASH"}],
                 "Projection": {"ProjectionType": "ALL"},
             },
+            {
+                "IndexName": "SubIndex",
+                "KeySchema": [{"AttributeName": "sub", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "KEYS_ONLY"},
+            },
         ],
         ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
     )
@@ -116,12 +161,41 @@ def initialize_tokens_table(
             "jti": jwt_token.jti,
             "jwt_token": jwt_token.model_dump(),
             "refresh_token": refresh_token,
+            "sub": jwt_token.sub,
             "created_at": pendulum.now().to_iso8601_string(),
             "ttl": jwt_token.exp,
         }
     )
 
 
+@pytest.fixture
+def initialize_token_revocations_table(
+    dynamodb_resource, token_revocations_table_name: str
+):
+    dynamodb_resource.create_table(
+        AttributeDefinitions=[
+            {"AttributeName": "day", "AttributeType": "S"},
+            {"AttributeName": "revocation_id", "AttributeType": "S"},
+        ],
+        TableName=token_revocations_table_name,
+        KeySchema=[
+            {"AttributeName": "day", "KeyType": "HASH"},
+            {"AttributeName": "revocation_id", "KeyType": "RANGE"},
+        ],
+        ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
+    )
+
+
+@pytest.fixture
+def initialize_login_attempts_table(dynamodb_resource, login_attempts_table_name: str):
+    dynamodb_resource.create_table(
+        AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+        TableName=login_attempts_table_name,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
+    )
+
+
 @pytest.fixture
 def jwt_token(user: User) -> JWTToken:
     iat = pendulum.now()
@@ -138,6 +212,18 @@ def jwt_token(user: User) -> JWTToken:
     )
 
 
+@pytest.fixture
+def login_attempts_table(
+    dynamodb_resource, initialize_login_attempts_table, login_attempts_table_name: str
+):
+    return dynamodb_resource.Table(login_attempts_table_name)
+
+
+@pytest.fixture
+def login_attempts_table_name() -> str:
+    return f"{os.getenv('STAGE')}-login-attempts"
+
+
 @pytest.fixture
 def refresh_token() -> str:
     return secrets.token_hex(16)
@@ -188,6 +274,52 @@ def tokens_table(dynamodb_resource, initialize_tokens_table, tokens_table_name:
     return dynamodb_resource.Table(tokens_table_name)
 
 
+@pytest.fixture
+def token_revocations_table(
+    dynamodb_resource,
+    initialize_token_revocations_table,
+    token_revocations_table_name: str,
+):
+    return dynamodb_resource.Table(token_revocations_table_name)
+
+
+@pytest.fixture
+def token_revocations_table_name() -> str:
+    return f"{os.getenv('STAGE')}-token-revocations"
+
+
+@pytest.fixture
+def jwt_signing_keys() -> dict[str, Any]:
+    private_keys = [
+        rsa.generate_private_key(public_exponent=65537, key_size=2048) for _ in range(2)
+    ]
+    return {
+        "active_kid": "current",
+        "keys": [
+            {
+                "kid": "current",
+                "private_key": private_keys[0]
+                .private_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PrivateFormat.PKCS8,
+                    serialization.NoEncryption(),
+                )
+                .decode(),
+            },
+            {
+                "kid": "previous",
+                "public_key": private_keys[1]
+                .public_key()
+                .public_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PublicFormat.SubjectPublicKeyInfo,
+                )
+                .decode(),
+            },
+        ],
+    }
+
+
 @pytest.fixture
 def jwt_secret_ssm_param_value() -> str:
     return os.getenv("JWT_SECRET_SSM_PARAM_VALUE")
@@ -1,17 +1,28 @@
+import secrets
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import jwt
+import pendulum
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 from httpx import Response
 from respx import MockRouter, Route
 
+from app import settings
 from app.models.jwt import JWTToken
 from app.models.user import User
+from app.password_hasher import password_hashing_executor
+from app.rate_limiter import login_limiter
+from app.repositories.user_repository import UserRepository
 
 BASE_URL = "/api/v1"
 LOGIN_URL = f"{BASE_URL}/login"
+CONCURRENT_REQUESTS = 200
+INTROSPECT_URL = f"{BASE_URL}/introspect"
+LOGOUT_ALL_URL = f"{BASE_URL}/logout/all"
+LOGOUT_URL = f"{BASE_URL}/logout"
 PASSWORD = "12345678"
 REFRESH_URL = f"{BASE_URL}/refresh"
 
@@ -31,10 +42,14 @@ class TestAuthApi:
 
     @pytest.fixture
     def test_client(
-        self, initialize_tokens_table, initialize_users_table
+        self,
+        initialize_login_attempts_table,
+        initialize_tokens_table,
+        initialize_users_table,
     ) -> TestClient:
         from app.api_handler import app
 
+        login_limiter.clear()
         return TestClient(app, raise_server_exceptions=True)
 
     def _auth_header(
@@ -86,6 +101,74 @@ class TestAuthApi:
             "expires_in",
         ]
 
+    def test_successfully_break_down_login_latency(self, test_client: TestClient):
+        response = test_client.post(
+            LOGIN_URL,
+            json={"email": "root@netcode.hu", "password": PASSWORD},
+        )
+
+        assert {
+            "users.get_by_email",
+            "password_hasher.verify",
+            "tokens.create_token",
+            "jwt.encode",
+            "total",
+        } <= {
+            metric.split(";")[0]
+            for metric in response.headers["Server-Timing"].split(", ")
+        }
+
+    def test_fail_to_login_due_to_account_lockout(
+        self, mocker, test_client: TestClient, user: User
+    ):
+        mocker.patch.object(settings, "login_account_max_failures", 2)
+        verify = mocker.spy(password_hashing_executor, "verify")
+
+        responses = [
+            test_client.post(LOGIN_URL, json={"email": user.email, "password": "asd"})
+            for _ in range(2)
+        ]
+        response = test_client.post(
+            LOGIN_URL, json={"email": user.email, "password": PASSWORD}
+        )
+
+        assert [status.HTTP_401_UNAUTHORIZED] * 2 == [
+            response.status_code for response in responses
+        ]
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response.headers["Retry-After"]) >= 1
+        assert response.json()["error"] == "Too Many Requests"
+        assert 2 == verify.call_count
+
+    def test_fail_to_login_due_to_ip_throttling(
+        self, mocker, test_client: TestClient, user: User
+    ):
+        mocker.patch.object(settings, "login_ip_bucket_capacity", 1)
+        mocker.patch.object(settings, "login_ip_bucket_refill_rate", 0.5)
+        get_by_email = mocker.spy(UserRepository, "get_by_email")
+
+        test_client.post(LOGIN_URL, json={"email": user.email, "password": PASSWORD})
+        response = test_client.post(
+            LOGIN_URL, json={"email": "root@gmail.com", "password": PASSWORD}
+        )
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers["Retry-After"] == "2"
+        assert 1 == get_by_email.call_count
+
+    def test_fail_to_login_due_to_saturated_password_hasher(
+        self, mocker, test_client: TestClient, user: User
+    ):
+        mocker.patch.object(password_hashing_executor, "_max_pending", 0)
+
+        response = test_client.post(
+            LOGIN_URL, json={"email": user.email, "password": PASSWORD}
+        )
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == "1"
+        assert response.json()["error"] == "Service Unavailable"
+
     def test_fail_to_logout_due_to_missing_bearer_token(self, test_client: TestClient):
         response = test_client.get(f"{BASE_URL}/logout")
 
@@ -94,7 +177,6 @@ class TestAuthApi:
     def test_successfully_logout(
         self,
         jwt_token: JWTToken,
-        respx_mock: MockRouter,
         test_client: TestClient,
         jwt_secret_ssm_param_value: str,
     ):
@@ -105,6 +187,77 @@ class TestAuthApi:
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
 
+    def test_successfully_logout_everywhere(
+        self,
+        jwt_token: JWTToken,
+        jwt_secret_ssm_param_value: str,
+        test_client: TestClient,
+        tokens_table,
+    ):
+        headers = self._auth_header(jwt_token, jwt_secret_ssm_param_value)
+
+        response = test_client.get(LOGOUT_ALL_URL, headers=headers)
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert "Item" not in tokens_table.get_item(Key={"jti": jwt_token.jti})
+        assert (
+            test_client.get(LOGOUT_URL, headers=headers).status_code
+            == status.HTTP_403_FORBIDDEN
+        )
+
+    def test_successfully_introspect_tokens(
+        self,
+        jwt_token: JWTToken,
+        jwt_secret_ssm_param_value: str,
+        test_client: TestClient,
+        user: User,
+    ):
+        revoked_token = jwt_token.model_copy(update={"jti": str(uuid.uuid4())})
+
+        response = test_client.post(
+            INTROSPECT_URL,
+            json={
+                "tokens": [
+                    jwt.encode(
+                        token.model_dump(exclude_none=True), jwt_secret_ssm_param_value
+                    )
+                    for token in (jwt_token, revoked_token)
+                ]
+                + ["invalid"]
+            },
+            headers=self._auth_header(jwt_token, jwt_secret_ssm_param_value),
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "results": [
+                {
+                    "active": True,
+                    "exp": jwt_token.exp,
+                    "iat": jwt_token.iat,
+                    "jti": jwt_token.jti,
+                    "sub": user.id,
+                    "username": user.username,
+                },
+                {"active": False},
+                {"active": False},
+            ]
+        }
+
+    def test_fail_to_introspect_tokens_due_to_too_many_tokens(
+        self,
+        jwt_token: JWTToken,
+        jwt_secret_ssm_param_value: str,
+        test_client: TestClient,
+    ):
+        response = test_client.post(
+            INTROSPECT_URL,
+            json={"tokens": ["token"] * 101},
+            headers=self._auth_header(jwt_token, jwt_secret_ssm_param_value),
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
     def test_fail_to_refresh_due_to_jwt_token_not_found(
         self,
         jwt_token: JWTToken,
@@ -159,7 +312,6 @@ class TestAuthApi:
         self,
         jwt_token: JWTToken,
         refresh_token: str,
-        respx_mock: MockRouter,
         test_client: TestClient,
         jwt_secret_ssm_param_value: str,
     ):
@@ -171,6 +323,63 @@ class TestAuthApi:
 
         assert response.status_code == status.HTTP_200_OK
 
+    def test_successfully_logout_and_refresh_concurrently(
+        self,
+        test_client: TestClient,
+        tokens_table,
+        jwt_secret_ssm_param_value: str,
+    ):
+        iat = pendulum.now()
+        tokens = []
+        for _ in range(CONCURRENT_REQUESTS):
+            sub = str(uuid.uuid4())
+            jwt_token = JWTToken(
+                exp=iat.add(hours=1).int_timestamp,
+                iat=iat.int_timestamp,
+                jti=str(uuid.uuid4()),
+                sub=sub,
+                user={"id": sub},
+            )
+            refresh_token = secrets.token_hex(16)
+            tokens_table.put_item(
+                Item={
+                    "jti": jwt_token.jti,
+                    "jwt_token": jwt_token.model_dump(),
+                    "refresh_token": refresh_token,
+                    "sub": sub,
+                    "created_at": iat.to_iso8601_string(),
+                    "ttl": jwt_token.exp,
+                }
+            )
+            tokens.append((jwt_token, refresh_token))
+
+        def send(index: int) -> tuple[JWTToken, Response]:
+            jwt_token, refresh_token = tokens[index]
+            headers = self._auth_header(jwt_token, jwt_secret_ssm_param_value)
+            if index % 2:
+                return jwt_token, test_client.get(LOGOUT_URL, headers=headers)
+            return jwt_token, test_client.post(
+                REFRESH_URL, json={"refreshToken": refresh_token}, headers=headers
+            )
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            results = list(executor.map(send, range(CONCURRENT_REQUESTS)))
+
+        for jwt_token, response in results:
+            if response.request.method == "GET":
+                assert response.status_code == status.HTTP_204_NO_CONTENT
+            else:
+                assert response.status_code == status.HTTP_200_OK
+                assert (
+                    jwt.decode(
+                        response.json()["access_token"],
+                        jwt_secret_ssm_param_value,
+                        algorithms=["HS256"],
+                    )["sub"]
+                    == jwt_token.sub
+                )
+            assert "Item" not in tokens_table.get_item(Key={"jti": jwt_token.jti})
+
     def test_fail_to_register_due_to_missing_bearer_token(
         self, test_client: TestClient
     ):
@@ -0,0 +1,72 @@
+import json
+from typing import Any
+
+import jwt
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import settings
+
+JWKS_URL = "/.well-known/jwks.json"
+PASSWORD = "12345678"
+
+
+class TestWellKnownApi:
+    @pytest.fixture
+    def test_client(
+        self, mocker, initialize_tokens_table, initialize_users_table, jwt_signing_keys
+    ) -> TestClient:
+        from app.api_handler import app
+
+        mocker.patch.object(settings, "jwt_algorithm", "RS256")
+        mocker.patch.object(
+            settings.jwt_signing_keys_provider,
+            "get",
+            return_value=json.dumps(jwt_signing_keys),
+        )
+        return TestClient(app, raise_server_exceptions=True)
+
+    def test_successfully_get_jwks(self, test_client: TestClient):
+        response = test_client.get(JWKS_URL)
+
+        assert status.HTTP_200_OK == response.status_code
+        assert "public, max-age=300" == response.headers["Cache-Control"]
+        assert response.headers["ETag"]
+        assert ["current", "previous"] == [
+            key["kid"] for key in response.json()["keys"]
+        ]
+
+    @pytest.mark.parametrize("if_none_match", ["{etag}", 'W/{etag}, "other"', "*"])
+    def test_successfully_get_jwks_not_modified(
+        self, test_client: TestClient, if_none_match: str
+    ):
+        etag = test_client.get(JWKS_URL).headers["ETag"]
+
+        response = test_client.get(
+            JWKS_URL, headers={"If-None-Match": if_none_match.format(etag=etag)}
+        )
+
+        assert status.HTTP_304_NOT_MODIFIED == response.status_code
+        assert etag == response.headers["ETag"]
+        assert b"" == response.content
+
+    def test_successfully_verify_access_token_with_jwks(
+        self, test_client: TestClient, jwt_signing_keys: dict[str, Any]
+    ):
+        access_token = test_client.post(
+            "/api/v1/login", json={"email": "root@netcode.hu", "password": PASSWORD}
+        ).json()["access_token"]
+        jwks = jwt.PyJWKSet.from_dict(test_client.get(JWKS_URL).json())
+
+        kid = jwt.get_unverified_header(access_token)["kid"]
+        decoded_token = jwt.decode(
+            access_token, jwks[kid].key, algorithms=[jwks[kid].algorithm_name]
+        )
+
+        response = test_client.get(
+            "/api/v1/logout", headers={"Authorization": f"Bearer {access_token}"}
+        )
+        assert "current" == kid
+        assert decoded_token["jti"]
+        assert status.HTTP_204_NO_CONTENT == response.status_code
@@ -5,8 +5,10 @@ import pytest as pytest
 
 from app.jwt_bearer import JWTBearer
 from app.models.jwt import JWTToken
+from app.repositories.login_attempt_repository import LoginAttemptRepository
 from app.repositories.token_repository import TokenRepository
 from app.repositories.user_repository import UserRepository
+from app.services.login_attempt_service import LoginAttemptService
 from app.services.token_service import TokenService
 
 
@@ -15,12 +17,23 @@ def jwt_bearer() -> JWTBearer:
     return JWTBearer()
 
 
+@pytest.fixture
+def login_attempt_repository() -> LoginAttemptRepository:
+    return LoginAttemptRepository()
+
+
+@pytest.fixture
+def login_attempt_service() -> LoginAttemptService:
+    return LoginAttemptService()
+
+
 @pytest.fixture
 def token(jwt_token: JWTToken, refresh_token: str) -> dict[str, Any]:
     return {
         "jti": jwt_token.jti,
         "jwt_token": jwt_token.model_dump(),
         "refresh_token": refresh_token,
+        "sub": jwt_token.sub,
         "created_at": ANY,
         "ttl": jwt_token.exp,
     }
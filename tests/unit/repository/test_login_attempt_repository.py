@@ -0,0 +1,36 @@
+import pytest
+
+from app.repositories.login_attempt_repository import LoginAttemptRepository
+
+ATTEMPT_ID = "ACCOUNT#root@netcode.hu#1"
+pytestmark = pytest.mark.anyio
+
+
+class TestLoginAttemptRepository:
+    async def test_successfully_increment(
+        self, login_attempt_repository: LoginAttemptRepository, login_attempts_table
+    ):
+        assert 1 == await login_attempt_repository.increment(ATTEMPT_ID, 1800)
+        assert 2 == await login_attempt_repository.increment(ATTEMPT_ID, 2700)
+
+        assert {"id": ATTEMPT_ID, "attempts": 2, "ttl": 1800} == (
+            login_attempts_table.get_item(Key={"id": ATTEMPT_ID})["Item"]
+        )
+
+    async def test_successfully_get_counts(
+        self, login_attempt_repository: LoginAttemptRepository, login_attempts_table
+    ):
+        await login_attempt_repository.increment(ATTEMPT_ID, 1800)
+
+        assert {ATTEMPT_ID: 1} == await login_attempt_repository.get_counts(
+            [ATTEMPT_ID, "IP#127.0.0.1#1"]
+        )
+
+    async def test_successfully_delete_by_ids(
+        self, login_attempt_repository: LoginAttemptRepository, login_attempts_table
+    ):
+        await login_attempt_repository.increment(ATTEMPT_ID, 1800)
+
+        await login_attempt_repository.delete_by_ids([ATTEMPT_ID, "IP#127.0.0.1#1"])
+
+        assert [] == login_attempts_table.scan()["Items"]
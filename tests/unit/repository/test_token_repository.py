@@ -1,14 +1,19 @@
+import time
 import uuid
 from typing import Any
 
 import pendulum
+import pytest
+from botocore.exceptions import ClientError
 
 from app.models.jwt import JWTToken
 from app.repositories.token_repository import TokenRepository
 
+pytestmark = pytest.mark.anyio
+
 
 class TestTokenRepository:
-    def test_successfully_create_token(
+    async def test_successfully_create_token(
         self, jwt_token: JWTToken, token_repository: TokenRepository, tokens_table
     ):
         jwt_token.jti = str(uuid.uuid4())
@@ -20,7 +25,7 @@ class TestTokenRepository:
             "created_at": pendulum.now().to_iso8601_string(),
             "ttl": jwt_token.exp,
         }
-        token_repository.create_token(token)
+        await token_repository.create_token(token)
 
         response = tokens_table.get_item(
             Key={"jti": token["jti"]},
@@ -28,37 +33,37 @@ class TestTokenRepository:
 
         assert response["Item"] == token
 
-    def test_successfully_delete_by_id(
+    async def test_successfully_delete_by_id(
         self, jwt_token: JWTToken, token_repository: TokenRepository, tokens_table
     ):
-        response = token_repository.delete_by_id(jwt_token.jti)
+        response = await token_repository.delete_by_id(jwt_token.jti)
 
         assert response["ResponseMetadata"]["HTTPStatusCode"] == 200
 
-    def test_delete_by_id_returns_none_if_id_not_found(
+    async def test_delete_by_id_returns_none_if_id_not_found(
         self, token_repository: TokenRepository, tokens_table
     ):
-        response = token_repository.delete_by_id(str(uuid.uuid4()))
+        response = await token_repository.delete_by_id(str(uuid.uuid4()))
 
         assert response["Attributes"] == {}
 
-    def test_successfully_get_by_id(
+    async def test_successfully_get_by_id(
         self,
         jwt_token: JWTToken,
         refresh_token: str,
         token_repository: TokenRepository,
         tokens_table,
     ):
-        item = token_repository.get_by_id(jwt_token.jti)
+        item = await token_repository.get_by_id(jwt_token.jti)
 
         assert item == (jwt_token, refresh_token)
 
-    def test_get_by_id_returns_none_if_id_not_found(
+    async def test_get_by_id_returns_none_if_id_not_found(
         self, token_repository: TokenRepository, tokens_table
     ):
-        assert token_repository.get_by_id(str(uuid.uuid4())) is None
+        assert await token_repository.get_by_id(str(uuid.uuid4())) is None
 
-    def test_successfully_get_by_refresh_token(
+    async def test_successfully_get_by_refresh_token(
         self,
         jwt_token: JWTToken,
         refresh_token: str,
@@ -66,11 +71,196 @@ class TestTokenRepository:
         token_repository: TokenRepository,
         tokens_table,
     ):
-        item = token_repository.get_by_refresh_token(refresh_token)
+        item = await token_repository.get_by_refresh_token(refresh_token)
 
         assert item == token
 
-    def test_get_by_refresh_token_returns_none_if_refresh_token_not_found(
+    async def test_get_by_refresh_token_returns_none_if_refresh_token_not_found(
+        self, token_repository: TokenRepository, tokens_table
+    ):
+        assert await token_repository.get_by_refresh_token(str(uuid.uuid4())) is None
+
+    async def test_successfully_rotate_token(
+        self,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        token_repository: TokenRepository,
+        tokens_table,
+    ):
+        new_token = {
+            "jti": str(uuid.uuid4()),
+            "jwt_token": jwt_token.model_dump(),
+            "refresh_token": str(uuid.uuid4()),
+            "created_at": pendulum.now().to_iso8601_string(),
+            "ttl": jwt_token.exp,
+        }
+
+        await token_repository.rotate_token(
+            jwt_token.model_dump(), refresh_token, new_token
+        )
+
+        assert "Item" not in tokens_table.get_item(Key={"jti": jwt_token.jti})
+        assert new_token == tokens_table.get_item(Key={"jti": new_token["jti"]})["Item"]
+
+    async def test_successfully_rotate_token_with_revocation(
+        self,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        token_repository: TokenRepository,
+        token_revocations_table,
+        tokens_table,
+    ):
+        new_token = {
+            "jti": str(uuid.uuid4()),
+            "jwt_token": jwt_token.model_dump(),
+            "refresh_token": str(uuid.uuid4()),
+            "created_at": pendulum.now().to_iso8601_string(),
+            "ttl": jwt_token.exp,
+        }
+
+        await token_repository.rotate_token(
+            jwt_token.model_dump(), refresh_token, new_token, create_revocation=True
+        )
+
+        assert [jwt_token.jti] == await token_repository.get_revocations(
+            time.time_ns() // 1000000 - 60000
+        )
+
+    async def test_fail_to_rotate_token_due_to_refresh_token_mismatch(
+        self,
+        jwt_token: JWTToken,
+        token: dict[str, Any],
+        token_repository: TokenRepository,
+        tokens_table,
+    ):
+        new_token = {
+            "jti": str(uuid.uuid4()),
+            "jwt_token": jwt_token.model_dump(),
+            "refresh_token": str(uuid.uuid4()),
+            "created_at": pendulum.now().to_iso8601_string(),
+            "ttl": jwt_token.exp,
+        }
+
+        with pytest.raises(ClientError) as excinfo:
+            await token_repository.rotate_token(
+                jwt_token.model_dump(), str(uuid.uuid4()), new_token
+            )
+
+        assert "TransactionCanceledException" == excinfo.value.response["Error"]["Code"]
+        reason = excinfo.value.response["CancellationReasons"][0]
+        assert "ConditionalCheckFailed" == reason["Code"]
+        assert token == reason["Item"]
+        assert "Item" in tokens_table.get_item(Key={"jti": jwt_token.jti})
+        assert "Item" not in tokens_table.get_item(Key={"jti": new_token["jti"]})
+
+    async def test_successfully_get_revocation_epoch(
+        self, token_repository: TokenRepository, tokens_table
+    ):
+        await token_repository.increment_revocation_epoch()
+
+        assert 1 == await token_repository.get_revocation_epoch()
+
+    async def test_get_revocation_epoch_returns_zero_if_not_set(
+        self, token_repository: TokenRepository, tokens_table
+    ):
+        assert 0 == await token_repository.get_revocation_epoch()
+
+    async def test_successfully_increment_revocation_epoch(
         self, token_repository: TokenRepository, tokens_table
     ):
-        assert token_repository.get_by_refresh_token(str(uuid.uuid4())) is None
+        await token_repository.increment_revocation_epoch()
+
+        assert 2 == await token_repository.increment_revocation_epoch()
+
+    async def test_successfully_create_revocation(
+        self,
+        jwt_token: JWTToken,
+        token_repository: TokenRepository,
+        token_revocations_table,
+    ):
+        await token_repository.create_revocation(jwt_token.jti, jwt_token.exp)
+
+        items = token_revocations_table.scan()["Items"]
+        assert 1 == len(items)
+        assert jwt_token.jti == items[0]["jti"]
+        assert jwt_token.exp == items[0]["ttl"]
+        assert items[0]["revocation_id"].endswith(f"#{jwt_token.jti}")
+        assert time.strftime("%Y-%m-%d", time.gmtime()) == items[0]["day"]
+
+    async def test_successfully_get_revocations_since_checkpoint(
+        self, token_repository: TokenRepository, token_revocations_table
+    ):
+        now = time.time_ns() // 1000000
+        for revoked_at, jti in ((now - 2 * 86400000, "old"), (now - 1000, "new")):
+            token_revocations_table.put_item(
+                Item={
+                    "day": time.strftime("%Y-%m-%d", time.gmtime(revoked_at // 1000)),
+                    "revocation_id": f"{revoked_at:013d}#{jti}",
+                    "jti": jti,
+                }
+            )
+
+        assert ["new"] == await token_repository.get_revocations(now - 60000)
+        assert ["old", "new"] == await token_repository.get_revocations(
+            now - 3 * 86400000
+        )
+
+    async def test_successfully_get_existing_ids(
+        self, jwt_token: JWTToken, token_repository: TokenRepository, tokens_table
+    ):
+        missing_jti = str(uuid.uuid4())
+
+        existing_ids, unprocessed_ids = await token_repository.get_existing_ids(
+            [jwt_token.jti, missing_jti, jwt_token.jti]
+        )
+
+        assert {jwt_token.jti} == existing_ids
+        assert set() == unprocessed_ids
+
+    async def test_successfully_get_ids_by_sub(
+        self, jwt_token: JWTToken, token_repository: TokenRepository, tokens_table
+    ):
+        await token_repository.create_token(
+            {"jti": str(uuid.uuid4()), "sub": str(uuid.uuid4())}
+        )
+
+        assert [jwt_token.jti] == await token_repository.get_ids_by_sub(jwt_token.sub)
+
+    async def test_successfully_delete_by_ids(
+        self, jwt_token: JWTToken, token_repository: TokenRepository, tokens_table
+    ):
+        assert set() == await token_repository.delete_by_ids(
+            [jwt_token.jti, str(uuid.uuid4())]
+        )
+
+        assert "Item" not in tokens_table.get_item(Key={"jti": jwt_token.jti})
+
+    async def test_successfully_get_revoked_before(
+        self, jwt_token: JWTToken, token_repository: TokenRepository, tokens_table
+    ):
+        await token_repository.put_revoked_before(
+            jwt_token.sub, jwt_token.iat, jwt_token.exp
+        )
+
+        assert ({jwt_token.sub: jwt_token.iat}, set()) == (
+            await token_repository.get_revoked_before(
+                [jwt_token.sub, str(uuid.uuid4())]
+            )
+        )
+
+    async def test_successfully_put_revoked_before_with_revocation(
+        self,
+        jwt_token: JWTToken,
+        token_repository: TokenRepository,
+        token_revocations_table,
+        tokens_table,
+    ):
+        await token_repository.create_revocation(jwt_token.jti, jwt_token.exp)
+
+        await token_repository.put_revoked_before(
+            jwt_token.sub, jwt_token.iat, jwt_token.exp, create_revocation=True
+        )
+
+        assert [jwt_token.jti, (jwt_token.sub, jwt_token.iat)] == (
+            await token_repository.get_revocations(time.time_ns() // 1000000 - 60000)
+        )
@@ -1,13 +1,17 @@
 import uuid
 
 import pendulum
+import pytest
+from botocore.exceptions import ClientError
 
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
 
+pytestmark = pytest.mark.anyio
+
 
 class TestUserRepository:
-    def test_successfully_create_user(
+    async def test_successfully_create_user(
         self, user: User, user_repository: UserRepository, users_table
     ):
         new_user_id = str(uuid.uuid4())
@@ -19,64 +23,195 @@ class TestUserRepository:
             "username": "newuser",
             "created_at": pendulum.now().to_iso8601_string(),
         }
-        user_repository.create_user(user_data)
+        await user_repository.create_user(user_data)
 
         response = users_table.get_item(Key={"id": new_user_id})
 
         assert response["Item"] == user_data
+        assert {"id": "EMAIL#newuser@netcode.hu", "user_id": new_user_id} == (
+            users_table.get_item(Key={"id": "EMAIL#newuser@netcode.hu"})["Item"]
+        )
+        assert {"id": "USERNAME#newuser", "user_id": new_user_id} == (
+            users_table.get_item(Key={"id": "USERNAME#newuser"})["Item"]
+        )
+
+    @pytest.mark.parametrize(
+        "email, username, codes",
+        [
+            ("root@netcode.hu", "newuser", ["None", "ConditionalCheckFailed", "None"]),
+            ("newuser@netcode.hu", "root", ["None", "None", "ConditionalCheckFailed"]),
+        ],
+    )
+    async def test_fail_to_create_user_due_to_existing_guard(
+        self,
+        email: str,
+        username: str,
+        codes: list[str],
+        user_repository: UserRepository,
+        users_table,
+    ):
+        new_user_id = str(uuid.uuid4())
 
-    def test_successfully_delete_user(
+        with pytest.raises(ClientError) as excinfo:
+            await user_repository.create_user(
+                {
+                    "id": new_user_id,
+                    "email": email,
+                    "password": "hashed_password",
+                    "username": username,
+                    "created_at": pendulum.now().to_iso8601_string(),
+                }
+            )
+
+        assert "TransactionCanceledException" == excinfo.value.response["Error"]["Code"]
+        assert codes == [
+            reason["Code"] for reason in excinfo.value.response["CancellationReasons"]
+        ]
+        assert "Item" not in users_table.get_item(Key={"id": new_user_id})
+
+    async def test_successfully_create_user_with_guards_of_soft_deleted_user(
         self, user: User, user_repository: UserRepository, users_table
     ):
-        response = user_repository.delete_user(user.id)
+        users_table.update_item(
+            Key={"id": user.id},
+            UpdateExpression="SET deleted_at = :deleted_at",
+            ExpressionAttributeValues={
+                ":deleted_at": pendulum.now().to_iso8601_string()
+            },
+        )
+        new_user_id = str(uuid.uuid4())
+
+        await user_repository.create_user(
+            {
+                "id": new_user_id,
+                "email": user.email,
+                "password": "hashed_password",
+                "username": user.username,
+                "created_at": pendulum.now().to_iso8601_string(),
+            }
+        )
+
+        assert "Item" in users_table.get_item(Key={"id": new_user_id})
+        assert {"id": f"EMAIL#{user.email}", "user_id": new_user_id} == (
+            users_table.get_item(Key={"id": f"EMAIL#{user.email}"})["Item"]
+        )
+        assert {"id": f"USERNAME#{user.username}", "user_id": new_user_id} == (
+            users_table.get_item(Key={"id": f"USERNAME#{user.username}"})["Item"]
+        )
+
+    async def test_successfully_delete_user(
+        self, user: User, user_repository: UserRepository, users_table
+    ):
+        response = await user_repository.delete_user(user.id)
 
         assert response["ResponseMetadata"]["HTTPStatusCode"] == 200
+        assert "Item" not in users_table.get_item(Key={"id": f"EMAIL#{user.email}"})
+        assert "Item" not in users_table.get_item(
+            Key={"id": f"USERNAME#{user.username}"}
+        )
+
+    async def test_successfully_delete_user_without_guards(
+        self, user: User, user_repository: UserRepository, users_table
+    ):
+        users_table.delete_item(Key={"id": f"EMAIL#{user.email}"})
+        users_table.delete_item(Key={"id": f"USERNAME#{user.username}"})
+
+        response = await user_repository.delete_user(user.id)
 
-    def test_delete_user_returns_empty_attributes_if_id_not_found(
+        assert user.id == response["Attributes"]["id"]
+        assert "Item" not in users_table.get_item(Key={"id": user.id})
+
+    async def test_successfully_delete_user_without_releasing_taken_guard(
+        self, user: User, user_repository: UserRepository, users_table
+    ):
+        new_user_id = str(uuid.uuid4())
+        users_table.put_item(Item={"id": f"EMAIL#{user.email}", "user_id": new_user_id})
+
+        await user_repository.delete_user(user.id)
+
+        assert "Item" not in users_table.get_item(Key={"id": user.id})
+        assert (
+            new_user_id
+            == (
+                users_table.get_item(Key={"id": f"EMAIL#{user.email}"})["Item"][
+                    "user_id"
+                ]
+            )
+        )
+        assert "Item" not in users_table.get_item(
+            Key={"id": f"USERNAME#{user.username}"}
+        )
+
+    async def test_delete_user_returns_empty_attributes_if_id_not_found(
         self, user_repository: UserRepository, users_table
     ):
-        response = user_repository.delete_user(str(uuid.uuid4()))
+        response = await user_repository.delete_user(str(uuid.uuid4()))
 
         assert response["Attributes"] == {}
 
-    def test_successfully_get_by_email(
+    async def test_successfully_get_by_email(
         self, users_table, user: User, user_repository: UserRepository
     ):
-        item = user_repository.get_by_email(user.email)
+        item = await user_repository.get_by_email(user.email)
 
         assert user == item
 
-    def test_successfully_return_none_by_email(
+    async def test_successfully_return_none_by_email(
         self, users_table, user_repository: UserRepository
     ):
-        item = user_repository.get_by_email("hello@netcode.hu")
+        item = await user_repository.get_by_email("hello@netcode.hu")
 
         assert item is None
 
-    def test_successfully_get_by_id(
+    async def test_successfully_get_by_id(
         self, users_table, user: User, user_repository: UserRepository
     ):
-        item = user_repository.get_by_id(user.id)
+        item = await user_repository.get_by_id(user.id)
 
         assert user == item
 
-    def test_successfully_return_none_by_id(
+    async def test_successfully_return_none_by_id(
         self, users_table, user_repository: UserRepository
     ):
-        item = user_repository.get_by_id(str(uuid.uuid4()))
+        item = await user_repository.get_by_id(str(uuid.uuid4()))
 
         assert item is None
 
-    def test_successfully_get_by_username(
+    async def test_successfully_update_password(
+        self, users_table, user: User, user_repository: UserRepository
+    ):
+        await user_repository.update_password(user.id, "new_password", user.password)
+
+        item = users_table.get_item(Key={"id": user.id})["Item"]
+        assert "new_password" == item["password"]
+        assert item["updated_at"] is not None
+
+    async def test_fail_to_update_password_due_to_password_changed(
+        self, users_table, user: User, user_repository: UserRepository
+    ):
+        with pytest.raises(ClientError) as excinfo:
+            await user_repository.update_password(
+                user.id, "new_password", "previous_password"
+            )
+
+        assert (
+            "ConditionalCheckFailedException" == excinfo.value.response["Error"]["Code"]
+        )
+        assert (
+            user.password
+            == users_table.get_item(Key={"id": user.id})["Item"]["password"]
+        )
+
+    async def test_successfully_get_by_username(
         self, users_table, user: User, user_repository: UserRepository
     ):
-        item = user_repository.get_by_username(user.username)
+        item = await user_repository.get_by_username(user.username)
 
         assert user == item
 
-    def test_successfully_return_none_by_username(
+    async def test_successfully_return_none_by_username(
         self, users_table, user_repository: UserRepository
     ):
-        item = user_repository.get_by_username("nonexistentuser")
+        item = await user_repository.get_by_username("nonexistentuser")
 
         assert item is None
@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 
 import jwt
@@ -9,17 +10,23 @@ from fastapi import HTTPException, status
 from app.exceptions import (
     TokenMismatchException,
     TokenNotFoundException,
+    TooManyRequestsException,
     UserNotFoundException,
 )
 from app.models.jwt import JWTToken
 from app.models.user import User
+from app.password_hasher import PasswordHashingExecutor
 from app.repositories.user_repository import UserRepository
+from app.revocation_filter import RevocationFilter
 from app.services.auth_service import AuthService
+from app.services.login_attempt_service import LoginAttemptService
 from app.services.token_service import TokenService
 from app.settings import Settings
+from app.token_cache import token_cache
 
 ALGORITHMS = ["HS256"]
 PASSWORD = "123456"
+pytestmark = pytest.mark.anyio
 
 
 class TestAuthService:
@@ -27,6 +34,14 @@ class TestAuthService:
     def auth_service(self) -> AuthService:
         return AuthService()
 
+    @pytest.fixture(autouse=True)
+    def login_attempt_service(self, mocker) -> LoginAttemptService:
+        mocker.patch.object(LoginAttemptService, "acquire")
+        mocker.patch.object(LoginAttemptService, "check", return_value=0)
+        mocker.patch.object(LoginAttemptService, "record_failure")
+        mocker.patch.object(LoginAttemptService, "reset")
+        return LoginAttemptService()
+
     @pytest.fixture
     def jwt_token(self, user: User) -> JWTToken:
         iat = pendulum.now()
@@ -54,7 +69,7 @@ class TestAuthService:
             created_at=pendulum.now().to_iso8601_string(),
         )
 
-    def test_successfully_login(
+    async def test_successfully_login(
         self,
         mocker,
         auth_service: AuthService,
@@ -66,7 +81,7 @@ class TestAuthService:
         mocker.patch.object(UserRepository, "get_by_email", return_value=user)
         mocker.patch.object(TokenService, "create")
 
-        jwt_token, refresh_token, _ = auth_service.login(user.email, PASSWORD)
+        jwt_token, refresh_token, _ = await auth_service.login(user.email, PASSWORD)
         decoded_jwt_token = JWTToken(
             **jwt.decode(jwt_token, settings.jwt_secret, ALGORITHMS)
         )
@@ -79,7 +94,67 @@ class TestAuthService:
         user_repository.get_by_email.assert_called_once_with(user.email)
         token_service.create.assert_called_once_with(decoded_jwt_token, refresh_token)
 
-    def test_fail_to_login_due_user_not_found_by_email(
+    async def test_successfully_rehash_password_on_login(
+        self,
+        mocker,
+        auth_service: AuthService,
+        user: User,
+        user_repository: UserRepository,
+    ):
+        user.password = PasswordHasher(time_cost=1).hash(PASSWORD)
+        mocker.patch.object(UserRepository, "get_by_email", return_value=user)
+        mocker.patch.object(UserRepository, "update_password")
+        mocker.patch.object(TokenService, "create")
+
+        await auth_service.login(user.email, PASSWORD)
+        await asyncio.gather(*auth_service._background_tasks)
+
+        user_repository.update_password.assert_called_once()
+        user_id, password_hash, previous_password = (
+            user_repository.update_password.call_args.args
+        )
+        assert user.id == user_id
+        assert user.password == previous_password
+        assert PasswordHasher().verify(password_hash, PASSWORD)
+        assert not PasswordHasher().check_needs_rehash(password_hash)
+
+    async def test_successfully_rehash_password_on_login_in_lambda(
+        self,
+        mocker,
+        auth_service: AuthService,
+        user: User,
+        user_repository: UserRepository,
+    ):
+        user.password = PasswordHasher(time_cost=1).hash(PASSWORD)
+        mocker.patch.object(UserRepository, "get_by_email", return_value=user)
+        mocker.patch.object(UserRepository, "update_password")
+        mocker.patch.object(TokenService, "create")
+        mocker.patch(
+            "app.services.auth_service.settings.aws_lambda_function_name", "auth"
+        )
+
+        await auth_service.login(user.email, PASSWORD)
+
+        assert not auth_service._background_tasks
+        user_repository.update_password.assert_called_once()
+
+    async def test_successfully_login_without_rehash(
+        self,
+        mocker,
+        auth_service: AuthService,
+        user: User,
+        user_repository: UserRepository,
+    ):
+        mocker.patch.object(UserRepository, "get_by_email", return_value=user)
+        mocker.patch.object(UserRepository, "update_password")
+        mocker.patch.object(TokenService, "create")
+
+        await auth_service.login(user.email, PASSWORD)
+
+        assert not auth_service._background_tasks
+        user_repository.update_password.assert_not_called()
+
+    async def test_fail_to_login_due_user_not_found_by_email(
         self,
         mocker,
         auth_service: AuthService,
@@ -90,13 +165,13 @@ class TestAuthService:
         mocker.patch.object(UserRepository, "get_by_email", return_value=None)
 
         with pytest.raises(UserNotFoundException) as excinfo:
-            auth_service.login(user.email, PASSWORD)
+            await auth_service.login(user.email, PASSWORD)
 
         assert status.HTTP_404_NOT_FOUND == excinfo.value.status_code
         assert error_message == excinfo.value.detail
         user_repository.get_by_email.assert_called_once_with(user.email)
 
-    def test_fail_to_login_due_password_does_not_match(
+    async def test_fail_to_login_due_password_does_not_match(
         self,
         mocker,
         auth_service: AuthService,
@@ -107,13 +182,83 @@ class TestAuthService:
         mocker.patch.object(UserRepository, "get_by_email", return_value=user)
 
         with pytest.raises(HTTPException) as excinfo:
-            auth_service.login(user.email, password_hasher.hash("doest_not_match"))
+            await auth_service.login(
+                user.email, password_hasher.hash("doest_not_match")
+            )
 
         assert status.HTTP_401_UNAUTHORIZED == excinfo.value.status_code
         assert "Unauthorized" == excinfo.value.detail
         user_repository.get_by_email.assert_called_once_with(user.email)
 
-    def test_successfully_logout(
+    async def test_successfully_record_login_failure(
+        self,
+        mocker,
+        auth_service: AuthService,
+        login_attempt_service: LoginAttemptService,
+        user: User,
+    ):
+        mocker.patch.object(UserRepository, "get_by_email", return_value=user)
+
+        with pytest.raises(HTTPException):
+            await auth_service.login(user.email, "does_not_match", "127.0.0.1")
+
+        login_attempt_service.acquire.assert_called_once_with(user.email, "127.0.0.1")
+        login_attempt_service.record_failure.assert_called_once_with(
+            user.email, "127.0.0.1"
+        )
+
+    async def test_successfully_reset_login_failures_on_login(
+        self,
+        mocker,
+        auth_service: AuthService,
+        login_attempt_service: LoginAttemptService,
+        user: User,
+    ):
+        mocker.patch.object(UserRepository, "get_by_email", return_value=user)
+        mocker.patch.object(TokenService, "create")
+        mocker.patch.object(LoginAttemptService, "check", return_value=1.5)
+
+        await auth_service.login(user.email, PASSWORD)
+
+        login_attempt_service.reset.assert_called_once_with(user.email)
+        login_attempt_service.record_failure.assert_not_called()
+
+    async def test_fail_to_login_due_to_account_lockout(
+        self,
+        mocker,
+        auth_service: AuthService,
+        user: User,
+    ):
+        mocker.patch.object(UserRepository, "get_by_email", return_value=user)
+        mocker.patch.object(
+            LoginAttemptService,
+            "check",
+            side_effect=TooManyRequestsException("Too Many Requests", 600),
+        )
+        verify = mocker.patch.object(PasswordHashingExecutor, "verify")
+
+        with pytest.raises(TooManyRequestsException) as excinfo:
+            await auth_service.login(user.email, PASSWORD)
+
+        assert status.HTTP_429_TOO_MANY_REQUESTS == excinfo.value.status_code
+        verify.assert_not_called()
+
+    async def test_successfully_logout(
+        self,
+        mocker,
+        auth_service: AuthService,
+        jwt_token: JWTToken,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(TokenService, "delete_by_id")
+        token_cache.put(jwt_token.jti, True)
+
+        await auth_service.logout(jwt_token)
+
+        token_service.delete_by_id.assert_called_once_with(jwt_token.jti)
+        assert token_cache.get(jwt_token.jti) is None
+
+    async def test_successfully_logout_with_revocation_epoch(
         self,
         mocker,
         auth_service: AuthService,
@@ -121,12 +266,39 @@ class TestAuthService:
         token_service: TokenService,
     ):
         mocker.patch.object(TokenService, "delete_by_id")
+        mocker.patch.object(TokenService, "increment_revocation_epoch")
+        mocker.patch(
+            "app.services.auth_service.settings.token_revocation_epoch_check_interval",
+            5,
+        )
 
-        auth_service.logout(jwt_token)
+        await auth_service.logout(jwt_token)
 
         token_service.delete_by_id.assert_called_once_with(jwt_token.jti)
+        token_service.increment_revocation_epoch.assert_called_once_with()
 
-    def test_fail_to_logout_due_to_token_service_exception(
+    async def test_successfully_logout_with_stateless_token_validation(
+        self,
+        mocker,
+        auth_service: AuthService,
+        jwt_token: JWTToken,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(TokenService, "delete_by_id")
+        mocker.patch.object(TokenService, "revoke")
+        mocker.patch(
+            "app.services.auth_service.settings.stateless_token_validation", True
+        )
+        revocation_filter = mocker.patch(
+            "app.services.auth_service.revocation_filter", RevocationFilter()
+        )
+
+        await auth_service.logout(jwt_token)
+
+        token_service.revoke.assert_called_once_with(jwt_token)
+        assert jwt_token.jti in revocation_filter
+
+    async def test_fail_to_logout_due_to_token_service_exception(
         self,
         mocker,
         auth_service: AuthService,
@@ -141,13 +313,67 @@ class TestAuthService:
         )
 
         with pytest.raises(TokenNotFoundException) as excinfo:
-            auth_service.logout(jwt_token)
+            await auth_service.logout(jwt_token)
 
         assert status.HTTP_404_NOT_FOUND == excinfo.value.status_code
         assert error_message == excinfo.value.detail
         token_service.delete_by_id.assert_called_once_with(jwt_token.jti)
 
-    def test_successfully_refresh_tokens(
+    async def test_successfully_revoke_all_tokens(
+        self,
+        mocker,
+        auth_service: AuthService,
+        jwt_token: JWTToken,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(TokenService, "revoke_before")
+        mocker.patch.object(
+            TokenService, "get_ids_by_sub", return_value=[jwt_token.jti, "other"]
+        )
+        mocker.patch.object(TokenService, "delete_by_ids", return_value=set())
+        mocker.patch.object(TokenService, "increment_revocation_epoch")
+        token_cache.put(jwt_token.jti, True)
+
+        assert 2 == await auth_service.revoke_all(jwt_token.sub)
+
+        issued_before = token_service.revoke_before.call_args.args[1]
+        token_service.revoke_before.assert_called_once_with(
+            jwt_token.sub, issued_before
+        )
+        assert abs(pendulum.now().int_timestamp - issued_before) <= 1
+        assert issued_before == token_cache.get_revoked_before(jwt_token.sub)
+        token_service.delete_by_ids.assert_called_once_with([jwt_token.jti, "other"])
+        assert token_cache.get(jwt_token.jti) is None
+        token_service.increment_revocation_epoch.assert_not_called()
+
+    async def test_successfully_revoke_all_tokens_with_stateless_token_validation(
+        self,
+        mocker,
+        auth_service: AuthService,
+        jwt_token: JWTToken,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(TokenService, "revoke_before")
+        mocker.patch.object(TokenService, "get_ids_by_sub", return_value=[])
+        mocker.patch.object(TokenService, "delete_by_ids", return_value={"failed"})
+        mocker.patch.object(TokenService, "increment_revocation_epoch")
+        mocker.patch(
+            "app.services.auth_service.settings.stateless_token_validation", True
+        )
+        mocker.patch(
+            "app.services.auth_service.settings.token_revocation_epoch_check_interval",
+            5,
+        )
+        revocation_filter = mocker.patch(
+            "app.services.auth_service.revocation_filter", RevocationFilter()
+        )
+
+        assert 0 == await auth_service.revoke_all(jwt_token.sub)
+
+        assert jwt_token.iat <= revocation_filter.revoked_before(jwt_token.sub)
+        token_service.increment_revocation_epoch.assert_called_once_with()
+
+    async def test_successfully_refresh_tokens(
         self,
         mocker,
         auth_service: AuthService,
@@ -156,23 +382,16 @@ class TestAuthService:
         refresh_token: str,
         token_service: TokenService,
     ):
-        item = {
-            "jti": jwt_token.jti,
-            "jwt_token": jwt_token.model_dump(),
-            "refresh_token": refresh_token,
-            "created_at": pendulum.now().to_iso8601_string(),
-            "ttl": jwt_token.exp,
-        }
-        mocker.patch.object(TokenService, "get_by_refresh_token", return_value=item)
-        mocker.patch.object(TokenService, "create")
-        mocker.patch.object(TokenService, "delete_by_id")
+        mocker.patch.object(TokenService, "rotate")
+        token_cache.put(jwt_token.jti, True)
 
-        new_jwt_token, new_refresh_token, _ = auth_service.refresh(
+        new_jwt_token, new_refresh_token, _ = await auth_service.refresh(
             jwt_token, refresh_token
         )
 
-        token_service.get_by_refresh_token.assert_called_once_with(refresh_token)
-        token_service.create.assert_called_once_with(
+        token_service.rotate.assert_called_once_with(
+            jwt_token,
+            refresh_token,
             JWTToken(
                 **jwt.decode(
                     new_jwt_token,
@@ -182,9 +401,47 @@ class TestAuthService:
             ),
             new_refresh_token,
         )
-        token_service.delete_by_id.assert_called_once_with(jwt_token.jti)
+        assert token_cache.get(jwt_token.jti) is None
+
+    async def test_successfully_refresh_tokens_without_revocation_epoch(
+        self,
+        mocker,
+        auth_service: AuthService,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(TokenService, "rotate")
+        mocker.patch.object(TokenService, "increment_revocation_epoch")
+        mocker.patch(
+            "app.services.auth_service.settings.token_revocation_epoch_check_interval",
+            5,
+        )
+
+        await auth_service.refresh(jwt_token, refresh_token)
 
-    def test_fail_to_refresh_due_to_missing_token(
+        token_service.increment_revocation_epoch.assert_not_called()
+
+    async def test_successfully_refresh_tokens_with_stateless_token_validation(
+        self,
+        mocker,
+        auth_service: AuthService,
+        jwt_token: JWTToken,
+        refresh_token: str,
+    ):
+        mocker.patch.object(TokenService, "rotate")
+        mocker.patch(
+            "app.services.auth_service.settings.stateless_token_validation", True
+        )
+        revocation_filter = mocker.patch(
+            "app.services.auth_service.revocation_filter", RevocationFilter()
+        )
+
+        await auth_service.refresh(jwt_token, refresh_token)
+
+        assert jwt_token.jti in revocation_filter
+
+    async def test_fail_to_refresh_due_to_missing_token(
         self,
         mocker,
         auth_service: AuthService,
@@ -192,17 +449,21 @@ class TestAuthService:
         refresh_token: str,
         token_service: TokenService,
     ):
-        mocker.patch.object(TokenService, "get_by_refresh_token", return_value=None)
+        mocker.patch.object(
+            TokenService,
+            "rotate",
+            side_effect=TokenNotFoundException("The requested token was not found"),
+        )
 
         with pytest.raises(TokenNotFoundException) as excinfo:
-            auth_service.refresh(jwt_token, refresh_token)
+            await auth_service.refresh(jwt_token, refresh_token)
 
         assert TokenNotFoundException.__name__ == excinfo.typename
         assert "The requested token was not found" == excinfo.value.detail
 
-        token_service.get_by_refresh_token.assert_called_once_with(refresh_token)
+        token_service.rotate.assert_called_once()
 
-    def test_fail_to_refresh_token_due_to_token_mismatch(
+    async def test_fail_to_refresh_token_due_to_token_mismatch(
         self,
         mocker,
         auth_service: AuthService,
@@ -210,27 +471,16 @@ class TestAuthService:
         refresh_token: str,
         token_service: TokenService,
     ):
-        now = pendulum.now().int_timestamp
-        item = {
-            "jti": jwt_token.jti,
-            "jwt_token": {
-                "exp": now,
-                "iat": now,
-                "iss": None,
-                "jti": str(uuid.uuid4()),
-                "sub": jwt_token.user["id"],
-                "user": jwt_token.user,
-            },
-            "refresh_token": refresh_token,
-            "created_at": pendulum.now().to_iso8601_string(),
-            "ttl": jwt_token.exp,
-        }
-        mocker.patch.object(TokenService, "get_by_refresh_token", return_value=item)
+        mocker.patch.object(
+            TokenService,
+            "rotate",
+            side_effect=TokenMismatchException("Internal Server Error"),
+        )
 
         with pytest.raises(TokenMismatchException) as excinfo:
-            auth_service.refresh(jwt_token, refresh_token)
+            await auth_service.refresh(jwt_token, refresh_token)
 
         assert TokenMismatchException.__name__ == excinfo.typename
         assert "Internal Server Error" == excinfo.value.detail
 
-        token_service.get_by_refresh_token.assert_called_once_with(refresh_token)
+        token_service.rotate.assert_called_once()
@@ -0,0 +1,141 @@
+import pytest
+from fastapi import status
+
+from app import settings
+from app.exceptions import TooManyRequestsException
+from app.rate_limiter import login_limiter
+from app.repositories.login_attempt_repository import LoginAttemptRepository
+from app.services.login_attempt_service import LoginAttemptService
+
+EMAIL = "Root@netcode.hu"
+IP = "127.0.0.1"
+pytestmark = pytest.mark.anyio
+
+
+class TestLoginAttemptService:
+    @pytest.fixture(autouse=True)
+    def now(self, mocker):
+        login_limiter.clear()
+        mocker.patch.object(settings, "login_failure_window", 900)
+        # a third of the way into the second window
+        return mocker.patch(
+            "app.services.login_attempt_service.time.time", return_value=1200
+        )
+
+    def test_successfully_acquire(self, login_attempt_service: LoginAttemptService):
+        login_attempt_service.acquire(EMAIL, IP)
+
+    def test_fail_to_acquire_due_to_empty_account_bucket(
+        self, mocker, login_attempt_service: LoginAttemptService
+    ):
+        mocker.patch.object(settings, "login_account_bucket_capacity", 1)
+        mocker.patch.object(settings, "login_account_bucket_refill_rate", 0.1)
+        login_attempt_service.acquire(EMAIL, "10.0.0.1")
+
+        with pytest.raises(TooManyRequestsException) as excinfo:
+            login_attempt_service.acquire(EMAIL.lower(), "10.0.0.2")
+
+        assert status.HTTP_429_TOO_MANY_REQUESTS == excinfo.value.status_code
+        assert {"Retry-After": "10"} == excinfo.value.headers
+
+    def test_fail_to_acquire_due_to_empty_ip_bucket(
+        self, mocker, login_attempt_service: LoginAttemptService
+    ):
+        mocker.patch.object(settings, "login_ip_bucket_capacity", 1)
+        login_attempt_service.acquire("a@netcode.hu", IP)
+
+        with pytest.raises(TooManyRequestsException):
+            login_attempt_service.acquire("b@netcode.hu", IP)
+
+    def test_successfully_skip_disabled_buckets(
+        self, mocker, login_attempt_service: LoginAttemptService
+    ):
+        mocker.patch.object(settings, "login_account_bucket_capacity", None)
+        mocker.patch.object(settings, "login_ip_bucket_capacity", None)
+
+        for _ in range(100):
+            login_attempt_service.acquire(EMAIL, IP)
+
+        assert 0 == len(login_limiter)
+
+    async def test_successfully_check_sliding_window(
+        self,
+        login_attempt_repository: LoginAttemptRepository,
+        login_attempt_service: LoginAttemptService,
+        login_attempts_table,
+    ):
+        for _ in range(3):
+            await login_attempt_repository.increment("ACCOUNT#root@netcode.hu#0", 1800)
+        await login_attempt_repository.increment("ACCOUNT#root@netcode.hu#1", 2700)
+
+        # the previous window still overlaps two thirds of the sliding window
+        assert 3 == await login_attempt_service.check(EMAIL, IP)
+
+    async def test_fail_to_check_due_to_account_lockout(
+        self,
+        mocker,
+        login_attempt_service: LoginAttemptService,
+        login_attempts_table,
+    ):
+        mocker.patch.object(settings, "login_account_max_failures", 2)
+        for _ in range(2):
+            await login_attempt_service.record_failure(EMAIL, IP)
+
+        with pytest.raises(TooManyRequestsException) as excinfo:
+            await login_attempt_service.check(EMAIL, "10.0.0.1")
+
+        assert {"Retry-After": "600"} == excinfo.value.headers
+
+    async def test_fail_to_check_due_to_blocked_ip(
+        self,
+        mocker,
+        login_attempt_service: LoginAttemptService,
+        login_attempts_table,
+    ):
+        mocker.patch.object(settings, "login_ip_max_failures", 2)
+        await login_attempt_service.record_failure("a@netcode.hu", IP)
+        await login_attempt_service.record_failure("b@netcode.hu", IP)
+
+        with pytest.raises(TooManyRequestsException):
+            await login_attempt_service.check("c@netcode.hu", IP)
+        assert 0 == await login_attempt_service.check("c@netcode.hu", "10.0.0.1")
+
+    async def test_successfully_check_if_counters_are_unavailable(
+        self, mocker, login_attempt_service: LoginAttemptService
+    ):
+        mocker.patch.object(
+            LoginAttemptRepository, "get_counts", side_effect=Exception("error")
+        )
+
+        assert 0 == await login_attempt_service.check(EMAIL, IP)
+
+    async def test_successfully_skip_check_if_disabled(
+        self, mocker, login_attempt_service: LoginAttemptService
+    ):
+        mocker.patch.object(settings, "login_account_max_failures", None)
+        mocker.patch.object(settings, "login_ip_max_failures", None)
+        get_counts = mocker.patch.object(LoginAttemptRepository, "get_counts")
+
+        assert 0 == await login_attempt_service.check(EMAIL, IP)
+        get_counts.assert_not_called()
+
+    async def test_successfully_record_failure(
+        self, login_attempt_service: LoginAttemptService, login_attempts_table
+    ):
+        await login_attempt_service.record_failure(EMAIL, IP)
+
+        assert [
+            {"id": "ACCOUNT#root@netcode.hu#1", "attempts": 1, "ttl": 2700},
+            {"id": "IP#127.0.0.1#1", "attempts": 1, "ttl": 2700},
+        ] == sorted(login_attempts_table.scan()["Items"], key=lambda item: item["id"])
+
+    async def test_successfully_reset(
+        self, login_attempt_service: LoginAttemptService, login_attempts_table
+    ):
+        await login_attempt_service.record_failure(EMAIL, IP)
+
+        await login_attempt_service.reset(EMAIL)
+
+        assert ["IP#127.0.0.1#1"] == [
+            item["id"] for item in login_attempts_table.scan()["Items"]
+        ]
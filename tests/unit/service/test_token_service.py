@@ -1,15 +1,36 @@
 from typing import Any
 
 import pytest
+from botocore.exceptions import ClientError
 
-from app.exceptions import TokenNotFoundException
+from app.exceptions import (
+    ServiceUnavailableException,
+    TokenMismatchException,
+    TokenNotFoundException,
+)
 from app.models.jwt import JWTToken
 from app.repositories.token_repository import TokenRepository
 from app.services.token_service import TokenService
+from app.settings import Settings
+
+pytestmark = pytest.mark.anyio
+
+
+def transaction_canceled(item: dict[str, Any] | None = None) -> ClientError:
+    reason = {"Code": "ConditionalCheckFailed"}
+    if item is not None:
+        reason["Item"] = item
+    return ClientError(
+        {
+            "Error": {"Code": "TransactionCanceledException", "Message": ""},
+            "CancellationReasons": [reason, {"Code": "None"}],
+        },
+        "TransactWriteItems",
+    )
 
 
 class TestTokenService:
-    def test_successfully_create_token(
+    async def test_successfully_create_token(
         self,
         mocker,
         jwt_token: JWTToken,
@@ -20,11 +41,11 @@ class TestTokenService:
     ):
         mocker.patch.object(TokenRepository, "create_token")
 
-        token_service.create(jwt_token, refresh_token)
+        await token_service.create(jwt_token, refresh_token)
 
         token_repository.create_token.assert_called_once_with(token)
 
-    def test_successfully_delete_by_id(
+    async def test_successfully_delete_by_id(
         self,
         mocker,
         jwt_token: JWTToken,
@@ -37,11 +58,11 @@ class TestTokenService:
             return_value={"ResponseMetadata": {"HTTPStatusCode": 200}},
         )
 
-        token_service.delete_by_id(jwt_token.jti)
+        await token_service.delete_by_id(jwt_token.jti)
 
         token_repository.delete_by_id.assert_called_once_with(jwt_token.jti)
 
-    def test_fail_to_delete_by_id_due_to_token_not_found(
+    async def test_fail_to_delete_by_id_due_to_token_not_found(
         self,
         mocker,
         jwt_token: JWTToken,
@@ -55,14 +76,14 @@ class TestTokenService:
         )
 
         with pytest.raises(TokenNotFoundException) as excinfo:
-            token_service.delete_by_id(jwt_token.jti)
+            await token_service.delete_by_id(jwt_token.jti)
 
         assert TokenNotFoundException.__name__ == excinfo.typename
         assert "The requested token was not found" == excinfo.value.detail
 
         token_repository.delete_by_id.assert_called_once_with(jwt_token.jti)
 
-    def test_successfully_get_token_by_id(
+    async def test_successfully_get_token_by_id(
         self,
         mocker,
         jwt_token: JWTToken,
@@ -73,11 +94,11 @@ class TestTokenService:
             TokenRepository, "get_by_id", return_value=(jwt_token, "refresh_token")
         )
 
-        token_service.get_by_id(jwt_token.jti)
+        await token_service.get_by_id(jwt_token.jti)
 
         token_repository.get_by_id.assert_called_once_with(jwt_token.jti)
 
-    def test_successfully_get_token_by_refresh_token(
+    async def test_successfully_get_token_by_refresh_token(
         self,
         mocker,
         refresh_token: str,
@@ -91,6 +112,193 @@ class TestTokenService:
             return_value=token,
         )
 
-        token_service.get_by_refresh_token(refresh_token)
+        await token_service.get_by_refresh_token(refresh_token)
 
         token_repository.get_by_refresh_token.assert_called_once_with(refresh_token)
+
+    async def test_successfully_get_revocation_epoch(
+        self,
+        mocker,
+        token_repository: TokenRepository,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(TokenRepository, "get_revocation_epoch", return_value=1)
+
+        assert 1 == await token_service.get_revocation_epoch()
+
+        token_repository.get_revocation_epoch.assert_called_once_with()
+
+    async def test_successfully_increment_revocation_epoch(
+        self,
+        mocker,
+        token_repository: TokenRepository,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(
+            TokenRepository, "increment_revocation_epoch", return_value=2
+        )
+
+        assert 2 == await token_service.increment_revocation_epoch()
+
+        token_repository.increment_revocation_epoch.assert_called_once_with()
+
+    async def test_successfully_get_existing_ids(
+        self,
+        mocker,
+        token_repository: TokenRepository,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(
+            TokenRepository, "get_existing_ids", return_value=({"first"}, set())
+        )
+
+        assert {"first"} == await token_service.get_existing_ids(["first", "second"])
+
+        token_repository.get_existing_ids.assert_called_once_with(["first", "second"])
+
+    async def test_fail_to_get_existing_ids_due_to_unprocessed_keys(
+        self, mocker, token_service: TokenService
+    ):
+        mocker.patch.object(
+            TokenRepository, "get_existing_ids", return_value=(set(), {"first"})
+        )
+
+        with pytest.raises(ServiceUnavailableException):
+            await token_service.get_existing_ids(["first"])
+
+    async def test_successfully_get_revoked_before(
+        self,
+        mocker,
+        token_repository: TokenRepository,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(
+            TokenRepository, "get_revoked_before", return_value=({"sub": 10}, set())
+        )
+
+        assert {"sub": 10} == await token_service.get_revoked_before(["sub", "other"])
+
+        token_repository.get_revoked_before.assert_called_once_with(["sub", "other"])
+
+    async def test_fail_to_get_revoked_before_due_to_unprocessed_keys(
+        self, mocker, token_service: TokenService
+    ):
+        mocker.patch.object(
+            TokenRepository, "get_revoked_before", return_value=({}, {"sub"})
+        )
+
+        with pytest.raises(ServiceUnavailableException):
+            await token_service.get_revoked_before(["sub"])
+
+    @pytest.mark.parametrize("stateless_token_validation", [False, True])
+    async def test_successfully_revoke_before(
+        self,
+        mocker,
+        settings: Settings,
+        stateless_token_validation: bool,
+        token_repository: TokenRepository,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(TokenRepository, "put_revoked_before")
+        mocker.patch(
+            "app.services.token_service.settings.stateless_token_validation",
+            stateless_token_validation,
+        )
+
+        await token_service.revoke_before("sub", 1000)
+
+        token_repository.put_revoked_before.assert_called_once_with(
+            "sub", 1000, 1000 + settings.jwt_token_lifetime, stateless_token_validation
+        )
+
+    async def test_successfully_get_revocations(
+        self,
+        mocker,
+        token_repository: TokenRepository,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(TokenRepository, "get_revocations", return_value=["jti"])
+
+        assert ["jti"] == await token_service.get_revocations(1000)
+
+        token_repository.get_revocations.assert_called_once_with(1000)
+
+    async def test_successfully_revoke_token(
+        self,
+        mocker,
+        jwt_token: JWTToken,
+        token_repository: TokenRepository,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(TokenRepository, "create_revocation")
+
+        await token_service.revoke(jwt_token)
+
+        token_repository.create_revocation.assert_called_once_with(
+            jwt_token.jti, jwt_token.exp
+        )
+
+    async def test_successfully_rotate_token(
+        self,
+        mocker,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        token: dict[str, Any],
+        token_repository: TokenRepository,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(TokenRepository, "rotate_token")
+
+        await token_service.rotate(jwt_token, "previous", jwt_token, refresh_token)
+
+        token_repository.rotate_token.assert_called_once_with(
+            jwt_token.model_dump(), "previous", token, False
+        )
+
+    async def test_fail_to_rotate_token_due_to_token_not_found(
+        self,
+        mocker,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        token_service: TokenService,
+    ):
+        mocker.patch.object(
+            TokenRepository, "rotate_token", side_effect=transaction_canceled()
+        )
+
+        with pytest.raises(TokenNotFoundException) as excinfo:
+            await token_service.rotate(jwt_token, refresh_token, jwt_token, "new")
+
+        assert "The requested token was not found" == excinfo.value.detail
+
+    async def test_fail_to_rotate_token_due_to_refresh_token_mismatch(
+        self,
+        mocker,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        token: dict[str, Any],
+        token_service: TokenService,
+    ):
+        mocker.patch.object(
+            TokenRepository, "rotate_token", side_effect=transaction_canceled(token)
+        )
+
+        with pytest.raises(TokenNotFoundException):
+            await token_service.rotate(jwt_token, "other", jwt_token, "new")
+
+    async def test_fail_to_rotate_token_due_to_token_mismatch(
+        self,
+        mocker,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        token: dict[str, Any],
+        token_service: TokenService,
+    ):
+        mocker.patch.object(
+            TokenRepository, "rotate_token", side_effect=transaction_canceled(token)
+        )
+
+        with pytest.raises(TokenMismatchException) as excinfo:
+            await token_service.rotate(jwt_token, refresh_token, jwt_token, "new")
+
+        assert "Internal Server Error" == excinfo.value.detail
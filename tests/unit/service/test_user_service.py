@@ -1,6 +1,7 @@
 import uuid
 
 import pytest
+from botocore.exceptions import ClientError
 from fastapi import status
 
 from app.exceptions import UserAlreadyExistsException
@@ -8,56 +9,68 @@ from app.models.user import User
 from app.repositories.user_repository import UserRepository
 from app.services.user_service import UserService
 
+pytestmark = pytest.mark.anyio
+
+
+def transaction_canceled(
+    email_code: str = "None", username_code: str = "None"
+) -> ClientError:
+    return ClientError(
+        {
+            "Error": {"Code": "TransactionCanceledException", "Message": ""},
+            "CancellationReasons": [
+                {"Code": "None"},
+                {"Code": email_code},
+                {"Code": username_code},
+            ],
+        },
+        "TransactWriteItems",
+    )
+
 
 class TestUserService:
     @pytest.fixture
     def user_service(self) -> UserService:
         return UserService()
 
-    def test_successfully_register_user(
+    async def test_successfully_register_user(
         self,
         mocker,
         user: User,
         user_repository: UserRepository,
         user_service: UserService,
     ):
-        mocker.patch.object(UserRepository, "get_by_email", return_value=None)
-        mocker.patch.object(UserRepository, "get_by_username", return_value=None)
         mocker.patch.object(UserRepository, "create_user")
 
-        user_id = user_service.register(
+        user_id = await user_service.register(
             user.email, user.password, user.username, user.display_name
         )
 
         assert isinstance(user_id, str)
         assert uuid.UUID(user_id)
-        user_repository.get_by_email.assert_called_once_with(user.email)
-        user_repository.get_by_username.assert_called_once_with(user.username)
         user_repository.create_user.assert_called_once()
 
-    def test_successfully_register_user_without_display_name(
+    async def test_successfully_register_user_without_display_name(
         self,
         mocker,
         user: User,
         user_repository: UserRepository,
         user_service: UserService,
     ):
-        mocker.patch.object(UserRepository, "get_by_email", return_value=None)
-        mocker.patch.object(UserRepository, "get_by_username", return_value=None)
         mocker.patch.object(UserRepository, "create_user")
 
-        user_id = user_service.register(user.email, user.password, user.username, None)
+        user_id = await user_service.register(
+            user.email, user.password, user.username, None
+        )
 
         assert isinstance(user_id, str)
         assert uuid.UUID(user_id)
-        user_repository.get_by_email.assert_called_once_with(user.email)
-        user_repository.get_by_username.assert_called_once_with(user.username)
         user_repository.create_user.assert_called_once()
 
         call_args = user_repository.create_user.call_args[0][0]
         assert "display_name" not in call_args
 
-    def test_fail_to_register_user_due_to_user_already_exists(
+    async def test_fail_to_register_user_due_to_user_already_exists(
         self,
         mocker,
         user: User,
@@ -65,19 +78,22 @@ class TestUserService:
         user_service: UserService,
     ):
         error_message = f"User with email {user.email} already exists"
-        mocker.patch.object(UserRepository, "get_by_email", return_value=user)
-        mocker.patch.object(UserRepository, "get_by_username", return_value=None)
+        mocker.patch.object(
+            UserRepository,
+            "create_user",
+            side_effect=transaction_canceled(email_code="ConditionalCheckFailed"),
+        )
 
         with pytest.raises(UserAlreadyExistsException) as excinfo:
-            user_service.register(
+            await user_service.register(
                 user.email, user.password, user.username, user.display_name
             )
 
         assert status.HTTP_409_CONFLICT == excinfo.value.status_code
         assert error_message == excinfo.value.detail
-        user_repository.get_by_email.assert_called_once_with(user.email)
+        user_repository.create_user.assert_called_once()
 
-    def test_fail_to_register_user_due_to_username_already_exists(
+    async def test_fail_to_register_user_due_to_username_already_exists(
         self,
         mocker,
         user: User,
@@ -85,14 +101,34 @@ class TestUserService:
         user_service: UserService,
     ):
         error_message = f"User with username {user.username} already exists"
-        mocker.patch.object(UserRepository, "get_by_email", return_value=None)
-        mocker.patch.object(UserRepository, "get_by_username", return_value=user)
+        mocker.patch.object(
+            UserRepository,
+            "create_user",
+            side_effect=transaction_canceled(username_code="ConditionalCheckFailed"),
+        )
 
         with pytest.raises(UserAlreadyExistsException) as excinfo:
-            user_service.register(
+            await user_service.register(
                 user.email, user.password, user.username, user.display_name
             )
 
         assert status.HTTP_409_CONFLICT == excinfo.value.status_code
         assert error_message == excinfo.value.detail
-        user_repository.get_by_username.assert_called_once_with(user.username)
+        user_repository.create_user.assert_called_once()
+
+    async def test_fail_to_register_user_due_to_transaction_conflict(
+        self,
+        mocker,
+        user: User,
+        user_service: UserService,
+    ):
+        mocker.patch.object(
+            UserRepository,
+            "create_user",
+            side_effect=transaction_canceled(email_code="TransactionConflict"),
+        )
+
+        with pytest.raises(ClientError):
+            await user_service.register(
+                user.email, user.password, user.username, user.display_name
+            )
@@ -0,0 +1,32 @@
+from argon2 import PasswordHasher
+
+from app.argon2_calibration import measure, percentile, recommend
+
+
+class TestArgon2Calibration:
+    def test_successfully_measure_hash_latency(self):
+        latencies = measure(
+            PasswordHasher(time_cost=1, memory_cost=8, parallelism=1), 3
+        )
+
+        assert 3 == len(latencies)
+        assert all(latency > 0 for latency in latencies)
+
+    def test_successfully_calculate_percentile(self):
+        latencies = [float(latency) for latency in range(1, 101)]
+
+        assert 50 == round(percentile(latencies, 50))
+        assert 99 == round(percentile(latencies, 99))
+
+    def test_successfully_recommend_strongest_parameters_within_target(self):
+        results = [
+            (19456, 2, 40.0),
+            (65536, 1, 80.0),
+            (65536, 3, 240.0),
+            (131072, 3, 480.0),
+        ]
+
+        assert (65536, 3, 240.0) == recommend(results, 250)
+
+    def test_recommend_returns_none_if_no_parameters_meet_target(self):
+        assert recommend([(19456, 1, 40.0)], 10) is None
@@ -1,16 +1,20 @@
-from unittest.mock import Mock
+from unittest.mock import ANY, Mock
 
 import jwt
 import pytest
 from fastapi import HTTPException, status
 from fastapi.requests import Request
 
+from app.error_classification import EXPIRED_TOKEN
 from app.jwt_bearer import JWTBearer
 from app.models.jwt import JWTToken
+from app.revocation_filter import RevocationFilter
 from app.services.token_service import TokenService
 from app.settings import Settings
+from app.token_cache import token_cache
 
 NOT_AUTHENTICATED = "Not authenticated"
+pytestmark = pytest.mark.anyio
 
 
 class TestJWTAuth:
@@ -25,6 +29,10 @@ class TestJWTAuth:
     def jwt_auth(self) -> JWTBearer:
         return JWTBearer()
 
+    @pytest.fixture(autouse=True)
+    def get_revoked_before(self, mocker):
+        return mocker.patch.object(TokenService, "get_revoked_before", return_value={})
+
     @pytest.fixture
     def valid_request(
         self, empty_request: Mock, jwt_token: JWTToken, settings: Settings
@@ -34,68 +42,68 @@ class TestJWTAuth:
         }
         return empty_request
 
-    def test_fail_to_authorize_request_due_to_authorization_header_is_empty(
+    async def test_fail_to_authorize_request_due_to_authorization_header_is_empty(
         self, empty_request: Mock, jwt_bearer: JWTBearer
     ):
         empty_request.headers = {"Authorization": ""}
 
         with pytest.raises(HTTPException) as excinfo:
-            jwt_bearer(empty_request)
+            await jwt_bearer(empty_request)
 
         assert NOT_AUTHENTICATED == excinfo.value.detail
         assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
 
-    def test_fail_to_authorize_request_due_to_authorization_header_is_missing(
+    async def test_fail_to_authorize_request_due_to_authorization_header_is_missing(
         self, empty_request: Mock, jwt_bearer: JWTBearer
     ):
         with pytest.raises(HTTPException) as excinfo:
-            jwt_bearer(empty_request)
+            await jwt_bearer(empty_request)
 
         assert NOT_AUTHENTICATED == excinfo.value.detail
         assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
 
-    def test_fail_to_authorize_request_due_to_bearer_token_is_invalid(
+    async def test_fail_to_authorize_request_due_to_bearer_token_is_invalid(
         self, empty_request: Mock, jwt_bearer: JWTBearer
     ):
         empty_request.headers = {"Authorization": "Bearer asdf"}
 
         with pytest.raises(HTTPException) as excinfo:
-            jwt_bearer(empty_request)
+            await jwt_bearer(empty_request)
 
         assert NOT_AUTHENTICATED == excinfo.value.detail
         assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
 
-    def test_fail_to_authorize_request_due_to_bearer_token_is_invalid_with_auto_error_false(
+    async def test_fail_to_authorize_request_due_to_bearer_token_is_invalid_with_auto_error_false(
         self, empty_request: Mock
     ):
         empty_request.headers = {"Authorization": "Bearer asdf"}
 
         jwt_bearer = JWTBearer(auto_error=False)
 
-        result = jwt_bearer(empty_request)
+        result = await jwt_bearer(empty_request)
 
         assert result is None
 
-    def test_fail_to_authorize_request_due_to_bearer_token_is_missing(
+    async def test_fail_to_authorize_request_due_to_bearer_token_is_missing(
         self, empty_request: Mock, jwt_bearer: JWTBearer
     ):
         empty_request.headers = {"Authorization": "Bearer "}
 
         with pytest.raises(HTTPException) as excinfo:
-            jwt_bearer(empty_request)
+            await jwt_bearer(empty_request)
 
         assert NOT_AUTHENTICATED == excinfo.value.detail
         assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
 
-    def test_fail_to_authorize_request_due_to_bearer_token_is_missing_with_auto_error_false(
+    async def test_fail_to_authorize_request_due_to_bearer_token_is_missing_with_auto_error_false(
         self, empty_request: Mock, jwt_bearer: JWTBearer
     ):
         empty_request.headers = {"Authorization": "Bearer "}
         jwt_bearer = JWTBearer(auto_error=False)
 
-        assert jwt_bearer(empty_request) is None
+        assert await jwt_bearer(empty_request) is None
 
-    def test_fail_to_authorize_request_due_to_blacklisted_token(
+    async def test_fail_to_authorize_request_due_to_blacklisted_token(
         self,
         mocker,
         jwt_bearer: JWTBearer,
@@ -106,13 +114,35 @@ class TestJWTAuth:
         mocker.patch.object(TokenService, "get_by_id", return_value=None)
 
         with pytest.raises(HTTPException) as excinfo:
-            jwt_bearer(valid_request)
+            await jwt_bearer(valid_request)
 
         assert NOT_AUTHENTICATED == excinfo.value.detail
         assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
         token_service.get_by_id.assert_called_once_with(jwt_token.jti)
 
-    def test_fail_to_authorize_request_due_to_invalid_scheme(
+    async def test_fail_to_authorize_request_due_to_expired_token(
+        self,
+        mocker,
+        empty_request: Mock,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        settings: Settings,
+    ):
+        record_error = mocker.patch("app.jwt_bearer.record_error")
+        expired_token = jwt_token.model_copy(update={"exp": jwt_token.iat - 1})
+        empty_request.headers = {
+            "Authorization": f"Bearer {jwt.encode(expired_token.model_dump(exclude_none=True), settings.jwt_secret)}"
+        }
+
+        with pytest.raises(HTTPException) as excinfo:
+            await jwt_bearer(empty_request)
+
+        assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
+        record_error.assert_called_once_with(
+            EXPIRED_TOKEN, "Expired signature err=%r", ANY
+        )
+
+    async def test_fail_to_authorize_request_due_to_invalid_scheme(
         self,
         empty_request,
         jwt_bearer: JWTBearer,
@@ -124,13 +154,13 @@ class TestJWTAuth:
         }
 
         with pytest.raises(HTTPException) as excinfo:
-            jwt_bearer(empty_request)
+            await jwt_bearer(empty_request)
 
         assert excinfo.typename == HTTPException.__name__
         assert excinfo.value.status_code == status.HTTP_403_FORBIDDEN
         assert excinfo.value.detail == "Invalid authentication credentials"
 
-    def test_fail_to_authorize_request_due_to_invalid_scheme_with_auto_error_false(
+    async def test_fail_to_authorize_request_due_to_invalid_scheme_with_auto_error_false(
         self,
         empty_request,
         jwt_token: JWTToken,
@@ -141,28 +171,69 @@ class TestJWTAuth:
         }
         jwt_bearer = JWTBearer(auto_error=False)
 
-        assert jwt_bearer(empty_request) is None
+        assert await jwt_bearer(empty_request) is None
 
-    def test_fail_to_authorize_request_due_to_missing_credentials(
+    async def test_fail_to_authorize_request_due_to_missing_credentials(
         self, empty_request: Mock
     ):
         jwt_bearer = JWTBearer()
 
         with pytest.raises(HTTPException) as excinfo:
-            jwt_bearer(empty_request)
+            await jwt_bearer(empty_request)
 
         assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
         assert NOT_AUTHENTICATED == excinfo.value.detail
 
-    def test_fail_to_authorize_request_due_to_missing_credentials_with_auto_error_false(
+    async def test_fail_to_authorize_request_due_to_missing_credentials_with_auto_error_false(
         self, empty_request: Mock
     ):
         jwt_bearer = JWTBearer(auto_error=False)
-        result = jwt_bearer(empty_request)
+        result = await jwt_bearer(empty_request)
 
         assert result is None
 
-    def test_successfully_authorize_request(
+    async def test_successfully_authorize_request(
+        self,
+        mocker,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        token_service: TokenService,
+        valid_request: Request,
+    ):
+        mocker.patch.object(
+            TokenService,
+            "get_by_id",
+            return_value=(jwt_token.model_dump(), refresh_token),
+        )
+
+        result = await jwt_bearer(valid_request)
+
+        assert jwt_token.model_dump() == result.model_dump()
+        token_service.get_by_id.assert_called_once_with(jwt_token.jti)
+
+    async def test_successfully_authorize_request_from_token_cache(
+        self,
+        mocker,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        token_service: TokenService,
+        valid_request: Request,
+    ):
+        mocker.patch.object(
+            TokenService,
+            "get_by_id",
+            return_value=(jwt_token.model_dump(), refresh_token),
+        )
+
+        await jwt_bearer(valid_request)
+        result = await jwt_bearer(valid_request)
+
+        assert jwt_token.model_dump() == result.model_dump()
+        token_service.get_by_id.assert_called_once_with(jwt_token.jti)
+
+    async def test_successfully_authorize_request_if_revocation_epoch_check_fails(
         self,
         mocker,
         jwt_bearer: JWTBearer,
@@ -171,18 +242,23 @@ class TestJWTAuth:
         token_service: TokenService,
         valid_request: Request,
     ):
+        mocker.patch.object(token_cache, "_revocation_epoch_check_interval", 60)
+        mocker.patch.object(
+            TokenService, "get_revocation_epoch", side_effect=ConnectionError()
+        )
         mocker.patch.object(
             TokenService,
             "get_by_id",
             return_value=(jwt_token.model_dump(), refresh_token),
         )
+        token_cache.put(jwt_token.jti, False)
 
-        result = jwt_bearer(valid_request)
+        result = await jwt_bearer(valid_request)
 
         assert jwt_token.model_dump() == result.model_dump()
         token_service.get_by_id.assert_called_once_with(jwt_token.jti)
 
-    def test_successfully_authorize_request_from_query_param(
+    async def test_successfully_authorize_request_from_query_param(
         self,
         mocker,
         empty_request: Request,
@@ -201,7 +277,218 @@ class TestJWTAuth:
             "token": f"{jwt.encode(jwt_token.model_dump(exclude_none=True), settings.jwt_secret)}"
         }
 
-        result = jwt_bearer(empty_request)
+        result = await jwt_bearer(empty_request)
 
         assert jwt_token.model_dump() == result.model_dump()
         token_service.get_by_id.assert_called_once_with(jwt_token.jti)
+
+    async def test_fail_to_authorize_request_due_to_revoked_before_watermark(
+        self,
+        mocker,
+        get_revoked_before,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        valid_request: Request,
+    ):
+        get_revoked_before.return_value = {jwt_token.sub: jwt_token.iat + 1}
+        mocker.patch.object(
+            TokenService,
+            "get_by_id",
+            return_value=(jwt_token.model_dump(), refresh_token),
+        )
+
+        with pytest.raises(HTTPException) as excinfo:
+            await jwt_bearer(valid_request)
+
+        assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
+        get_revoked_before.assert_called_once_with([jwt_token.sub])
+        assert jwt_token.iat + 1 == token_cache.get_revoked_before(jwt_token.sub)
+
+    async def test_fail_to_authorize_cached_request_due_to_revoked_before_watermark(
+        self,
+        mocker,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        token_service: TokenService,
+        valid_request: Request,
+    ):
+        mocker.patch.object(TokenService, "get_by_id")
+        token_cache.put(jwt_token.jti, True)
+        token_cache.put_revoked_before(jwt_token.sub, jwt_token.iat + 1)
+
+        with pytest.raises(HTTPException) as excinfo:
+            await jwt_bearer(valid_request)
+
+        assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
+        token_service.get_by_id.assert_not_called()
+
+    async def test_successfully_authorize_request_without_io_in_stateless_mode(
+        self,
+        mocker,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        token_service: TokenService,
+        valid_request: Request,
+    ):
+        mocker.patch("app.jwt_bearer.settings.stateless_token_validation", True)
+        mocker.patch("app.jwt_bearer.revocation_filter", RevocationFilter())
+        mocker.patch.object(TokenService, "get_revocations", return_value=[])
+        mocker.patch.object(TokenService, "get_by_id")
+
+        await jwt_bearer(valid_request)
+        result = await jwt_bearer(valid_request)
+
+        assert jwt_token.model_dump() == result.model_dump()
+        token_service.get_revocations.assert_called_once()
+        token_service.get_by_id.assert_not_called()
+
+    async def test_fail_to_authorize_request_due_to_revoked_token_in_stateless_mode(
+        self,
+        mocker,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        token_service: TokenService,
+        valid_request: Request,
+    ):
+        mocker.patch("app.jwt_bearer.settings.stateless_token_validation", True)
+        mocker.patch("app.jwt_bearer.revocation_filter", RevocationFilter())
+        mocker.patch.object(
+            TokenService, "get_revocations", return_value=[jwt_token.jti]
+        )
+        mocker.patch.object(TokenService, "get_by_id", return_value=None)
+
+        with pytest.raises(HTTPException) as excinfo:
+            await jwt_bearer(valid_request)
+
+        assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
+        token_service.get_by_id.assert_called_once_with(jwt_token.jti)
+
+    async def test_fail_to_authorize_request_due_to_revoked_user_in_stateless_mode(
+        self,
+        mocker,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        token_service: TokenService,
+        valid_request: Request,
+    ):
+        mocker.patch("app.jwt_bearer.settings.stateless_token_validation", True)
+        mocker.patch("app.jwt_bearer.revocation_filter", RevocationFilter())
+        mocker.patch.object(
+            TokenService,
+            "get_revocations",
+            return_value=[(jwt_token.sub, jwt_token.iat + 1)],
+        )
+        mocker.patch.object(TokenService, "get_by_id")
+
+        with pytest.raises(HTTPException) as excinfo:
+            await jwt_bearer(valid_request)
+
+        assert status.HTTP_403_FORBIDDEN == excinfo.value.status_code
+        token_service.get_by_id.assert_not_called()
+
+    async def test_successfully_authorize_request_if_revocation_sync_fails(
+        self,
+        mocker,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        refresh_token: str,
+        token_service: TokenService,
+        valid_request: Request,
+    ):
+        mocker.patch("app.jwt_bearer.settings.stateless_token_validation", True)
+        mocker.patch("app.jwt_bearer.revocation_filter", RevocationFilter())
+        mocker.patch.object(
+            TokenService, "get_revocations", side_effect=ConnectionError()
+        )
+        mocker.patch.object(
+            TokenService,
+            "get_by_id",
+            return_value=(jwt_token.model_dump(), refresh_token),
+        )
+
+        result = await jwt_bearer(valid_request)
+
+        assert jwt_token.model_dump() == result.model_dump()
+        token_service.get_by_id.assert_called_once_with(jwt_token.jti)
+
+    async def test_successfully_validate_tokens_with_one_batch(
+        self,
+        mocker,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        settings: Settings,
+        token_service: TokenService,
+    ):
+        revoked_token = jwt_token.model_copy(update={"jti": "revoked"})
+        cached_token = jwt_token.model_copy(update={"jti": "cached"})
+        token_cache.put(cached_token.jti, True)
+        token_cache.put_revoked_before(jwt_token.sub, 0)
+        mocker.patch.object(
+            TokenService, "get_existing_ids", return_value={jwt_token.jti}
+        )
+        mocker.patch.object(TokenService, "get_by_id")
+        tokens = [
+            jwt.encode(token.model_dump(exclude_none=True), settings.jwt_secret)
+            for token in (jwt_token, revoked_token, cached_token, jwt_token)
+        ]
+
+        results = await jwt_bearer.validate_tokens([*tokens, "invalid"])
+
+        assert [jwt_token.jti, None, cached_token.jti, jwt_token.jti, None] == [
+            None if result is None else result.jti for result in results
+        ]
+        token_service.get_existing_ids.assert_called_once_with(
+            [jwt_token.jti, revoked_token.jti]
+        )
+        token_service.get_by_id.assert_not_called()
+        assert token_cache.get(revoked_token.jti) is False
+
+    async def test_successfully_validate_tokens_without_io(
+        self,
+        mocker,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        settings: Settings,
+        token_service: TokenService,
+    ):
+        token_cache.put(jwt_token.jti, True)
+        token_cache.put_revoked_before(jwt_token.sub, 0)
+        mocker.patch.object(TokenService, "get_existing_ids")
+
+        results = await jwt_bearer.validate_tokens(
+            [jwt.encode(jwt_token.model_dump(exclude_none=True), settings.jwt_secret)]
+        )
+
+        assert [jwt_token] == results
+        token_service.get_existing_ids.assert_not_called()
+
+    async def test_successfully_validate_tokens_against_revoked_before_watermarks(
+        self,
+        mocker,
+        get_revoked_before,
+        jwt_bearer: JWTBearer,
+        jwt_token: JWTToken,
+        settings: Settings,
+    ):
+        other_token = jwt_token.model_copy(update={"jti": "other", "sub": "other"})
+        revoked_token = jwt_token.model_copy(update={"jti": "revoked"})
+        get_revoked_before.return_value = {jwt_token.sub: jwt_token.iat + 1}
+        mocker.patch.object(
+            TokenService,
+            "get_existing_ids",
+            return_value={jwt_token.jti, other_token.jti, revoked_token.jti},
+        )
+
+        results = await jwt_bearer.validate_tokens(
+            [
+                jwt.encode(token.model_dump(exclude_none=True), settings.jwt_secret)
+                for token in (jwt_token, other_token, revoked_token)
+            ]
+        )
+
+        assert [None, other_token.jti, None] == [
+            None if result is None else result.jti for result in results
+        ]
+        get_revoked_before.assert_called_once_with([jwt_token.sub, other_token.sub])
+        assert token_cache.get(jwt_token.jti) is True
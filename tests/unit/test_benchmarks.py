@@ -0,0 +1,212 @@
+import asyncio
+import json
+import time
+import uuid
+
+import pytest
+
+from app.benchmarks import (
+    compression,
+    load,
+    middlewares,
+    revocation_filter,
+    serialization,
+    structured_logging,
+)
+from app.middlewares import CompressionMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+class TestCompressionBenchmark:
+    @pytest.mark.parametrize(
+        "path, expected",
+        [("/0", "identity"), ("/1", "identity"), ("/2", "gzip"), ("/3", "gzip")],
+        ids=list(compression.PAYLOADS),
+    )
+    async def test_successfully_skip_sub_kilobyte_payloads(self, path, expected):
+        app = compression.build_app(
+            lambda app: app.add_middleware(CompressionMiddleware), opt_in=True
+        )
+
+        encoding, _ = await compression.encoded_size(app, path)
+
+        assert expected == encoding
+
+    def test_successfully_report_payloads(self, capsys):
+        compression.main(["--requests", "5"])
+
+        output = capsys.readouterr().out
+        assert all(name in output for name in compression.STACKS)
+        assert all(payload in output for payload in compression.PAYLOADS)
+
+
+class TestLoadBenchmark:
+    def test_successfully_summarize_latencies(self):
+        result = load.summarize([float(latency) for latency in range(1, 101)], 2, 4)
+
+        assert {"requests": 100, "errors": 2, "rps": 25} == {
+            key: result[key] for key in ("requests", "errors", "rps")
+        }
+        assert result["p50"] < result["p95"] < result["p99"] <= 100
+
+    def test_successfully_compare_with_baseline(self, capsys):
+        result = {"requests": 1, "errors": 0, "p50": 1, "p95": 1, "p99": 1.1, "rps": 9}
+
+        load.report(
+            {"handler": {"login": result}},
+            {"handler": {"login": {**result, "p99": 1, "rps": 10}}},
+        )
+
+        output = capsys.readouterr().out
+        assert "p99 diff" in output
+        assert "+10.0%" in output
+        assert "-10.0%" in output
+
+    def test_successfully_build_api_gateway_event(self):
+        event = load.api_gateway_event(
+            "POST", "/api/v1/login", {"Content-Type": "application/json"}, b"{}"
+        )
+
+        assert "POST" == event["httpMethod"]
+        assert "/api/v1/login" == event["path"]
+        assert ["application/json"] == event["multiValueHeaders"]["Content-Type"]
+        assert "{}" == event["body"]
+
+    def test_successfully_inject_latency(self, moto_server):
+        host, port = moto_server.get_host_and_port()
+
+        async def request(url: str) -> float:
+            async with load.httpx.AsyncClient() as client:
+                started_at = time.perf_counter()
+                await client.get(f"{url}/moto-api/")
+                return time.perf_counter() - started_at
+
+        with load.LatencyProxy(f"http://{host}:{port}", 0.2) as proxy:
+            latency = asyncio.run(request(proxy.url))
+
+        assert latency >= 0.2
+
+    def test_successfully_report_endpoints(self, capsys, mocker, monkeypatch, tmp_path):
+        mocker.patch.object(load, "put_jwt_secret")
+        monkeypatch.setenv("LOG_LEVEL", "INFO")
+        monkeypatch.setenv("POWERTOOLS_METRICS_DISABLED", "true")
+        baseline = tmp_path / "load.json"
+
+        load.main(
+            [
+                "--endpoints",
+                "introspect",
+                "logout",
+                "--requests",
+                "3",
+                "--users",
+                "1",
+                "--log-level",
+                "INFO",
+                "--baseline",
+                str(baseline),
+                "--save-baseline",
+            ]
+        )
+
+        output = capsys.readouterr().out
+        results = json.loads(baseline.read_text())
+        assert all(target in output for target in load.TARGETS)
+        assert {"introspect", "logout"} == set(results["handler"])
+        assert all(
+            {"requests": 3, "errors": 0}.items() <= result.items()
+            for endpoints in results.values()
+            for result in endpoints.values()
+        )
+
+
+class TestStructuredLoggingBenchmark:
+    @pytest.mark.parametrize(
+        "build_logger, request_",
+        [
+            (build_logger, request)
+            for _, build_logger, request in structured_logging.SCENARIOS
+        ],
+        ids=[name for name, _, _ in structured_logging.SCENARIOS],
+    )
+    def test_successfully_measure_scenario(self, build_logger, request_):
+        latencies = structured_logging.measure(
+            build_logger(),
+            request_,
+            structured_logging.build_event(),
+            structured_logging.build_token(),
+            3,
+        )
+
+        assert 3 == len(latencies)
+
+    def test_successfully_report_scenarios(self, capsys):
+        structured_logging.main(["--requests", "5", "--rounds", "1"])
+
+        output = capsys.readouterr().out
+        assert all(name in output for name, _, _ in structured_logging.SCENARIOS)
+
+
+class TestMiddlewaresBenchmark:
+    @pytest.mark.parametrize(
+        "layers",
+        [layers for _, _, layers in middlewares.STACKS],
+        ids=[name for name, _, _ in middlewares.STACKS],
+    )
+    async def test_successfully_measure_stack(self, layers):
+        latencies = await middlewares.measure(middlewares.build_app(layers), 3)
+
+        assert 3 == len(latencies)
+        assert all(latency > 0 for latency in latencies)
+
+    def test_successfully_report_layers(self, capsys):
+        middlewares.main(["--requests", "5", "--rounds", "1"])
+
+        output = capsys.readouterr().out
+        assert all(name in output for name, _, _ in middlewares.STACKS)
+
+
+class TestRevocationFilterBenchmark:
+    def test_successfully_measure_bloom_filter(self):
+        revoked = [str(uuid.uuid4()) for _ in range(1000)]
+        probes = [str(uuid.uuid4()) for _ in range(1000)]
+
+        result = revocation_filter.measure_bloom_filter(revoked, probes, 0.01)
+
+        assert result["false_positive_rate"] < 0.03
+        assert 1199 == result["bytes"]
+
+    def test_successfully_report_structures(self, capsys):
+        revocation_filter.main(["--revoked", "100", "--probes", "100"])
+
+        output = capsys.readouterr().out
+        assert "100 revoked tokens" in output
+        assert "sorted list of jti bytes" in output
+
+
+class TestSerializationBenchmark:
+    @pytest.mark.parametrize("path", list(serialization.ROUTES.values()))
+    async def test_successfully_serialize_identical_token_body(self, path):
+        app = serialization.build_app()
+        scope = {**middlewares.SCOPE, "path": path, "raw_path": path.encode()}
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        await app(scope, receive, send)
+
+        assert serialization.token_response_adapter.dump_json(
+            serialization._build_token()
+        ) == b"".join(message.get("body", b"") for message in messages[1:])
+
+    def test_successfully_report_paths(self, capsys):
+        serialization.main(["--number", "5", "--requests", "5"])
+
+        output = capsys.readouterr().out
+        assert all(name in output for name in serialization.SERIALIZERS)
+        assert all(name in output for name in serialization.ROUTES)
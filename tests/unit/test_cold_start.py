@@ -0,0 +1,124 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+DEFERRED_MODULES = (
+    "aws_lambda_powertools.utilities.parameters",
+    "compression.zstd",
+    "fastapi.middleware.gzip",
+    "starlette.middleware.gzip",
+    "uvicorn",
+)
+DEPENDENCIES = (
+    "argon2",
+    "aws_lambda_powertools",
+    "boto3.dynamodb.conditions",
+    "email_validator",
+    "fastapi",
+    "httpx",
+    "jwt",
+    "mangum",
+    "pendulum",
+    "pydantic_settings",
+)
+# measured on an idle runner: ~0.7s of CPU for the full import and ~60ms for the
+# app's own modules once its dependencies are loaded; CPU time is used because it
+# stays stable while other test workers compete for cores
+APP_IMPORT_CPU_BUDGET_NS = 150_000_000
+FULL_IMPORT_CPU_BUDGET_NS = 1_200_000_000
+ROOT_DIR = Path(__file__).parents[2]
+SAMPLES = 3
+
+
+def import_times(module: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        cwd=ROOT_DIR,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def import_cpu_time(module: str, preload: tuple[str, ...] = ()) -> int:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "".join(f"import {name}; " for name in preload)
+            + "import time; started = time.process_time_ns(); "
+            f"import {module}; print(time.process_time_ns() - started)",
+        ],
+        capture_output=True,
+        check=True,
+        cwd=ROOT_DIR,
+        text=True,
+    )
+    return int(result.stdout)
+
+
+class TestColdStart:
+    def test_successfully_import_api_handler_within_budget(self):
+        cpu_time = min(import_cpu_time("app.api_handler") for _ in range(SAMPLES))
+
+        assert cpu_time <= FULL_IMPORT_CPU_BUDGET_NS
+
+    def test_successfully_import_app_modules_within_budget(self):
+        cpu_time = min(
+            import_cpu_time("app.api_handler", DEPENDENCIES) for _ in range(SAMPLES)
+        )
+
+        assert cpu_time <= APP_IMPORT_CPU_BUDGET_NS
+
+    def test_successfully_defer_unused_imports(self):
+        times = import_times("app.api_handler")
+
+        for module in DEFERRED_MODULES:
+            assert module not in times
+
+    @pytest.mark.anyio
+    async def test_successfully_warm_up(self, mocker):
+        from app.api_handler import warm_up
+
+        refresh = mocker.patch("app.api_handler.settings.jwt_secret_provider.refresh")
+        dynamodb_warm_up = mocker.AsyncMock()
+        mocker.patch(
+            "app.api_handler.get_dynamodb_client"
+        ).return_value.warm_up = dynamodb_warm_up
+        password_hasher_warm_up = mocker.patch(
+            "app.api_handler.password_hashing_executor.warm_up"
+        )
+
+        await warm_up()
+
+        refresh.assert_called_once_with()
+        dynamodb_warm_up.assert_called_once_with(1)
+        password_hasher_warm_up.assert_called_once_with()
+
+    @pytest.mark.anyio
+    async def test_successfully_warm_up_despite_failed_step(self, mocker):
+        from app.api_handler import warm_up
+
+        mocker.patch(
+            "app.api_handler.settings.jwt_secret_provider.refresh",
+            side_effect=RuntimeError("SSM unavailable"),
+        )
+        mocker.patch(
+            "app.api_handler.get_dynamodb_client"
+        ).return_value.warm_up = mocker.AsyncMock()
+        password_hasher_warm_up = mocker.patch(
+            "app.api_handler.password_hashing_executor.warm_up"
+        )
+
+        await warm_up()
+
+        password_hasher_warm_up.assert_called_once_with()
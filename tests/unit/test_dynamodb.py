@@ -0,0 +1,337 @@
+import asyncio
+import json
+from decimal import Decimal
+from unittest.mock import ANY
+
+import httpx
+import pytest
+from aws_lambda_powertools.metrics import MetricUnit
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.credentials import ReadOnlyCredentials, RefreshableCredentials
+from botocore.exceptions import ClientError, HTTPClientError
+from respx import MockRouter
+
+from app.dynamodb import DynamoDBClient, get_dynamodb_client, serialize_request
+
+ENDPOINT_URL = "http://dynamodb.local"
+
+pytestmark = pytest.mark.anyio
+
+
+class TestDynamoDBClient:
+    @pytest.fixture
+    def dynamodb_client(self) -> DynamoDBClient:
+        return DynamoDBClient(ENDPOINT_URL, "eu-central-1")
+
+    async def test_successfully_get_item(
+        self, dynamodb_client: DynamoDBClient, respx_mock: MockRouter
+    ):
+        route = respx_mock.post(ENDPOINT_URL).mock(
+            return_value=httpx.Response(
+                200, json={"Item": {"jti": {"S": "jti"}, "ttl": {"N": "1"}}}
+            )
+        )
+
+        response = await dynamodb_client.table("tokens").get_item(Key={"jti": "jti"})
+
+        assert {"jti": "jti", "ttl": Decimal(1)} == response["Item"]
+        assert 200 == response["ResponseMetadata"]["HTTPStatusCode"]
+        request = route.calls.last.request
+        assert "DynamoDB_20120810.GetItem" == request.headers["X-Amz-Target"]
+        assert request.headers["Authorization"].startswith("AWS4-HMAC-SHA256")
+        assert {"TableName": "tokens", "Key": {"jti": {"S": "jti"}}} == json.loads(
+            request.content
+        )
+
+    async def test_successfully_retry_throttled_request(
+        self, dynamodb_client: DynamoDBClient, respx_mock: MockRouter
+    ):
+        route = respx_mock.post(ENDPOINT_URL).mock(
+            side_effect=[
+                httpx.Response(
+                    400,
+                    json={
+                        "__type": "com.amazonaws.dynamodb.v20120810#ThrottlingException"
+                    },
+                ),
+                httpx.Response(200, json={}),
+            ]
+        )
+
+        await dynamodb_client.table("tokens").delete_item(Key={"jti": "jti"})
+
+        assert 2 == route.call_count
+
+    async def test_successfully_retry_server_error(
+        self, dynamodb_client: DynamoDBClient, respx_mock: MockRouter
+    ):
+        route = respx_mock.post(ENDPOINT_URL).mock(
+            side_effect=[
+                httpx.Response(500, text="<html>Internal Server Error</html>"),
+                httpx.Response(200, json={}),
+            ]
+        )
+
+        await dynamodb_client.table("tokens").delete_item(Key={"jti": "jti"})
+
+        assert 2 == route.call_count
+
+    async def test_fail_to_request_due_to_client_error(
+        self, dynamodb_client: DynamoDBClient, respx_mock: MockRouter
+    ):
+        respx_mock.post(ENDPOINT_URL).mock(
+            return_value=httpx.Response(
+                400,
+                json={
+                    "__type": "com.amazonaws.dynamodb.v20120810#ResourceNotFoundException",
+                    "message": "Requested resource not found",
+                },
+            )
+        )
+
+        with pytest.raises(ClientError) as excinfo:
+            await dynamodb_client.table("tokens").get_item(Key={"jti": "jti"})
+
+        assert "ResourceNotFoundException" == excinfo.value.response["Error"]["Code"]
+        assert (
+            "Requested resource not found" == excinfo.value.response["Error"]["Message"]
+        )
+        assert "GetItem" == excinfo.value.operation_name
+
+    async def test_fail_to_request_due_to_transport_error(
+        self, dynamodb_client: DynamoDBClient, respx_mock: MockRouter
+    ):
+        route = respx_mock.post(ENDPOINT_URL).mock(
+            side_effect=httpx.ConnectError("Connection refused")
+        )
+
+        with pytest.raises(HTTPClientError):
+            await dynamodb_client.table("tokens").get_item(Key={"jti": "jti"})
+
+        assert 3 == route.call_count
+
+    async def test_fail_to_transact_write_items_due_to_canceled_transaction(
+        self, dynamodb_client: DynamoDBClient, respx_mock: MockRouter
+    ):
+        route = respx_mock.post(ENDPOINT_URL).mock(
+            return_value=httpx.Response(
+                400,
+                json={
+                    "__type": "com.amazonaws.dynamodb.v20120810#TransactionCanceledException",
+                    "Message": "Transaction cancelled",
+                    "CancellationReasons": [
+                        {
+                            "Code": "ConditionalCheckFailed",
+                            "Item": {"jti": {"S": "jti"}},
+                        },
+                        {"Code": "None"},
+                    ],
+                },
+            )
+        )
+
+        with pytest.raises(ClientError) as excinfo:
+            await dynamodb_client.transact_write_items(
+                [
+                    {
+                        "Delete": {
+                            "TableName": "tokens",
+                            "Key": {"jti": "jti"},
+                            "ConditionExpression": Attr("refresh_token").eq("rt"),
+                        }
+                    },
+                    {"Put": {"TableName": "tokens", "Item": {"jti": "new"}}},
+                ]
+            )
+
+        assert [
+            {"Code": "ConditionalCheckFailed", "Item": {"jti": "jti"}},
+            {"Code": "None"},
+        ] == excinfo.value.response["CancellationReasons"]
+        request = route.calls.last.request
+        assert "DynamoDB_20120810.TransactWriteItems" == request.headers["X-Amz-Target"]
+        assert {
+            "ClientRequestToken": ANY,
+            "TransactItems": [
+                {
+                    "Delete": {
+                        "TableName": "tokens",
+                        "Key": {"jti": {"S": "jti"}},
+                        "ConditionExpression": "#n0 = :v0",
+                        "ExpressionAttributeNames": {"#n0": "refresh_token"},
+                        "ExpressionAttributeValues": {":v0": {"S": "rt"}},
+                    }
+                },
+                {"Put": {"TableName": "tokens", "Item": {"jti": {"S": "new"}}}},
+            ],
+        } == json.loads(request.content)
+
+    async def test_successfully_batch_get_items(
+        self, dynamodb_client: DynamoDBClient, respx_mock: MockRouter
+    ):
+        route = respx_mock.post(ENDPOINT_URL).mock(
+            side_effect=[
+                httpx.Response(
+                    200,
+                    json={
+                        "Responses": {"tokens": [{"jti": {"S": "0"}}]},
+                        "UnprocessedKeys": {"tokens": {"Keys": [{"jti": {"S": "1"}}]}},
+                    },
+                ),
+                httpx.Response(
+                    200, json={"Responses": {"tokens": [{"jti": {"S": "1"}}]}}
+                ),
+                httpx.Response(
+                    200, json={"Responses": {"tokens": [{"jti": {"S": "100"}}]}}
+                ),
+            ]
+        )
+
+        response = await dynamodb_client.table("tokens").batch_get_item(
+            [{"jti": str(index)} for index in range(101)], ProjectionExpression="jti"
+        )
+
+        assert [{"jti": "0"}, {"jti": "1"}, {"jti": "100"}] == response["Responses"][
+            "tokens"
+        ]
+        assert "UnprocessedKeys" not in response
+        requests = [json.loads(call.request.content) for call in route.calls]
+        assert (
+            "DynamoDB_20120810.BatchGetItem"
+            == (route.calls.last.request.headers["X-Amz-Target"])
+        )
+        assert [100, 1, 1] == [
+            len(request["RequestItems"]["tokens"]["Keys"]) for request in requests
+        ]
+        assert "jti" == requests[0]["RequestItems"]["tokens"]["ProjectionExpression"]
+        assert [{"jti": {"S": "1"}}] == requests[1]["RequestItems"]["tokens"]["Keys"]
+
+    async def test_fail_to_batch_get_items_due_to_unprocessed_keys(
+        self, respx_mock: MockRouter
+    ):
+        dynamodb_client = DynamoDBClient(ENDPOINT_URL, "eu-central-1", max_attempts=2)
+        route = respx_mock.post(ENDPOINT_URL).mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "Responses": {"tokens": []},
+                    "UnprocessedKeys": {"tokens": {"Keys": [{"jti": {"S": "jti"}}]}},
+                },
+            )
+        )
+
+        response = await dynamodb_client.table("tokens").batch_get_item(
+            [{"jti": "jti"}]
+        )
+
+        assert {"tokens": {"Keys": [{"jti": "jti"}]}} == response["UnprocessedKeys"]
+        assert 2 == route.call_count
+
+    async def test_successfully_batch_write_items(
+        self, dynamodb_client: DynamoDBClient, respx_mock: MockRouter
+    ):
+        def respond(request: httpx.Request) -> httpx.Response:
+            requests = json.loads(request.content)["RequestItems"]["users"]
+            if len(requests) == 25:
+                requests = requests[:1]
+            elif "PutRequest" in requests[0]:
+                requests = []
+            return httpx.Response(200, json={"UnprocessedItems": {"users": requests}})
+
+        route = respx_mock.post(ENDPOINT_URL).mock(side_effect=respond)
+
+        response = await dynamodb_client.table("users").batch_write_item(
+            [{"PutRequest": {"Item": {"id": str(index)}}} for index in range(25)]
+            + [{"DeleteRequest": {"Key": {"id": "25"}}}]
+        )
+
+        assert {"users": [{"DeleteRequest": {"Key": {"id": "25"}}}]} == response[
+            "UnprocessedItems"
+        ]
+        requests = [
+            json.loads(call.request.content)["RequestItems"]["users"]
+            for call in route.calls
+        ]
+        assert (
+            "DynamoDB_20120810.BatchWriteItem"
+            == (route.calls.last.request.headers["X-Amz-Target"])
+        )
+        assert [1, 1, 1, 1, 25] == sorted(len(request) for request in requests)
+        assert [{"PutRequest": {"Item": {"id": {"S": "0"}}}}] in requests
+
+    async def test_successfully_warm_up_connections(
+        self, dynamodb_client: DynamoDBClient, respx_mock: MockRouter
+    ):
+        route = respx_mock.get(ENDPOINT_URL).mock(
+            return_value=httpx.Response(200, text="healthy: dynamodb.local")
+        )
+
+        assert 2 == await dynamodb_client.warm_up(2)
+        assert 2 == route.call_count
+
+    async def test_fail_to_warm_up_connections_due_to_transport_error(
+        self, dynamodb_client: DynamoDBClient, respx_mock: MockRouter
+    ):
+        respx_mock.get(ENDPOINT_URL).mock(
+            side_effect=httpx.ConnectError("Connection refused")
+        )
+
+        assert 0 == await dynamodb_client.warm_up()
+
+    async def test_successfully_report_pool_saturation(self, mocker, respx_mock):
+        dynamodb_client = DynamoDBClient(
+            ENDPOINT_URL, "eu-central-1", max_connections=1
+        )
+        add_metric = mocker.patch("app.dynamodb.metrics.add_metric")
+
+        async def respond(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={})
+
+        respx_mock.post(ENDPOINT_URL).mock(side_effect=respond)
+
+        await asyncio.gather(
+            dynamodb_client.table("tokens").get_item(Key={"jti": "jti"}),
+            dynamodb_client.table("tokens").get_item(Key={"jti": "jti"}),
+        )
+
+        add_metric.assert_called_once_with(
+            name="DynamoDBPoolSaturated", unit=MetricUnit.Count, value=1
+        )
+        assert 0 == dynamodb_client.in_flight
+
+    async def test_successfully_refresh_credentials_off_the_event_loop(
+        self, dynamodb_client: DynamoDBClient, mocker, respx_mock: MockRouter
+    ):
+        credentials = mocker.Mock(spec=RefreshableCredentials)
+        credentials.refresh_needed.return_value = True
+        credentials.get_frozen_credentials.return_value = ReadOnlyCredentials(
+            "access_key", "secret_key", None
+        )
+        mocker.patch(
+            "app.dynamodb.botocore.session.get_session"
+        ).return_value.get_credentials.return_value = credentials
+        to_thread = mocker.spy(asyncio, "to_thread")
+        respx_mock.post(ENDPOINT_URL).mock(return_value=httpx.Response(200, json={}))
+
+        await dynamodb_client.table("tokens").get_item(Key={"jti": "jti"})
+
+        to_thread.assert_any_call(credentials.get_frozen_credentials)
+
+    def test_successfully_share_client(self):
+        assert get_dynamodb_client() is get_dynamodb_client()
+
+    def test_successfully_serialize_request(self):
+        params = serialize_request(
+            {
+                "KeyConditionExpression": Key("email").eq("root@netcode.hu"),
+                "FilterExpression": Attr("deleted_at").not_exists(),
+            }
+        )
+
+        assert "#n1 = :v0" == params["KeyConditionExpression"]
+        assert "attribute_not_exists(#n0)" == params["FilterExpression"]
+        assert {"#n0": "deleted_at", "#n1": "email"} == params[
+            "ExpressionAttributeNames"
+        ]
+        assert {":v0": {"S": "root@netcode.hu"}} == params["ExpressionAttributeValues"]
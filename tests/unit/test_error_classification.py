@@ -0,0 +1,81 @@
+import pytest
+from aws_lambda_powertools.metrics import MetricUnit
+from fastapi import status
+
+from app import settings
+from app.error_classification import (
+    CLIENT_ERROR,
+    EXPIRED_TOKEN,
+    SERVER_ERROR,
+    classify,
+    record_error,
+)
+from app.metrics import metrics
+from app.structured_logging import logger
+
+
+class TestErrorClassification:
+    @pytest.mark.parametrize(
+        "status_code, error_class",
+        [
+            (status.HTTP_401_UNAUTHORIZED, "Unauthorized"),
+            (status.HTTP_403_FORBIDDEN, "Forbidden"),
+            (status.HTTP_404_NOT_FOUND, "NotFound"),
+            (status.HTTP_409_CONFLICT, "Conflict"),
+            (status.HTTP_422_UNPROCESSABLE_ENTITY, "ValidationFailed"),
+            (status.HTTP_400_BAD_REQUEST, CLIENT_ERROR),
+            (status.HTTP_500_INTERNAL_SERVER_ERROR, SERVER_ERROR),
+            (status.HTTP_503_SERVICE_UNAVAILABLE, SERVER_ERROR),
+        ],
+    )
+    def test_successfully_classify_status_code(self, status_code, error_class):
+        assert error_class == classify(status_code)
+
+    def test_successfully_record_expected_error_without_traceback(self, mocker):
+        add_metric = mocker.patch.object(metrics, "add_metric")
+        info = mocker.patch.object(logger, "info")
+        exception = mocker.patch.object(logger, "exception")
+
+        record_error(EXPIRED_TOKEN, "Expired signature err=%r", "err")
+
+        add_metric.assert_called_once_with(
+            name="ExpiredTokenErrors", unit=MetricUnit.Count, value=1
+        )
+        info.assert_called_once_with(
+            "Expired signature err=%r",
+            "err",
+            stacklevel=3,
+            extra={"error_class": EXPIRED_TOKEN},
+        )
+        exception.assert_not_called()
+
+    def test_successfully_sample_expected_error_logs(self, mocker):
+        mocker.patch.object(settings, "log_expected_error_sample_rate", 0)
+        add_metric = mocker.patch.object(metrics, "add_metric")
+        info = mocker.patch.object(logger, "info")
+
+        record_error(classify(status.HTTP_404_NOT_FOUND), "Not found")
+
+        add_metric.assert_called_once()
+        info.assert_not_called()
+
+    def test_successfully_record_client_error_without_traceback(self, mocker):
+        mocker.patch.object(metrics, "add_metric")
+        warning = mocker.patch.object(logger, "warning")
+        exception = mocker.patch.object(logger, "exception")
+
+        record_error(CLIENT_ERROR, "Bad request")
+
+        warning.assert_called_once()
+        exception.assert_not_called()
+
+    def test_successfully_record_server_error_with_traceback(self, mocker):
+        add_metric = mocker.patch.object(metrics, "add_metric")
+        exception = mocker.patch.object(logger, "exception")
+
+        record_error(SERVER_ERROR, "Received botocore error error_id=%s", "1")
+
+        add_metric.assert_called_once_with(
+            name="ServerErrorErrors", unit=MetricUnit.Count, value=1
+        )
+        exception.assert_called_once()
@@ -0,0 +1,54 @@
+import uuid
+
+import pendulum
+import pytest
+
+from app.dynamodb import get_dynamodb_client
+from app.guard_backfill import backfill
+from app.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+
+class TestGuardBackfill:
+    async def test_successfully_backfill_guards(
+        self, user: User, users_table, users_table_name: str
+    ):
+        users_table.delete_item(Key={"id": f"EMAIL#{user.email}"})
+        users_table.delete_item(Key={"id": f"USERNAME#{user.username}"})
+        soft_deleted_user_id = str(uuid.uuid4())
+        users_table.put_item(
+            Item={
+                "id": soft_deleted_user_id,
+                "email": "deleted@netcode.hu",
+                "username": "deleted",
+                "deleted_at": pendulum.now().to_iso8601_string(),
+            }
+        )
+
+        counts = await backfill(get_dynamodb_client().table(users_table_name))
+
+        assert {"users": 2, "soft_deleted": 1, "guards": 2, "conflicts": 0} == counts
+        email_guard = users_table.get_item(Key={"id": f"EMAIL#{user.email}"})
+        username_guard = users_table.get_item(Key={"id": f"USERNAME#{user.username}"})
+        assert user.id == email_guard["Item"]["user_id"]
+        assert user.id == username_guard["Item"]["user_id"]
+        assert "Item" not in users_table.get_item(
+            Key={"id": "EMAIL#deleted@netcode.hu"}
+        )
+
+    async def test_successfully_report_conflicting_guards(
+        self, user: User, users_table, users_table_name: str
+    ):
+        users_table.put_item(
+            Item={
+                "id": str(uuid.uuid4()),
+                "email": user.email,
+                "username": "duplicate",
+            }
+        )
+
+        counts = await backfill(get_dynamodb_client().table(users_table_name))
+
+        assert 1 == counts["conflicts"]
+        assert 3 == counts["guards"]
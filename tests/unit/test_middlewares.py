@@ -0,0 +1,174 @@
+import uuid
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response
+from fastapi.testclient import TestClient
+
+from app import settings
+from app.middlewares import (
+    X_CORRELATION_ID,
+    CompressionMiddleware,
+    CorrelationIdMiddleware,
+    TimingMiddleware,
+    correlation_id,
+    logger,
+    metrics,
+)
+from app.response_compression import ENCODER_FACTORIES, compress, get_encoders
+from app.structured_logging import request_sampled
+from app.timing import span
+
+
+class TestCorrelationIdMiddleware:
+    @pytest.fixture
+    def app(self) -> FastAPI:
+        app = FastAPI()
+        app.add_middleware(CorrelationIdMiddleware)
+
+        @app.get("/")
+        def index():
+            return {
+                "context": correlation_id.get(),
+                "logger": logger.thread_safe_get_current_keys().get("correlation_id"),
+                "sampled": request_sampled.get(),
+            }
+
+        return app
+
+    def test_successfully_forward_correlation_id_header(self, app: FastAPI):
+        value = str(uuid.uuid4())
+
+        response = TestClient(app).get("/", headers={X_CORRELATION_ID: value})
+
+        assert value == response.headers[X_CORRELATION_ID]
+        assert {"context": value, "logger": value, "sampled": True} == response.json()
+        assert "correlation_id" not in logger.thread_safe_get_current_keys()
+
+    def test_successfully_use_aws_request_id(self, app: FastAPI):
+        aws_context = Mock(aws_request_id=str(uuid.uuid4()))
+
+        async def asgi(scope, receive, send):
+            await app({**scope, "aws.context": aws_context}, receive, send)
+
+        response = TestClient(asgi).get("/")
+
+        assert aws_context.aws_request_id == response.headers[X_CORRELATION_ID]
+
+    def test_successfully_sample_route_logs(self, app: FastAPI, mocker):
+        mocker.patch.object(settings, "log_route_sample_rates", {"/": 0})
+
+        response = TestClient(app).get("/")
+
+        assert response.json()["sampled"] is False
+        assert request_sampled.get() is True
+
+    def test_successfully_generate_correlation_id(self, app: FastAPI):
+        response = TestClient(app).get("/")
+
+        value = response.headers[X_CORRELATION_ID]
+        assert str(uuid.UUID(value)) == value
+        assert value == response.json()["context"]
+
+
+class TestTimingMiddleware:
+    @pytest.fixture
+    def app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/")
+        async def index():
+            with span("tokens.get_by_id"):
+                pass
+            return {}
+
+        return app
+
+    def test_successfully_add_server_timing_header(self, app: FastAPI, mocker):
+        add_metric = mocker.patch.object(metrics, "add_metric")
+        app.add_middleware(TimingMiddleware, header=True)
+
+        response = TestClient(app).get("/")
+
+        assert [
+            "tokens.get_by_id",
+            "total",
+        ] == [
+            metric.split(";dur=")[0]
+            for metric in response.headers["Server-Timing"].split(", ")
+        ]
+        assert ["tokens.get_by_id"] == [
+            call.kwargs["name"] for call in add_metric.call_args_list
+        ]
+
+    def test_successfully_emit_metrics_without_header(self, app: FastAPI, mocker):
+        add_metric = mocker.patch.object(metrics, "add_metric")
+        app.add_middleware(TimingMiddleware, header=False)
+
+        response = TestClient(app).get("/")
+
+        assert "Server-Timing" not in response.headers
+        add_metric.assert_called_once()
+
+
+class TestCompressionMiddleware:
+    @pytest.fixture
+    def app(self) -> FastAPI:
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=10)
+
+        @app.get("/compressed")
+        @compress
+        def compressed(size: int = 100, media_type: str = "text/plain"):
+            return Response("a" * size, media_type=media_type)
+
+        @app.get("/plain")
+        def plain():
+            return PlainTextResponse("a" * 100)
+
+        return app
+
+    @pytest.fixture(autouse=True)
+    def clear_encoders(self):
+        get_encoders.cache_clear()
+        yield
+        get_encoders.cache_clear()
+
+    def test_successfully_compress_opted_in_response(self, app: FastAPI):
+        response = TestClient(app).get(
+            "/compressed", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert "gzip" == response.headers["Content-Encoding"]
+        assert "Accept-Encoding" == response.headers["Vary"]
+        assert "a" * 100 == response.text
+
+    def test_successfully_negotiate_preferred_encoding(self, app: FastAPI, mocker):
+        mocker.patch.dict(ENCODER_FACTORIES, {"test": lambda: lambda body: b"test"})
+        mocker.patch.object(settings, "compression_encodings", ["gzip", "test"])
+
+        response = TestClient(app).get(
+            "/compressed",
+            headers={"Accept-Encoding": "gzip;q=0.5, test"},
+        )
+
+        assert "test" == response.headers["Content-Encoding"]
+        assert "4" == response.headers["Content-Length"]
+        assert b"test" == response.content
+
+    @pytest.mark.parametrize(
+        "path, headers",
+        [
+            ("/plain", {"Accept-Encoding": "gzip"}),
+            ("/compressed?size=9", {"Accept-Encoding": "gzip"}),
+            ("/compressed?media_type=image/png", {"Accept-Encoding": "gzip"}),
+            ("/compressed", {"Accept-Encoding": "identity"}),
+        ],
+        ids=["not opted in", "too small", "content type", "not accepted"],
+    )
+    def test_successfully_skip_compression(self, app: FastAPI, path, headers):
+        response = TestClient(app).get(path, headers=headers)
+
+        assert "Content-Encoding" not in response.headers
+        assert response.content.startswith(b"a")
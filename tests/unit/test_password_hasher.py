@@ -0,0 +1,64 @@
+import pytest
+from argon2.exceptions import VerifyMismatchError
+from fastapi import status
+
+from app.exceptions import ServiceUnavailableException
+from app.password_hasher import PasswordHashingExecutor
+
+PASSWORD = "12345678"
+
+pytestmark = pytest.mark.anyio
+
+
+class TestPasswordHashingExecutor:
+    @pytest.fixture
+    def password_hashing_executor(self) -> PasswordHashingExecutor:
+        password_hashing_executor = PasswordHashingExecutor()
+        yield password_hashing_executor
+        password_hashing_executor.shutdown()
+
+    async def test_successfully_hash_and_verify_password(
+        self, password_hashing_executor: PasswordHashingExecutor
+    ):
+        password_hash = await password_hashing_executor.hash(PASSWORD)
+
+        assert await password_hashing_executor.verify(password_hash, PASSWORD)
+        assert 0 == password_hashing_executor.pending
+
+    async def test_fail_to_verify_password_due_to_mismatch(
+        self, password_hashing_executor: PasswordHashingExecutor
+    ):
+        password_hash = await password_hashing_executor.hash(PASSWORD)
+
+        with pytest.raises(VerifyMismatchError):
+            await password_hashing_executor.verify(password_hash, "87654321")
+
+        assert 0 == password_hashing_executor.pending
+
+    async def test_successfully_warm_up(
+        self, mocker, password_hashing_executor: PasswordHashingExecutor
+    ):
+        hash_ = mocker.spy(password_hashing_executor, "hash")
+
+        await password_hashing_executor.warm_up()
+
+        assert 2 == hash_.call_count
+        assert 0 == password_hashing_executor.pending
+
+    async def test_fail_to_hash_password_due_to_saturated_executor(self):
+        password_hashing_executor = PasswordHashingExecutor(max_pending=0)
+
+        with pytest.raises(ServiceUnavailableException) as excinfo:
+            await password_hashing_executor.hash(PASSWORD)
+
+        assert status.HTTP_503_SERVICE_UNAVAILABLE == excinfo.value.status_code
+        assert "1" == excinfo.value.headers["Retry-After"]
+        password_hashing_executor.shutdown()
+
+    async def test_successfully_hash_password_in_process_pool(self):
+        password_hashing_executor = PasswordHashingExecutor(use_processes=True)
+
+        password_hash = await password_hashing_executor.hash(PASSWORD)
+
+        assert await password_hashing_executor.verify(password_hash, PASSWORD)
+        password_hashing_executor.shutdown()
@@ -0,0 +1,36 @@
+import math
+
+from app.rate_limiter import TokenBucketLimiter
+
+
+class TestTokenBucketLimiter:
+    def test_successfully_acquire_until_bucket_is_empty(self, mocker):
+        mocker.patch("app.rate_limiter.time.monotonic", return_value=0)
+        limiter = TokenBucketLimiter()
+
+        assert [0, 0, 2] == [limiter.acquire("key", 2, 0.5) for _ in range(3)]
+        assert 0 == limiter.acquire("other", 2, 0.5)
+
+    def test_successfully_refill_bucket(self, mocker):
+        monotonic = mocker.patch("app.rate_limiter.time.monotonic", return_value=0)
+        limiter = TokenBucketLimiter()
+        limiter.acquire("key", 1, 0.5)
+
+        monotonic.return_value = 1
+        assert 1 == limiter.acquire("key", 1, 0.5)
+        monotonic.return_value = 2
+        assert 0 == limiter.acquire("key", 1, 0.5)
+
+    def test_successfully_reject_without_refill(self):
+        limiter = TokenBucketLimiter()
+        limiter.acquire("key", 1, 0)
+
+        assert math.inf == limiter.acquire("key", 1, 0)
+
+    def test_successfully_evict_least_recently_used_bucket(self):
+        limiter = TokenBucketLimiter(max_size=2)
+        for key in ("a", "b", "a", "c"):
+            limiter.acquire(key, 1, 1)
+
+        assert 2 == len(limiter)
+        assert 0 == limiter.acquire("b", 1, 1)
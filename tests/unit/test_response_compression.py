@@ -0,0 +1,49 @@
+import pytest
+
+from app.response_compression import (
+    compress,
+    is_allowed_content_type,
+    is_compressible,
+    negotiate,
+)
+
+
+class TestResponseCompression:
+    def test_successfully_mark_endpoint_compressible(self):
+        def endpoint():
+            pass
+
+        assert not is_compressible(endpoint)
+        assert is_compressible(compress(endpoint))
+        assert not is_compressible(None)
+
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        [
+            ("gzip", "gzip"),
+            ("gzip, br, zstd", "zstd"),
+            ("gzip;q=1.0, zstd;q=0.5", "gzip"),
+            ("*", "zstd"),
+            ("*, zstd;q=0", "br"),
+            ("gzip;q=0, deflate", None),
+            ("gzip;q=invalid", None),
+            ("", None),
+        ],
+    )
+    def test_successfully_negotiate_encoding(self, accept_encoding, expected):
+        assert expected == negotiate(accept_encoding, ["zstd", "br", "gzip"])
+
+    @pytest.mark.parametrize(
+        "content_type, expected",
+        [
+            ("application/json", True),
+            ("Application/JSON; charset=utf-8", True),
+            ("text/plain; charset=utf-8", True),
+            ("text/html", True),
+            ("application/json-patch+json", False),
+            ("image/png", False),
+            ("", False),
+        ],
+    )
+    def test_successfully_check_content_type(self, content_type, expected):
+        assert expected == is_allowed_content_type(content_type)
@@ -0,0 +1,114 @@
+import time
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.revocation_filter import BloomFilter, RevocationFilter
+
+pytestmark = pytest.mark.anyio
+
+
+class TestBloomFilter:
+    def test_successfully_contain_added_keys(self):
+        bloom_filter = BloomFilter(1000, 0.01)
+        keys = [str(uuid.uuid4()) for _ in range(1000)]
+        for key in keys:
+            bloom_filter.add(key)
+
+        assert all(key in bloom_filter for key in keys)
+        assert 1000 == len(bloom_filter)
+
+    def test_successfully_stay_within_false_positive_rate(self):
+        bloom_filter = BloomFilter(1000, 0.01)
+        for _ in range(1000):
+            bloom_filter.add(str(uuid.uuid4()))
+
+        false_positives = sum(str(uuid.uuid4()) in bloom_filter for _ in range(10000))
+
+        assert false_positives < 200
+
+    def test_successfully_size_filter(self):
+        bloom_filter = BloomFilter(1000000, 0.001)
+
+        assert 10 == bloom_filter.hash_count
+        assert 1797199 == bloom_filter.nbytes
+
+
+class TestRevocationFilter:
+    async def test_successfully_load_revocations(self):
+        revocation_filter = RevocationFilter(token_lifetime=3600)
+        get_revocations = AsyncMock(return_value=["revoked"])
+
+        assert await revocation_filter.sync(get_revocations) is True
+
+        assert "revoked" in revocation_filter
+        assert "valid" not in revocation_filter
+        since = get_revocations.await_args_list[0].args[0]
+        assert abs(time.time() * 1000 - 3600000 - since) < 1000
+
+    async def test_successfully_load_revoked_before_watermarks(self):
+        revocation_filter = RevocationFilter(sync_interval=0)
+        get_revocations = AsyncMock(
+            side_effect=[[("sub", 1000), ("sub", 500)], [("sub", 2000)]]
+        )
+        revocation_filter.add_revoked_before("other", 100)
+
+        await revocation_filter.sync(get_revocations)
+
+        assert 1000 == revocation_filter.revoked_before("sub")
+        assert 0 == revocation_filter.revoked_before("other")
+        assert 0 == len(revocation_filter)
+
+        await revocation_filter.sync(get_revocations)
+
+        assert 2000 == revocation_filter.revoked_before("sub")
+
+    async def test_successfully_sync_incrementally_with_overlap(self):
+        revocation_filter = RevocationFilter(sync_interval=0, sync_overlap=5)
+        get_revocations = AsyncMock(side_effect=[["first"], ["second"]])
+        await revocation_filter.sync(get_revocations)
+        checkpoint = revocation_filter._checkpoint
+        assert checkpoint is not None
+
+        await revocation_filter.sync(get_revocations)
+
+        assert "first" in revocation_filter
+        assert "second" in revocation_filter
+        get_revocations.assert_awaited_with(checkpoint - 5000)
+
+    async def test_skip_sync_if_not_due(self):
+        revocation_filter = RevocationFilter(sync_interval=60)
+        get_revocations = AsyncMock(return_value=[])
+        await revocation_filter.sync(get_revocations)
+
+        assert await revocation_filter.sync(get_revocations) is True
+
+        get_revocations.assert_awaited_once()
+
+    async def test_successfully_rebuild_filter_at_capacity(self):
+        revocation_filter = RevocationFilter(capacity=1, sync_interval=0)
+        get_revocations = AsyncMock(side_effect=[["expired"], ["revoked"]])
+        await revocation_filter.sync(get_revocations)
+
+        await revocation_filter.sync(get_revocations)
+
+        assert "expired" not in revocation_filter
+        assert "revoked" in revocation_filter
+
+    async def test_fail_to_sync_due_to_revocations_error(self):
+        revocation_filter = RevocationFilter(sync_interval=60)
+        get_revocations = AsyncMock(side_effect=[ConnectionError(), []])
+
+        assert await revocation_filter.sync(get_revocations) is False
+        assert await revocation_filter.sync(get_revocations) is True
+        assert 2 == get_revocations.await_count
+
+    async def test_fail_to_sync_while_first_load_is_in_flight(self):
+        revocation_filter = RevocationFilter(sync_interval=60)
+
+        async def get_revocations(since: int) -> list[str]:
+            assert await revocation_filter.sync(get_revocations) is False
+            return []
+
+        assert await revocation_filter.sync(get_revocations) is True
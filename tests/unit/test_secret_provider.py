@@ -0,0 +1,65 @@
+from unittest.mock import Mock
+
+import pytest
+from aws_lambda_powertools.utilities import parameters
+
+from app.secret_provider import SecretProvider
+from app.settings import Settings
+
+SECRET = "secret"
+
+
+class TestSecretProvider:
+    @pytest.fixture
+    def fetch(self) -> Mock:
+        return Mock(return_value=SECRET)
+
+    def test_successfully_get_secret(self, fetch: Mock):
+        secret_provider = SecretProvider(fetch)
+
+        assert SECRET == secret_provider.get()
+        assert SECRET == secret_provider.get()
+        fetch.assert_called_once_with()
+        assert 1 == secret_provider.stats["misses"]
+        assert 1 == secret_provider.stats["hits"]
+        assert 1 == secret_provider.stats["refreshes"]
+
+    def test_successfully_refresh_secret_in_background(self, fetch: Mock):
+        secret_provider = SecretProvider(fetch, refresh_interval=0)
+        secret_provider.get()
+        fetch.return_value = "new_secret"
+
+        assert SECRET == secret_provider.get()
+        secret_provider._refresh_thread.join()
+
+        assert "new_secret" == secret_provider.get()
+        assert 2 <= fetch.call_count
+
+    def test_serve_stale_secret_if_refresh_fails(self, fetch: Mock):
+        secret_provider = SecretProvider(fetch, refresh_interval=0)
+        secret_provider.get()
+        fetch.side_effect = ConnectionError()
+
+        assert SECRET == secret_provider.get()
+        secret_provider._refresh_thread.join()
+
+        assert SECRET == secret_provider.get()
+        assert 1 <= secret_provider.stats["refresh_errors"]
+
+    def test_fail_to_get_secret_due_to_initial_fetch_error(self, fetch: Mock):
+        fetch.side_effect = ConnectionError()
+        secret_provider = SecretProvider(fetch)
+
+        with pytest.raises(ConnectionError):
+            secret_provider.get()
+
+        assert 1 == secret_provider.stats["refresh_errors"]
+
+    def test_successfully_cache_jwt_secret(
+        self, mocker, jwt_secret_ssm_param_value: str, settings: Settings
+    ):
+        get_parameter = mocker.spy(parameters, "get_parameter")
+
+        assert jwt_secret_ssm_param_value == settings.jwt_secret
+        assert jwt_secret_ssm_param_value == settings.jwt_secret
+        get_parameter.assert_called_once()
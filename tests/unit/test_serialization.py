@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from fastapi import status
+
+from app.jwt_bearer import ERROR_MESSAGE_NOT_AUTHENTICATED
+from app.serialization import (
+    STATIC_ERROR_PREFIXES,
+    encode_error,
+    error_response,
+    token_response,
+    validation_error_response,
+)
+
+
+class TestSerialization:
+    @pytest.mark.parametrize(
+        "status_code, error",
+        list(STATIC_ERROR_PREFIXES) + [(status.HTTP_404_NOT_FOUND, 'Not "found"')],
+    )
+    def test_successfully_encode_error(self, mocker, status_code, error):
+        mocker.patch("app.models.response.error.time.time", return_value=1700000000.5)
+        mocker.patch("app.serialization.time.time", return_value=1700000000.5)
+
+        body = encode_error(status_code, error)
+
+        assert {
+            "status": status_code,
+            "error": error,
+            "timestamp": 1700000000,
+        } == json.loads(body)
+
+    def test_successfully_create_error_response(self):
+        response = error_response(
+            status.HTTP_403_FORBIDDEN,
+            ERROR_MESSAGE_NOT_AUTHENTICATED,
+            {"WWW-Authenticate": "Bearer"},
+        )
+
+        assert status.HTTP_403_FORBIDDEN == response.status_code
+        assert "application/json" == response.media_type
+        assert "Bearer" == response.headers["WWW-Authenticate"]
+        assert (
+            ERROR_MESSAGE_NOT_AUTHENTICATED == json.loads(bytes(response.body))["error"]
+        )
+
+    def test_successfully_create_validation_error_response(self):
+        errors = [{"type": "missing", "loc": ["body", "email"], "msg": "Required"}]
+
+        response = validation_error_response(errors)
+
+        body = json.loads(bytes(response.body))
+        assert status.HTTP_422_UNPROCESSABLE_ENTITY == response.status_code
+        assert status.HTTP_422_UNPROCESSABLE_ENTITY == body["status"]
+        assert "Validation Error" == body["error"]
+        assert errors == body["errors"]
+
+    def test_successfully_create_token_response(self):
+        response = token_response("access", "refresh", 3600)
+
+        assert {
+            "access_token": "access",
+            "refresh_token": "refresh",
+            "token_type": "Bearer",
+            "expires_in": 3600,
+        } == json.loads(bytes(response.body))
@@ -0,0 +1,140 @@
+import json
+from typing import Any
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from jwt import DecodeError
+
+from app import settings
+from app.signing_keys import (
+    EMPTY_KEY_SET_JWKS,
+    KeySet,
+    SigningKey,
+    decode_token,
+    encode_token,
+    get_jwks,
+)
+
+PAYLOAD = {"jti": "jti", "sub": "sub"}
+
+
+class TestSigningKeys:
+    @pytest.fixture
+    def rs256(self, mocker, jwt_signing_keys: dict[str, Any]) -> dict[str, Any]:
+        mocker.patch.object(settings, "jwt_algorithm", "RS256")
+        mocker.patch.object(
+            settings.jwt_signing_keys_provider,
+            "get",
+            return_value=json.dumps(jwt_signing_keys),
+        )
+        return jwt_signing_keys
+
+    def test_successfully_sign_with_hs256_by_default(self):
+        token = encode_token(PAYLOAD)
+
+        assert "HS256" == jwt.get_unverified_header(token)["alg"]
+        assert PAYLOAD == decode_token(token)
+        assert EMPTY_KEY_SET_JWKS == get_jwks()[0]
+
+    def test_successfully_sign_with_active_key(self, rs256: dict[str, Any]):
+        token = encode_token(PAYLOAD)
+
+        assert {"alg": "RS256", "kid": "current", "typ": "JWT"} == (
+            jwt.get_unverified_header(token)
+        )
+        assert PAYLOAD == decode_token(token)
+
+    def test_successfully_verify_token_of_rotated_key(
+        self, mocker, rs256: dict[str, Any]
+    ):
+        token = encode_token(PAYLOAD)
+        rs256["active_kid"] = "next"
+        rs256["keys"][0]["kid"] = "next"
+        rs256["keys"].append(
+            {
+                "kid": "current",
+                "public_key": KeySet.from_json(json.dumps(rs256), "RS256")
+                .active.public_key.public_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PublicFormat.SubjectPublicKeyInfo,
+                )
+                .decode(),
+            }
+        )
+        mocker.patch.object(
+            settings.jwt_signing_keys_provider, "get", return_value=json.dumps(rs256)
+        )
+
+        assert PAYLOAD == decode_token(token)
+        assert "next" == jwt.get_unverified_header(encode_token(PAYLOAD))["kid"]
+
+    def test_fail_to_decode_token_due_to_unknown_kid(self, rs256: dict[str, Any]):
+        private_key = KeySet.from_json(json.dumps(rs256), "RS256").private_key
+        token = jwt.encode(
+            PAYLOAD, private_key, algorithm="RS256", headers={"kid": "unknown"}
+        )
+
+        with pytest.raises(DecodeError):
+            decode_token(token)
+
+    def test_fail_to_decode_token_due_to_hs256_token(self, rs256: dict[str, Any]):
+        token = jwt.encode(PAYLOAD, "secret", headers={"kid": "current"})
+
+        with pytest.raises(jwt.InvalidAlgorithmError):
+            decode_token(token)
+
+    def test_successfully_publish_verification_keys(self, rs256: dict[str, Any]):
+        body, etag = get_jwks()
+
+        jwks = json.loads(body)
+        assert ["current", "previous"] == [key["kid"] for key in jwks["keys"]]
+        assert all("d" not in key for key in jwks["keys"])
+        assert {"RS256"} == {key["alg"] for key in jwks["keys"]}
+        assert jwt.PyJWKSet.from_dict(jwks)["previous"]
+        assert etag.startswith('"')
+
+    def test_successfully_sign_with_eddsa(self, mocker):
+        private_key = (
+            ed25519.Ed25519PrivateKey.generate()
+            .private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+            .decode()
+        )
+        mocker.patch.object(settings, "jwt_algorithm", "EdDSA")
+        mocker.patch.object(
+            settings.jwt_signing_keys_provider,
+            "get",
+            return_value=json.dumps(
+                {
+                    "active_kid": "ed",
+                    "keys": [{"kid": "ed", "private_key": private_key}],
+                }
+            ),
+        )
+
+        token = encode_token(PAYLOAD)
+
+        assert PAYLOAD == decode_token(token)
+        assert "OKP" == json.loads(get_jwks()[0])["keys"][0]["kty"]
+
+    def test_fail_to_load_key_set_due_to_active_key_without_private_key(
+        self, jwt_signing_keys: dict[str, Any]
+    ):
+        jwt_signing_keys["active_kid"] = "previous"
+
+        with pytest.raises(ValueError):
+            KeySet.from_json(json.dumps(jwt_signing_keys), "RS256")
+
+    def test_successfully_load_public_only_key(self, jwt_signing_keys):
+        key = SigningKey(
+            "previous", "RS256", public_key=jwt_signing_keys["keys"][1]["public_key"]
+        )
+
+        assert key.private_key is None
+        assert "previous" == key.jwk["kid"]
+        assert "sig" == key.jwk["use"]
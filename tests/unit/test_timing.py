@@ -0,0 +1,51 @@
+import asyncio
+from collections.abc import Generator
+
+import pytest
+
+from app.timing import server_timing, span, spans, timed
+
+
+class TestTiming:
+    @pytest.fixture
+    def recorded(self) -> Generator[dict[str, float]]:
+        recorded: dict[str, float] = {}
+        token = spans.set(recorded)
+        yield recorded
+        spans.reset(token)
+
+    def test_successfully_add_up_spans(self, recorded: dict[str, float]):
+        with span("test"):
+            pass
+        first = recorded["test"]
+        with span("test"):
+            pass
+
+        assert ["test"] == list(recorded)
+        assert recorded["test"] > first
+
+    def test_successfully_skip_span_outside_request(self):
+        with span("test"):
+            pass
+
+        assert spans.get() is None
+
+    def test_successfully_time_function(self, recorded: dict[str, float]):
+        @timed("sync")
+        def sync_function() -> str:
+            return "sync"
+
+        @timed("async")
+        async def async_function() -> str:
+            await asyncio.sleep(0.01)
+            return "async"
+
+        assert "sync" == sync_function()
+        assert "async" == asyncio.run(async_function())
+        assert {"sync", "async"} == set(recorded)
+        assert recorded["async"] >= 10
+
+    def test_successfully_format_server_timing(self):
+        assert "tokens.get_by_id;dur=1.2, total;dur=3.0" == server_timing(
+            {"tokens.get_by_id": 1.234, "total": 3}
+        )
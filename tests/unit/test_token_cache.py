@@ -0,0 +1,119 @@
+import time
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.token_cache import TokenCache
+
+
+class TestTokenCache:
+    @pytest.fixture
+    def jti(self) -> str:
+        return str(uuid.uuid4())
+
+    @pytest.fixture
+    def token_cache(self) -> TokenCache:
+        return TokenCache(max_size=2, positive_ttl=30, negative_ttl=5)
+
+    def test_successfully_get_valid_token(self, jti: str, token_cache: TokenCache):
+        token_cache.put(jti, True)
+
+        assert token_cache.get(jti) is True
+
+    def test_successfully_get_invalid_token(self, jti: str, token_cache: TokenCache):
+        token_cache.put(jti, False)
+
+        assert token_cache.get(jti) is False
+
+    def test_get_returns_none_if_jti_not_cached(
+        self, jti: str, token_cache: TokenCache
+    ):
+        assert token_cache.get(jti) is None
+
+    def test_get_returns_none_if_entry_expired(self, jti: str):
+        token_cache = TokenCache(positive_ttl=0.01)
+        token_cache.put(jti, True)
+        time.sleep(0.02)
+
+        assert token_cache.get(jti) is None
+
+    def test_put_skips_already_expired_token(self, jti: str, token_cache: TokenCache):
+        token_cache.put(jti, True, int(time.time()) - 1)
+
+        assert token_cache.get(jti) is None
+
+    def test_successfully_evict_least_recently_used_entry(
+        self, token_cache: TokenCache
+    ):
+        token_cache.put("first", True)
+        token_cache.put("second", True)
+        token_cache.get("first")
+        token_cache.put("third", True)
+
+        assert 2 == len(token_cache)
+        assert token_cache.get("first") is True
+        assert token_cache.get("second") is None
+
+    def test_successfully_invalidate(self, jti: str, token_cache: TokenCache):
+        token_cache.put(jti, True)
+
+        token_cache.invalidate(jti)
+
+        assert token_cache.get(jti) is None
+
+    def test_successfully_get_revoked_before(self, token_cache: TokenCache):
+        token_cache.put_revoked_before("sub", 1000)
+
+        assert 1000 == token_cache.get_revoked_before("sub")
+        assert token_cache.get_revoked_before("other") is None
+
+    def test_successfully_clear_revoked_before(self, token_cache: TokenCache):
+        token_cache.put_revoked_before("sub", 1000)
+
+        token_cache.clear()
+
+        assert token_cache.get_revoked_before("sub") is None
+
+    @pytest.mark.anyio
+    async def test_successfully_clear_cache_if_revocation_epoch_changed(self, jti: str):
+        token_cache = TokenCache(revocation_epoch_check_interval=0)
+        get_revocation_epoch = AsyncMock(side_effect=[1, 2])
+        await token_cache.sync_revocation_epoch(get_revocation_epoch)
+        token_cache.put(jti, True)
+
+        await token_cache.sync_revocation_epoch(get_revocation_epoch)
+
+        assert token_cache.get(jti) is None
+        assert 2 == get_revocation_epoch.call_count
+
+    @pytest.mark.anyio
+    async def test_skip_revocation_epoch_check_if_not_due(self, jti: str):
+        token_cache = TokenCache(revocation_epoch_check_interval=60)
+        get_revocation_epoch = AsyncMock(side_effect=[1, 2])
+        await token_cache.sync_revocation_epoch(get_revocation_epoch)
+        token_cache.put(jti, True)
+
+        await token_cache.sync_revocation_epoch(get_revocation_epoch)
+
+        assert token_cache.get(jti) is True
+        get_revocation_epoch.assert_awaited_once_with()
+
+    @pytest.mark.anyio
+    async def test_skip_revocation_epoch_check_if_disabled(
+        self, token_cache: TokenCache
+    ):
+        get_revocation_epoch = AsyncMock()
+
+        await token_cache.sync_revocation_epoch(get_revocation_epoch)
+
+        get_revocation_epoch.assert_not_awaited()
+
+    @pytest.mark.anyio
+    async def test_bypass_cache_if_revocation_epoch_check_fails(self, jti: str):
+        token_cache = TokenCache(revocation_epoch_check_interval=60)
+        get_revocation_epoch = AsyncMock(side_effect=[ConnectionError(), 1])
+
+        assert await token_cache.sync_revocation_epoch(get_revocation_epoch) is False
+        assert await token_cache.sync_revocation_epoch(get_revocation_epoch) is True
+        assert 2 == get_revocation_epoch.await_count
@@ -0,0 +1,140 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from argon2 import PasswordHasher
+
+from app.dynamodb import get_dynamodb_client
+from app.models.user import User
+from app.user_import import UserImport, main, read_csv, read_ndjson
+
+pytestmark = pytest.mark.anyio
+
+PASSWORD_HASHER = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(2) as executor:
+        yield executor
+
+
+@pytest.fixture
+def user_import(executor, users_table, users_table_name: str) -> UserImport:
+    return UserImport(
+        get_dynamodb_client().table(users_table_name),
+        PASSWORD_HASHER,
+        executor,
+        chunk_size=10,
+    )
+
+
+class TestUserImport:
+    async def test_successfully_import_users(
+        self, user_import: UserImport, users_table
+    ):
+        password_hash = PASSWORD_HASHER.hash("secret")
+        records = read_ndjson(
+            io.StringIO(
+                "\n".join(
+                    json.dumps(
+                        {
+                            "email": f"import-{index}@netcode.hu",
+                            "username": f"import-{index}",
+                            "password": "secret",
+                        }
+                    )
+                    for index in range(24)
+                )
+                + "\n\n"
+                + json.dumps(
+                    {
+                        "email": "hashed@netcode.hu",
+                        "username": "hashed",
+                        "passwordHash": password_hash,
+                        "displayName": "Hashed",
+                    }
+                )
+            )
+        )
+
+        counts = await user_import.run(records)
+
+        assert 25 == counts["records"] == counts["imported"]
+        assert [] == user_import.errors
+        guard = users_table.get_item(Key={"id": "EMAIL#hashed@netcode.hu"})["Item"]
+        user = User(**users_table.get_item(Key={"id": guard["user_id"]})["Item"])
+        assert password_hash == user.password
+        assert "Hashed" == user.display_name
+        guard = users_table.get_item(Key={"id": "USERNAME#import-0"})["Item"]
+        user = User(**users_table.get_item(Key={"id": guard["user_id"]})["Item"])
+        assert PASSWORD_HASHER.verify(user.password, "secret")
+
+    async def test_successfully_report_rejected_records(
+        self, user: User, user_import: UserImport
+    ):
+        records = read_csv(
+            io.StringIO(
+                "email,username,password,passwordHash\n"
+                "new@netcode.hu,new,secret,\n"
+                "new@netcode.hu,other,secret,\n"
+                "other@netcode.hu,new,secret,\n"
+                f"{user.email},taken,secret,\n"
+                "invalid,invalid,secret,\n"
+                "hash@netcode.hu,hash,,not-a-hash\n"
+            )
+        )
+
+        counts = await user_import.run(records)
+
+        assert {
+            "records": 6,
+            "imported": 1,
+            "invalid": 2,
+            "duplicates": 2,
+            "conflicts": 1,
+            "failed": 0,
+        } == counts
+        assert [3, 4, 6, 7, 5] == [line for line, _ in user_import.errors]
+        assert f"EMAIL#{user.email} already exists" == user_import.errors[-1][1]
+
+    async def test_fail_to_import_users_due_to_unprocessed_items(
+        self, mocker, user_import: UserImport
+    ):
+        mocker.patch(
+            "app.dynamodb.Table.batch_write_item",
+            side_effect=lambda requests: {
+                "UnprocessedItems": {user_import._table.name: requests[1:2]}
+            },
+        )
+
+        counts = await user_import.run(
+            [(1, {"email": "new@netcode.hu", "username": "new", "password": "a"})]
+        )
+
+        assert 1 == counts["failed"]
+        assert 0 == counts["imported"]
+
+
+class TestUserImportCli:
+    def test_successfully_import_users_from_file(self, capsys, tmp_path, users_table):
+        path = tmp_path / "users.ndjson"
+        path.write_text(
+            json.dumps(
+                {
+                    "email": "cli@netcode.hu",
+                    "username": "cli",
+                    "passwordHash": PASSWORD_HASHER.hash("secret"),
+                }
+            )
+            + "\nnot json\n"
+        )
+
+        main([str(path), "--workers", "1"])
+
+        captured = capsys.readouterr()
+        assert captured.out.startswith("Imported 1 of 2 users in ")
+        assert "1 invalid" in captured.out
+        assert captured.err.startswith("line 2: record: Invalid JSON")
+        assert "Item" in users_table.get_item(Key={"id": "USERNAME#cli"})